@@ -1,7 +1,7 @@
 # Backend package for ZH.MarketPulse.EGX
 
 # Import main pipeline components
-from .shared import config_manager, db_engine, logging
+from .shared import config_manager, db_engine, custom_logging as logging
 from .collector import stock_collector
 
 # Version info
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark list endpoint serialization: FastAPI's response-model path against the
+fast (orjson, no per-item validation) and NDJSON paths.
+
+Measures CPU time per request on synthetic fair value rows, so no database is needed.
+
+Usage:
+    python benchmark_serialization.py --rows 5000 --repeat 20
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+# shared first: data.models imports it while initializing
+from shared.fast_json import dumps, ndjson_lines, orjson, rows_to_dicts
+from data.responses import FairValueResponse
+
+COLUMNS = [
+    'id', 'symbol', 'released_at', 'source', 'source_ar', 'recommendation', 'recommendation_ar',
+    'market', 'sector', 'market_url', 'value', 'price', 'last_price', 'change', 'change_percentage'
+]
+
+
+def make_rows(count: int) -> List[tuple]:
+    """Synthetic SQL result tuples shaped like the /fairValues select."""
+    random.seed(42)
+    released = datetime(2024, 1, 1)
+    return [
+        (
+            index, f"SYM{index % 250}", released + timedelta(hours=index), 'Al Ahly Pharos', 'الأهلي فاروس',
+            'Buy', 'شراء', 'Main Market', 'Banks', None, round(random.uniform(5, 100), 2),
+            round(random.uniform(5, 100), 2), round(random.uniform(5, 100), 2),
+            round(random.uniform(-5, 5), 2), round(random.uniform(-20, 20), 2)
+        )
+        for index in range(count)
+    ]
+
+
+def response_model_path(rows: List[tuple]) -> bytes:
+    """What FastAPI does for `response_model=List[FairValueResponse]`: validate, encode, json.dumps."""
+    models = [FairValueResponse(**row) for row in rows_to_dicts(COLUMNS, rows)]
+    return json.dumps(jsonable_encoder(models), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def fast_path(rows: List[tuple]) -> bytes:
+    """`format=fast`: dicts straight from the tuples, one orjson call."""
+    return dumps(rows_to_dicts(COLUMNS, rows))
+
+
+def ndjson_path(rows: List[tuple]) -> bytes:
+    """`format=ndjson`: the streamed chunks, joined to measure total work."""
+    return b''.join(ndjson_lines(rows_to_dicts(COLUMNS, rows)))
+
+
+def measure(fn: Callable[[List[tuple]], bytes], rows: List[tuple], repeat: int) -> Dict[str, Any]:
+    fn(rows)  # Warm up
+    started = time.process_time()
+    for _ in range(repeat):
+        body = fn(rows)
+    cpu_ms = (time.process_time() - started) / repeat * 1000
+    return {'cpu_ms': cpu_ms, 'bytes': len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per path")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows per request, {args.repeat} requests per path, "
+          f"encoder: {'orjson' if orjson is not None else 'stdlib json'}")
+
+    baseline = None
+    for name, fn in (('response_model', response_model_path), ('fast', fast_path), ('ndjson', ndjson_path)):
+        result = measure(fn, rows, args.repeat)
+        baseline = baseline or result['cpu_ms']
+        print(f"{name:>15}: {result['cpu_ms']:8.2f} ms CPU/request  {result['bytes']:>10} bytes  "
+              f"{baseline / result['cpu_ms']:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
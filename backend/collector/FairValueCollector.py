@@ -9,12 +9,21 @@ import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from shared import config_manager, logger, http_client, time_method, log_error_with_exception, get_session
+from sqlalchemy import func, insert, or_, select, update
+
+from shared import config_manager, logger, http_client, time_method, log_error_with_exception, iter_pages, CrawlStatus
+from shared import dimension_cache, get_async_session, run_sync_transaction, upsert_counting, snapshot_cache, report_progress
 from data.models.fair_value import FairValue
 from data.models.stock import Stock
 from data.models.source import Source
 from data.models.recommendation import Recommendation
 from data.models.source_type import SourceType
+from .pipeline import CollectionPipeline
+
+# Data generation behind GET /fairValues ETags
+FAIR_VALUES_GENERATION = 'fair_values'
+# Single-flight job name of fair value collections
+FAIR_VALUE_JOB = 'fair_values'
 
 
 class FairValueCollector:
@@ -28,7 +37,7 @@ class FairValueCollector:
         self.english_base = self.config.get('english_base', 'https://english.mubasher.info/')
         self.fair_values_endpoint = self.config.get('fairValues', 'api/1/fairValues?country=eg&size={size}&start={start}')
         self.max_size = self.config.get('max_size', 30)
-        self.request_delay = self.config.get('request_delay', 5.0)
+        self.max_concurrency = self.config.get('max_concurrency', 4)
 
     async def _fetch_fair_values_arabic(self, page: int = 0, size: int = 0) -> Dict[str, Any]:
         """
@@ -147,85 +156,230 @@ class FairValueCollector:
             logger.warning(f"Could not parse date: {date_str} - {e}")
             return None
 
-    async def collect_fair_values(self, max_pages: Optional[int] = None) -> List[Dict[str, Any]]:
+    @time_method
+    async def collect_and_save_fair_values(self, max_pages: Optional[int] = None, full_resync: bool = False) -> int:
         """
-        Collect fair value data from both Arabic and English endpoints.
+        Collect fair values and stream them into the database as pages arrive.
+
+        Both languages are crawled concurrently; parsed pages flow through a bounded
+        pipeline into batched, per-batch-committed writes, so fetching and saving
+        overlap and memory stays bounded on full resyncs. Watermarks are advanced
+        only after the pipeline has written everything, only for a language whose
+        crawl completed (no failed page, no `max_pages` cutoff), and only to rows
+        actually saved, so nothing newer than the old watermark is skipped for good.
 
         Args:
-            max_pages: Maximum number of pages to fetch (None for all)
+            max_pages: Maximum number of pages to fetch per language (None for all)
+            full_resync: Ignore the watermarks and crawl every page
 
         Returns:
-            List of collected fair value data
+            Number of records saved
+        """
+        watermarks = await self._resolve_watermarks(full_resync)
+        statuses = {'English': CrawlStatus(), 'Arabic': CrawlStatus()}
+        newest = {}
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+        async def save_batch(batch: List[Dict[str, Any]]) -> int:
+            batch_counts = await self.save_fair_values(batch, newest)
+            for name, count in batch_counts.items():
+                counts[name] += count
+            return batch_counts['inserted'] + batch_counts['updated']
+
+        pipeline = CollectionPipeline(save_batch, name="fair values")
+
+        async def crawl(fetch_func, language: str):
+            async for page, rows in self._iter_endpoint_pages(fetch_func, max_pages, language, watermarks[language],
+                                                              statuses[language]):
+                if rows:
+                    await pipeline.put(rows)
+
+        stats = await pipeline.run(
+            crawl(self._fetch_fair_values_english, "English"),
+            crawl(self._fetch_fair_values_arabic, "Arabic")
+        )
+
+        for language, released_at in newest.items():
+            if statuses[language].complete:
+                # Config reads and writes hit the database; keep them off the event loop
+                await asyncio.to_thread(self._advance_watermark, language, released_at)
+            else:
+                logger.warning(f"⚠️ {language} fair value crawl was incomplete, keeping its watermark")
+
+        logger.info(f"🎉 Fair values saved: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['skipped']} skipped")
+        return stats['rows_written']
+
+    async def _resolve_watermarks(self, full_resync: bool) -> Dict[str, Optional[datetime]]:
         """
-        # Get the max released_at from the database
+        Get the released_at watermark to stop at for each language.
+
+        Args:
+            full_resync: Ignore the watermarks
+
+        Returns:
+            Mapping of language to watermark (None means crawl everything)
+        """
+        watermarks = {'English': None, 'Arabic': None}
+        if full_resync:
+            logger.info("🔄 Full fair value resync requested, ignoring watermarks")
+            return watermarks
+
+        # Fall back to the max released_at in the DB until a language has its own watermark
         max_released_at = await self._get_max_released_at()
         logger.info(f"📅 Max released_at in DB: {max_released_at}")
+        for language in watermarks:
+            watermarks[language] = await asyncio.to_thread(self._get_watermark, language) or max_released_at
+        logger.info(f"📅 Fair value watermarks: {watermarks}")
+        return watermarks
 
-        collected_data = []
+    def _get_watermark(self, language: str) -> Optional[datetime]:
+        """
+        Get the stored released_at watermark for a language.
 
-        # Fetch from English endpoint first (primary)
-        english_data = await self._collect_from_endpoint(
-            self._fetch_fair_values_english, max_pages, "English"
-        )
-        collected_data.extend(english_data)
+        Args:
+            language: "English" or "Arabic"
 
-        # Fetch from Arabic endpoint
-        arabic_data = await self._collect_from_endpoint(
-            self._fetch_fair_values_arabic, max_pages, "Arabic"
-        )
-        collected_data.extend(arabic_data)
+        Returns:
+            Watermark or None if never stored
+        """
+        value = config_manager.get(f'fair_values.watermark_{language.lower()}')
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"Invalid fair value watermark for {language}: {value}")
+            return None
+
+    def _advance_watermark(self, language: str, released_at: datetime):
+        """
+        Move a language's watermark forward (never backward) to released_at.
+
+        Args:
+            language: "English" or "Arabic"
+            released_at: Newest saved released_at for that language
+        """
+        current = self._get_watermark(language)
+        if current is None or released_at > current:
+            config_manager.set(
+                f'fair_values.watermark_{language.lower()}', released_at.isoformat(),
+                'fair_values', f'Newest {language} fair value released_at collected'
+            )
+
+    async def _iter_endpoint_pages(self, fetch_func, max_pages: Optional[int], language: str,
+                                   watermark: Optional[datetime] = None, status: Optional[CrawlStatus] = None):
+        """
+        Yield (page, processed rows) for a specific endpoint as pages arrive.
+
+        Without a watermark, page 0 is fetched first; the remaining pages are fetched
+        concurrently (bounded by `max_concurrency`) and yielded in completion order.
+        With a watermark, pages are fetched in order and paging stops at the first
+        page containing only rows at or before the watermark.
 
-        # Filter to only new data since max_released_at
-        if max_released_at:
-            filtered_data = [data for data in collected_data if data['released_at'] and data['released_at'] > max_released_at]
-            logger.info(f"🔄 Filtered {len(collected_data)} to {len(filtered_data)} new fair values since {max_released_at}")
-            collected_data = filtered_data
+        Rows are deduplicated by natural key, since rows can shift between pages mid-crawl.
+
+        Args:
+            fetch_func: Function to fetch data
+            max_pages: Max pages to fetch
+            language: Language for logging
+            watermark: Only keep rows released on or after this date (None for all)
+            status: Receives whether the crawl reached the end of the listing (or the watermark)
+        """
+        is_arabic = language == "Arabic"
+        seen_keys = set()
+        status = status if status is not None else CrawlStatus()
+
+        if watermark is None:
+            pages = iter_pages(
+                lambda page: fetch_func(page, self.max_size),
+                max_pages, self.max_concurrency, f"{language} fair values", status
+            )
         else:
-            logger.info(f"🔄 No max released_at found, processing all {len(collected_data)} fair values")
+            pages = self._iter_incremental_pages(fetch_func, max_pages, language, watermark, status)
 
-        logger.info(f"🎉 Collected total {len(collected_data)} new fair value records")
-        return collected_data
+        try:
+            async for page, response in pages:
+                rows = []
+                for row in response.get('rows', []):
+                    processed_row = self._process_fair_value_row(row, is_arabic)
+                    if not processed_row:
+                        continue
+                    if watermark is not None and (not processed_row['released_at'] or processed_row['released_at'] < watermark):
+                        continue
 
-    async def _collect_from_endpoint(self, fetch_func, max_pages: Optional[int], language: str) -> List[Dict[str, Any]]:
+                    key = self._natural_key(processed_row)
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    rows.append(processed_row)
+
+                yield page, rows
+        except Exception as e:
+            status.complete = False
+            logger.error(f"❌ Error fetching {language} fair values: {e}")
+
+    async def _iter_incremental_pages(self, fetch_func, max_pages: Optional[int], language: str, watermark: datetime,
+                                      status: CrawlStatus):
         """
-        Collect data from a specific endpoint.
+        Yield newest-first pages until a page holds nothing newer than the watermark.
+
+        The crawl is complete when it reaches such a page or the last page; a failed
+        fetch or the `max_pages` cutoff leave `status.complete` False.
 
         Args:
             fetch_func: Function to fetch data
             max_pages: Max pages to fetch
             language: Language for logging
-
-        Returns:
-            List of collected data
+            watermark: Paging stops once a page has no row released after it
+            status: Receives whether the crawl completed
         """
-        data = []
         page = 0
 
         while max_pages is None or page < max_pages:
             try:
                 response = await fetch_func(page, self.max_size)
-                rows = response.get('rows', [])
-
-                if not rows:
-                    break
+            except Exception as e:
+                logger.error(f"❌ Error fetching {language} fair values page {page}: {e}")
+                status.failed_pages.append(page)
+                break
 
-                for row in rows:
-                    processed_row = self._process_fair_value_row(row, language == "Arabic")
-                    if processed_row:
-                        data.append(processed_row)
+            rows = response.get('rows', [])
+            if not rows:
+                status.complete = True
+                break
 
-                number_of_pages = response.get('numberOfPages', 1)
-                if page + 1 >= number_of_pages:
-                    break
+            report_progress(pages=1)
+            yield page, response
 
-                page += 1
-                await asyncio.sleep(self.request_delay)
+            released = [self._parse_date(row.get('releasedAt', '')) for row in rows]
+            if not any(released_at and released_at > watermark for released_at in released):
+                logger.info(f"⏹️ {language} fair values page {page} has nothing newer than {watermark}, stopping")
+                status.complete = True
+                break
 
-            except Exception as e:
-                logger.error(f"❌ Error fetching {language} fair values page {page}: {e}")
+            number_of_pages = response.get('numberOfPages', 1)
+            if page + 1 >= number_of_pages:
+                status.complete = True
                 break
+            page += 1
 
-        return data
+        logger.info(f"🔄 Incremental {language} fair value refresh fetched {page + 1} page(s)")
+
+    def _natural_key(self, processed_row: Dict[str, Any]) -> tuple:
+        """
+        Build the natural key of a processed fair value row.
+
+        Mirrors the (stock, released_at, source) unique constraint on `fair_values`.
+
+        Args:
+            processed_row: Row returned by `_process_fair_value_row`
+
+        Returns:
+            Tuple identifying the fair value
+        """
+        source = processed_row['source_name'] or processed_row['source_name_ar']
+        return processed_row['symbol'], processed_row['released_at'], source
 
     def _process_fair_value_row(self, row: Dict[str, Any], is_arabic: bool = False) -> Optional[Dict[str, Any]]:
         """
@@ -248,6 +402,7 @@ class FairValueCollector:
 
             processed = {
                 'symbol': symbol,
+                'language': 'Arabic' if is_arabic else 'English',
                 'released_at': released_at,
                 'source_name': row.get('source') if not is_arabic else None,
                 'source_name_ar': row.get('source') if is_arabic else None,
@@ -273,119 +428,164 @@ class FairValueCollector:
         Returns:
             Max released_at or None
         """
-        with get_session() as session:
-            result = session.execute(
-                session.query(FairValue.released_at).order_by(FairValue.released_at.desc()).limit(1)
-            ).scalar_one_or_none()
-            return result
+        async with get_async_session() as session:
+            result = await session.execute(select(func.max(FairValue.released_at)))
+            return result.scalar_one_or_none()
 
     @time_method
-    async def save_fair_values(self, fair_values_data: List[Dict[str, Any]]) -> int:
+    async def save_fair_values(self, fair_values_data: List[Dict[str, Any]],
+                               newest: Optional[Dict[str, datetime]] = None) -> Dict[str, int]:
         """
-        Save fair value data to the database.
+        Save fair value data to the database in one transaction.
+
+        The write runs on the async session, so fetches keep flowing while it waits on the DB.
 
         Args:
             fair_values_data: List of fair value data to save
+            newest: Updated after the commit with the newest saved released_at per language
+                (rows skipped for unknown symbols don't count)
 
         Returns:
-            Number of records saved
+            Counts of inserted, updated and skipped records
         """
-        saved_count = 0
+        saved_newest = {}
+        try:
+            counts = await run_sync_transaction(self._write_fair_values, fair_values_data, saved_newest)
+        except Exception as e:
+            logger.error(f"❌ Error saving fair values: {e}")
+            raise
+
+        logger.info(f"💾 Saved fair values: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['skipped']} skipped")
+
+        # Committed: clients' cached pages are stale
+        snapshot_cache.invalidate(FAIR_VALUES_GENERATION)
+        report_progress(rows=counts['inserted'] + counts['updated'])
+        if newest is not None:
+            for language, released_at in saved_newest.items():
+                if language not in newest or released_at > newest[language]:
+                    newest[language] = released_at
+        return counts
+
+    def _write_fair_values(self, session, fair_values_data: List[Dict[str, Any]],
+                           newest: Optional[Dict[str, datetime]] = None) -> Dict[str, int]:
+        """
+        Write one batch of fair value data; the caller owns the transaction.
 
-        with get_session() as session:
-            try:
-                for data in fair_values_data:
-                    # Find the stock by symbol
-                    stock = session.execute(
-                        session.query(Stock).filter(Stock.symbol == data['symbol'])
-                    ).scalar_one_or_none()
-
-                    if not stock:
-                        logger.warning(f"Stock not found for symbol: {data['symbol']}")
-                        continue
+        Stocks, sources, the default source type and recommendations are resolved
+        for the whole batch through the shared dimension cache. Rows with a source
+        and a release date are written with one multi-row INSERT ... ON CONFLICT on
+        the (released_at, source_id, stock_id) unique constraint. Rows with a NULL
+        in that key (the Arabic endpoint only sends Arabic source names; some rows
+        have no date) never conflict, so they are matched NULL-safely with one
+        lookup instead and written with one bulk UPDATE and one bulk INSERT.
 
-                    # Get or create source
-                    source_name = data['source_name']
-                    source_name_ar = data['source_name_ar']
-                    if source_name:
-                        source = session.execute(
-                            session.query(Source).filter(Source.name == source_name)
-                        ).scalar_one_or_none()
-                        if not source:
-                            # Get the default source type (financial services companies)
-                            source_type = session.execute(
-                                session.query(SourceType).filter(SourceType.name == 'financial services companies')
-                            ).scalar_one_or_none()
-                            if not source_type:
-                                # Create it if not exists
-                                source_type = SourceType(name='financial services companies', name_ar='شركات خدمات مالية')
-                                session.add(source_type)
-                                session.flush()  # To get id
-                            source = Source(name=source_name, name_ar=source_name_ar, type_id=source_type.id)
-                            session.add(source)
-                            session.flush()
-                        source_id = source.id
-                    else:
-                        source_id = None
-
-                    # Get or create recommendation
-                    recommendation_name = data['recommendation_name']
-                    recommendation_name_ar = data['recommendation_name_ar']
-                    if recommendation_name:
-                        recommendation = session.execute(
-                            session.query(Recommendation).filter(Recommendation.name == recommendation_name)
-                        ).scalar_one_or_none()
-                        if not recommendation:
-                            recommendation = Recommendation(name=recommendation_name, name_ar=recommendation_name_ar)
-                            session.add(recommendation)
-                            session.flush()
-                        recommendation_id = recommendation.id
-                    else:
-                        recommendation_id = None
-
-                    # Check if fair value already exists (by stock_id, released_at, source_id)
-                    existing = session.execute(
-                        session.query(FairValue).filter(
-                            FairValue.stock_id == stock.id,
-                            FairValue.released_at == data['released_at'],
-                            FairValue.source_id == source_id
-                        )
-                    ).scalar_one_or_none()
-
-                    if existing:
-                        # Update existing
-                        existing.recommendation_id = recommendation_id
-                        existing.value = data['value']
-                        existing.price = data['price']
-                        existing.last_price = data['last_price']
-                        existing.change = data['change']
-                        existing.change_percentage = data['change_percentage']
-                    else:
-                        # Create new
-                        fair_value = FairValue(
-                            stock_id=stock.id,
-                            released_at=data['released_at'],
-                            source_id=source_id,
-                            recommendation_id=recommendation_id,
-                            value=data['value'],
-                            price=data['price'],
-                            last_price=data['last_price'],
-                            change=data['change'],
-                            change_percentage=data['change_percentage']
-                        )
-                        session.add(fair_value)
-
-                    saved_count += 1
-
-                session.commit()
-                logger.info(f"💾 Saved {saved_count} fair value records to database")
+        Args:
+            session: SQLAlchemy session
+            fair_values_data: List of fair value data to save
+            newest: Receives the newest released_at of the written rows per language
 
-            except Exception as e:
-                session.rollback()
-                logger.error(f"❌ Error saving fair values: {e}")
-                raise
+        Returns:
+            Counts of inserted, updated and skipped records
+        """
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+        stock_ids = dimension_cache.get_ids(session, Stock, {data['symbol'] for data in fair_values_data})
+
+        # New sources default to the "financial services companies" type
+        source_type_ids = dimension_cache.get_or_create_many(
+            session, SourceType, [('financial services companies', 'شركات خدمات مالية')])
+        source_ids = dimension_cache.get_or_create_many(
+            session, Source,
+            ((data['source_name'], data['source_name_ar']) for data in fair_values_data),
+            extra={'type_id': source_type_ids['financial services companies']}
+        )
+        recommendation_ids = dimension_cache.get_or_create_many(
+            session, Recommendation,
+            ((data['recommendation_name'], data['recommendation_name_ar']) for data in fair_values_data)
+        )
+
+        # Later rows win, as they did with row-by-row updates
+        rows = {}
+        for data in fair_values_data:
+            stock_id = stock_ids.get(data['symbol'])
+            if not stock_id:
+                logger.warning(f"Stock not found for symbol: {data['symbol']}")
+                counts['skipped'] += 1
+                continue
+
+            language = data.get('language')
+            if newest is not None and data['released_at'] and (
+                    language not in newest or data['released_at'] > newest[language]):
+                newest[language] = data['released_at']
+
+            row = {
+                'stock_id': stock_id,
+                'released_at': data['released_at'],
+                'source_id': source_ids.get(data['source_name']),
+                'recommendation_id': recommendation_ids.get(data['recommendation_name']),
+                'value': data['value'],
+                'price': data['price'],
+                'last_price': data['last_price'],
+                'change': data['change'],
+                'change_percentage': data['change_percentage']
+            }
+            rows[(row['stock_id'], row['released_at'], row['source_id'])] = row
+
+        keyed_rows = [row for key, row in rows.items() if None not in key]
+        if keyed_rows:
+            inserted, updated = upsert_counting(
+                session, FairValue.__table__, keyed_rows, ['released_at', 'source_id', 'stock_id'],
+                [column for column in keyed_rows[0] if column not in ('released_at', 'source_id', 'stock_id')]
+            )
+            counts['inserted'] += inserted
+            counts['updated'] += updated
+
+        unkeyed = {key: row for key, row in rows.items() if None in key}
+        if unkeyed:
+            existing = self._existing_fair_value_ids(session, unkeyed.values())
+            updates = [{'id': existing[key], **row} for key, row in unkeyed.items() if key in existing]
+            inserts = [row for key, row in unkeyed.items() if key not in existing]
+            if updates:
+                session.execute(update(FairValue), updates)
+            if inserts:
+                session.execute(insert(FairValue), inserts)
+            counts['updated'] += len(updates)
+            counts['inserted'] += len(inserts)
+
+        return counts
+
+    def _existing_fair_value_ids(self, session, rows) -> Dict[tuple, int]:
+        """
+        Look up which of a batch's fair values are already stored, in one query.
+
+        NULL released_at/source_id values are matched with IS NULL, so rows the
+        unique constraint can't see are still found and updated.
+
+        Args:
+            session: SQLAlchemy session
+            rows: Row dicts with stock_id, released_at and source_id
+
+        Returns:
+            Mapping of (stock_id, released_at, source_id) to fair value id
+        """
+        rows = list(rows)
+        if not rows:
+            return {}
+
+        def matches(column, values):
+            known = {value for value in values if value is not None}
+            conditions = ([column.in_(known)] if known else []) + ([column.is_(None)] if None in values else [])
+            return or_(*conditions)
+
+        query = select(FairValue.stock_id, FairValue.released_at, FairValue.source_id, FairValue.id).where(
+            FairValue.stock_id.in_({row['stock_id'] for row in rows}),
+            matches(FairValue.released_at, {row['released_at'] for row in rows}),
+            matches(FairValue.source_id, {row['source_id'] for row in rows})
+        )
 
-        return saved_count
+        return {(stock_id, released_at, source_id): fair_value_id
+                for stock_id, released_at, source_id, fair_value_id in session.execute(query).all()}
 
 
 # Global instance
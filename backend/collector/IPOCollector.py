@@ -10,13 +10,24 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 
-from shared import config_manager, logger, http_client, time_method, log_error_with_exception, get_session
+from shared import config_manager, logger, http_client, time_method, log_error_with_exception, iter_pages
+from sqlalchemy import or_, select
+from sqlalchemy.orm import aliased
+
+from shared import dimension_cache, run_sync_transaction, get_async_session, snapshot_cache, Snapshot, report_progress
 from data.models.ipo import IPO
 from data.models.ipo_status import IPOStatus
 from data.models.ipo_type import IPOType
 from data.models.sector import Sector
 from data.models.market import Market
 from data.models.stock import Stock
+from .bilingual_join import BilingualJoiner, ENGLISH, ARABIC
+from .pipeline import CollectionPipeline
+
+# Snapshot cache entry serving GET /ipos
+IPOS_SNAPSHOT = 'ipos'
+# Single-flight job name of IPO collections
+IPO_JOB = 'ipos'
 
 
 class IPOCollector:
@@ -30,7 +41,7 @@ class IPOCollector:
         self.english_base = self.config.get('english_base', 'https://english.mubasher.info/')
         self.ipos_endpoint = self.config.get('ipos', 'api/1/ipos?country=eg&size={size}&start={start}')
         self.max_size = self.config.get('max_size', 30)
-        self.request_delay = self.config.get('request_delay', 1.0)
+        self.max_concurrency = self.config.get('max_concurrency', 4)
 
     async def _fetch_ipos_arabic(self, page: int = 0, size: int = 0) -> Dict[str, Any]:
         """
@@ -135,69 +146,160 @@ class IPOCollector:
         """
         Collect IPO data from both Arabic and English endpoints.
 
+        Both languages are crawled concurrently and joined as pages arrive, so each
+        IPO comes out as one record carrying both the English and Arabic columns.
+
         Args:
             max_pages: Maximum number of pages to fetch (None for all)
 
         Returns:
-            List of collected IPO data
+            List of merged IPO data
         """
         collected_data = []
 
-        # Fetch from English endpoint first (primary)
-        english_data = await self._collect_from_endpoint(
-            self._fetch_ipos_english, max_pages, "English"
-        )
-        collected_data.extend(english_data)
+        async def collect(records: List[Dict[str, Any]]):
+            collected_data.extend(records)
 
-        # Fetch from Arabic endpoint
-        arabic_data = await self._collect_from_endpoint(
-            self._fetch_ipos_arabic, max_pages, "Arabic"
-        )
-        collected_data.extend(arabic_data)
+        await self._crawl_bilingual(max_pages, collect)
 
         logger.info(f"🎉 Collected total {len(collected_data)} IPO records")
         return collected_data
 
-    async def _collect_from_endpoint(self, fetch_func, max_pages: Optional[int], language: str) -> List[Dict[str, Any]]:
+    @time_method
+    async def collect_and_save_ipos(self, max_pages: Optional[int] = None) -> int:
+        """
+        Collect IPOs and stream the merged records into the database as they are joined.
+
+        Args:
+            max_pages: Maximum number of pages to fetch per language (None for all)
+
+        Returns:
+            Number of records saved
+        """
+        pipeline = CollectionPipeline(self.save_ipos, name="IPOs")
+        stats = await pipeline.run(self._crawl_bilingual(max_pages, pipeline.put))
+        return stats['rows_written']
+
+    async def _crawl_bilingual(self, max_pages: Optional[int], emit):
         """
-        Collect data from a specific endpoint.
+        Crawl both languages concurrently and emit merged records as they are joined.
+
+        Args:
+            max_pages: Maximum number of pages to fetch per language (None for all)
+            emit: Coroutine function receiving each list of merged records
+        """
+        joiner = BilingualJoiner(self._merge_ipo_rows, "IPOs")
+
+        async def crawl(fetch_func, language: str):
+            async for page, rows in self._iter_endpoint_pages(fetch_func, max_pages, language):
+                merged_rows = []
+                for processed_row in rows:
+                    merged = joiner.add(language, self._join_key(processed_row), processed_row,
+                                        self._natural_key(processed_row))
+                    if merged:
+                        merged_rows.append(merged)
+                if merged_rows:
+                    await emit(merged_rows)
+
+        await asyncio.gather(
+            crawl(self._fetch_ipos_english, ENGLISH),
+            crawl(self._fetch_ipos_arabic, ARABIC)
+        )
+
+        unmatched = joiner.flush()
+        if unmatched:
+            await emit(unmatched)
+        logger.info(f"🔗 Joined {joiner.matched} IPOs bilingually, {len(unmatched)} English-only, "
+                    f"{joiner.unmatched_arabic} Arabic-only dropped")
+
+    async def _iter_endpoint_pages(self, fetch_func, max_pages: Optional[int], language: str):
+        """
+        Yield (page, processed rows) for a specific endpoint as pages arrive.
 
         Args:
             fetch_func: Function to fetch data
             max_pages: Max pages to fetch
             language: Language for logging
+        """
+        is_arabic = language == ARABIC
+        try:
+            async for page, response in iter_pages(
+                lambda page: fetch_func(page, self.max_size),
+                max_pages, self.max_concurrency, f"{language} IPOs"
+            ):
+                rows = []
+                for row in response.get('rows', []):
+                    processed_row = self._process_ipo_row(row, is_arabic)
+                    if processed_row:
+                        rows.append(processed_row)
+                yield page, rows
+        except Exception as e:
+            logger.error(f"❌ Error fetching {language} IPOs: {e}")
+
+    def _join_key(self, processed_row: Dict[str, Any]) -> tuple:
+        """
+        Build the content key pairing the English and Arabic rows of one IPO.
+
+        Only language-neutral content is used: the announcement date, the volume,
+        the linked stock symbol and the attachment path. Translated labels (type,
+        status) are left out, so pairing never depends on Arabic names already being
+        stored, and the key never depends on the row's position, which differs
+        between the two separately fetched crawls whenever rows shift.
+
+        Args:
+            processed_row: Row returned by `_process_ipo_row`
 
         Returns:
-            List of collected data
+            Join key tuple
         """
-        data = []
-        page = 0
+        attachment = processed_row['attachment']
+        return (
+            processed_row['announced_at'],
+            self._normalize_volume(processed_row['volume']),
+            self._extract_stock_symbol(processed_row['url']),
+            (urlparse(attachment).path or None) if attachment else None
+        )
 
-        while max_pages is None or page < max_pages:
-            try:
-                response = await fetch_func(page, self.max_size)
-                rows = response.get('rows', [])
+    def _natural_key(self, processed_row: Dict[str, Any]) -> tuple:
+        """
+        Build the natural key of a processed IPO row within its language (name + announcement date).
 
-                if not rows:
-                    break
+        Args:
+            processed_row: Row returned by `_process_ipo_row`
 
-                for row in rows:
-                    processed_row = self._process_ipo_row(row, language == "Arabic")
-                    if processed_row:
-                        data.append(processed_row)
+        Returns:
+            Tuple identifying the IPO
+        """
+        name = processed_row['name'] or processed_row['name_ar']
+        return name, processed_row['announced_at']
 
-                number_of_pages = response.get('numberOfPages', 1)
-                if page + 1 >= number_of_pages:
-                    break
+    @staticmethod
+    def _normalize_volume(volume: Any) -> Optional[int]:
+        """Volume as an integer, whether the API sent a number or a formatted string like "1,000,000"."""
+        if volume is None or volume == '':
+            return None
+        try:
+            return int(float(str(volume).replace(',', '').strip()))
+        except ValueError:
+            return None
 
-                page += 1
-                await asyncio.sleep(self.request_delay)
+    def _merge_ipo_rows(self, english: Dict[str, Any], arabic: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge the English and Arabic versions of an IPO row.
 
-            except Exception as e:
-                logger.error(f"❌ Error fetching {language} IPOs page {page}: {e}")
-                break
+        Args:
+            english: Processed English row
+            arabic: Processed Arabic row
 
-        return data
+        Returns:
+            English row with the Arabic columns filled in
+        """
+        merged = dict(english)
+        for field in ('name_ar', 'status_ar', 'type_ar', 'market_ar', 'sector_ar'):
+            merged[field] = arabic[field]
+        merged['url'] = english['url'] or arabic['url']
+        merged['attachment'] = english['attachment'] or arabic['attachment']
+        return merged
 
     def _process_ipo_row(self, row: Dict[str, Any], is_arabic: bool = False) -> Optional[Dict[str, Any]]:
         """
@@ -239,9 +341,44 @@ class IPOCollector:
     @time_method
     async def save_ipos(self, ipos_data: List[Dict[str, Any]]) -> int:
         """
-        Save IPO data to the database.
+        Save IPO data to the database in one transaction.
+
+        The write runs on the async session, so fetches keep flowing while it waits on the DB.
+
+        Args:
+            ipos_data: List of IPO data to save
+
+        Returns:
+            Number of records saved
+        """
+        try:
+            saved_count = await run_sync_transaction(self._write_ipos, ipos_data)
+        except Exception as e:
+            logger.error(f"❌ Error saving IPOs: {e}")
+            raise
+
+        logger.info(f"💾 Saved {saved_count} IPO records to database")
+
+        # The committed batch makes the served listing stale
+        snapshot_cache.invalidate(IPOS_SNAPSHOT)
+        report_progress(rows=saved_count)
+        return saved_count
+
+    def _write_ipos(self, session, ipos_data: List[Dict[str, Any]]) -> int:
+        """
+        Write one batch of IPO data; the caller owns the transaction.
+
+        Statuses, types, markets, sectors and stocks are resolved for the whole batch
+        through the shared dimension cache, and existing IPOs are loaded with one query,
+        so lookups cost a fixed number of queries per batch rather than per row.
+
+        `ipos` has no unique constraint, so a row is matched against stored IPOs by
+        (name, announced_at) and, failing that, by its content key (announced_at,
+        volume, type, status, stock) when exactly one stored IPO has it, so an IPO
+        whose English name changed is updated rather than inserted twice.
 
         Args:
+            session: SQLAlchemy session
             ipos_data: List of IPO data to save
 
         Returns:
@@ -249,124 +386,171 @@ class IPOCollector:
         """
         saved_count = 0
 
-        with get_session() as session:
-            try:
-                for data in ipos_data:
-                    # Get or create related entities
-                    status_name = data.get('status')
-                    status_ar = data.get('status_ar')
-                    if status_name:
-                        ipo_status = session.query(IPOStatus).filter(IPOStatus.name == status_name).first()
-                        if not ipo_status:
-                            ipo_status = IPOStatus(name=status_name, name_ar=status_ar)
-                            session.add(ipo_status)
-                            session.flush()
-                        status_id = ipo_status.id
-                    else:
-                        status_id = None
-
-                    type_name = data.get('type')
-                    type_ar = data.get('type_ar')
-                    if type_name:
-                        ipo_type = session.query(IPOType).filter(IPOType.name == type_name).first()
-                        if not ipo_type:
-                            ipo_type = IPOType(name=type_name, name_ar=type_ar)
-                            session.add(ipo_type)
-                            session.flush()
-                        type_id = ipo_type.id
-                    else:
-                        type_id = None
-
-                    market_name = data.get('market')
-                    market_ar = data.get('market_ar')
-                    if market_name:
-                        market = session.query(Market).filter(Market.name == market_name).first()
-                        if not market:
-                            market = Market(name=market_name, name_ar=market_ar)
-                            session.add(market)
-                            session.flush()
-                        market_id = market.id
-                    else:
-                        market_id = None
-
-                    sector_name = data.get('sector')
-                    sector_ar = data.get('sector_ar')
-                    if sector_name:
-                        sector = session.query(Sector).filter(Sector.name == sector_name).first()
-                        if not sector:
-                            sector = Sector(name=sector_name, name_ar=sector_ar)
-                            session.add(sector)
-                            session.flush()
-                        sector_id = sector.id
-                    else:
-                        sector_id = None
-
-                    # Extract stock symbol from URL if matches pattern
-                    stock_id = None
-                    url = data.get('url')
-                    if url:
-                        parsed = urlparse(url)
-                        path_parts = parsed.path.strip('/').split('/')
-                        try:
-                            stocks_index = path_parts.index('stocks')
-                            if stocks_index + 1 < len(path_parts):
-                                stock_symbol = path_parts[stocks_index + 1]
-                                stock = session.query(Stock).filter(Stock.symbol == stock_symbol).first()
-                                if stock:
-                                    stock_id = stock.id
-                        except ValueError:
-                            pass
-
-                    # Get or create IPO based on name and announced_at
-                    name = data['name']
-                    announced_at = data['announced_at']
-
-                    if name and announced_at:
-                        existing = session.query(IPO).filter(
-                            IPO.name == name,
-                            IPO.announced_at == announced_at
-                        ).first()
-
-                        if existing:
-                            # Update existing
-                            existing.name_ar = data['name_ar']
-                            existing.url = data['url']
-                            existing.status_id = status_id
-                            existing.attachment = data['attachment']
-                            existing.type_id = type_id
-                            existing.market_id = market_id
-                            existing.sector_id = sector_id
-                            existing.volume = data['volume']
-                            existing.stock_id = stock_id
-                        else:
-                            # Create new
-                            ipo = IPO(
-                                name=name,
-                                name_ar=data['name_ar'],
-                                url=data['url'],
-                                status_id=status_id,
-                                attachment=data['attachment'],
-                                type_id=type_id,
-                                market_id=market_id,
-                                sector_id=sector_id,
-                                volume=data['volume'],
-                                announced_at=announced_at,
-                                stock_id=stock_id
-                            )
-                            session.add(ipo)
-
-                        saved_count += 1
-
-                session.commit()
-                logger.info(f"💾 Saved {saved_count} IPO records to database")
-
-            except Exception as e:
-                session.rollback()
-                logger.error(f"❌ Error saving IPOs: {e}")
-                raise
+        status_ids = dimension_cache.get_or_create_many(
+            session, IPOStatus, ((data.get('status'), data.get('status_ar')) for data in ipos_data))
+        type_ids = dimension_cache.get_or_create_many(
+            session, IPOType, ((data.get('type'), data.get('type_ar')) for data in ipos_data))
+        market_ids = dimension_cache.get_or_create_many(
+            session, Market, ((data.get('market'), data.get('market_ar')) for data in ipos_data))
+        sector_ids = dimension_cache.get_or_create_many(
+            session, Sector, ((data.get('sector'), data.get('sector_ar')) for data in ipos_data))
+
+        symbols = {data['url']: self._extract_stock_symbol(data.get('url')) for data in ipos_data}
+        stock_ids = dimension_cache.get_ids(session, Stock, {symbol for symbol in symbols.values() if symbol})
+
+        # Load every IPO this batch may update with one query
+        names = {data['name'] for data in ipos_data if data['name']}
+        dates = {data['announced_at'] for data in ipos_data if data['announced_at']}
+        candidates = session.query(IPO).filter(or_(IPO.name.in_(names), IPO.announced_at.in_(dates))).all() \
+            if names else []
+        existing_ipos = {(ipo.name, ipo.announced_at): ipo for ipo in candidates}
+        existing_by_content = {}
+        for ipo in candidates:
+            content_key = self._content_key(ipo.announced_at, ipo.volume, ipo.type_id, ipo.status_id, ipo.stock_id)
+            # Keys shared by several stored IPOs (or without a volume) can't tell them apart
+            existing_by_content[content_key] = None if content_key in existing_by_content or ipo.volume is None else ipo
+
+        for data in ipos_data:
+            # Get or create IPO based on name and announced_at
+            name = data['name']
+            announced_at = data['announced_at']
+            if not name or not announced_at:
+                continue
+
+            values = {
+                'name_ar': data['name_ar'],
+                'url': data['url'],
+                'status_id': status_ids.get(data.get('status')),
+                'attachment': data['attachment'],
+                'type_id': type_ids.get(data.get('type')),
+                'market_id': market_ids.get(data.get('market')),
+                'sector_id': sector_ids.get(data.get('sector')),
+                'volume': self._normalize_volume(data['volume']),
+                'stock_id': stock_ids.get(symbols.get(data['url']))
+            }
+            content_key = self._content_key(announced_at, values['volume'], values['type_id'],
+                                            values['status_id'], values['stock_id'])
+
+            existing = existing_ipos.get((name, announced_at)) or existing_by_content.get(content_key)
+            # Each stored IPO is claimed by one row only
+            existing_by_content.pop(content_key, None)
+            if existing:
+                # Update existing
+                existing.name = name
+                for column, value in values.items():
+                    setattr(existing, column, value)
+            else:
+                # Create new
+                ipo = IPO(name=name, announced_at=announced_at, **values)
+                session.add(ipo)
+                existing = ipo
+            existing_ipos[(name, announced_at)] = existing
+
+            saved_count += 1
 
         return saved_count
 
+    @staticmethod
+    def _content_key(announced_at: Optional[datetime], volume: Optional[int], type_id: Optional[int],
+                     status_id: Optional[int], stock_id: Optional[int]) -> tuple:
+        """Language-neutral key of a stored IPO (see `_write_ipos`)."""
+        return announced_at, volume, type_id, status_id, stock_id
+
+    def _extract_stock_symbol(self, url: Optional[str]) -> Optional[str]:
+        """
+        Extract the stock symbol from an IPO URL like /markets/EGX/stocks/SYMBOL.
+
+        Args:
+            url: IPO URL
+
+        Returns:
+            Stock symbol or None
+        """
+        if not url:
+            return None
+
+        path_parts = urlparse(url).path.strip('/').split('/')
+        try:
+            stocks_index = path_parts.index('stocks')
+        except ValueError:
+            return None
+        return path_parts[stocks_index + 1] if stocks_index + 1 < len(path_parts) else None
+
+    async def get_ipos_db(self) -> List[Dict[str, Any]]:
+        """
+        Retrieve every IPO, newest first, with one column-only joined query.
+
+        Returns:
+            List of IPO dicts in the IPOResponse shape
+        """
+        # The linked stock's own market and sector are joined under aliases
+        stock_market = aliased(Market)
+        stock_sector = aliased(Sector)
+
+        query = (
+            select(
+                IPO.id, IPO.name, IPO.name_ar, IPO.url, IPO.attachment, IPO.volume, IPO.announced_at,
+                IPOStatus.name.label('status'), IPOStatus.name_ar.label('status_ar'),
+                IPOType.name.label('type'), IPOType.name_ar.label('type_ar'),
+                Market.name.label('market'), Market.name_ar.label('market_ar'),
+                Sector.name.label('sector'), Sector.name_ar.label('sector_ar'),
+                Stock.id.label('stock_id'), Stock.symbol.label('stock_symbol'),
+                Stock.name_en.label('stock_name'), Stock.name_ar.label('stock_name_ar'),
+                Stock.currency.label('stock_currency'),
+                stock_market.name.label('stock_market'), stock_sector.name.label('stock_sector')
+            )
+            .join(Stock, IPO.stock_id == Stock.id, isouter=True)
+            .join(Sector, IPO.sector_id == Sector.id, isouter=True)
+            .join(Market, IPO.market_id == Market.id, isouter=True)
+            .join(IPOType, IPO.type_id == IPOType.id, isouter=True)
+            .join(IPOStatus, IPO.status_id == IPOStatus.id, isouter=True)
+            .join(stock_market, Stock.market_id == stock_market.id, isouter=True)
+            .join(stock_sector, Stock.sector_id == stock_sector.id, isouter=True)
+            .order_by(IPO.announced_at.desc())
+        )
+
+        async with get_async_session() as session:
+            rows = (await session.execute(query)).mappings().all()
+
+        ipos = []
+        for row in rows:
+            ipo = {key: row[key] for key in (
+                'id', 'name', 'name_ar', 'url', 'status', 'status_ar', 'attachment', 'type', 'type_ar',
+                'market', 'market_ar', 'sector', 'sector_ar'
+            )}
+            ipo.update({
+                'market_url': None,  # Not stored, set to None
+                'volume': row['volume'],
+                'announced_at': row['announced_at'],
+                'stock_symbol': row['stock_symbol'],
+                'stock_name': row['stock_name'],
+                'stock_name_ar': row['stock_name_ar'],
+                'stock_base_data': {
+                    'id': row['stock_id'],
+                    'symbol': row['stock_symbol'],
+                    'name': row['stock_name'],
+                    'name_ar': row['stock_name_ar'],
+                    'market': row['stock_market'],
+                    'sector': row['stock_sector'],
+                    'currency': row['stock_currency']
+                } if row['stock_id'] is not None else None
+            })
+            ipos.append(ipo)
+
+        logger.info(f"📊 Retrieved {len(ipos)} IPO records from database")
+        return ipos
+
+    async def get_ipos_snapshot(self) -> Snapshot:
+        """
+        Get the IPO listing as a cached, pre-serialized snapshot.
+
+        The snapshot is rebuilt only after `save_ipos` commits new data.
+
+        Returns:
+            Current IPOs snapshot
+        """
+        return await snapshot_cache.get(IPOS_SNAPSHOT, self.get_ipos_db)
+
 
 # Global instance
 ipo_collector = IPOCollector()
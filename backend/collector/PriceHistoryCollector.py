@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Price History Collector
+Backfills and refreshes OHLCV candles for every active stock into stock_prices.
+"""
+
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from shared import config_manager, logger, http_client, time_method, log_error_with_exception
+from shared import BulkLoader, CircuitOpenError, chart_cache, get_async_session, run_sync_transaction, upsert
+from shared.charting import RAW_INTERVAL
+from data.models.stock import Stock
+from data.models.StockPrice import StockPrice
+from data.models.price_checkpoint import PriceHistoryCheckpoint
+
+# Single-flight job name of price history collections
+PRICE_HISTORY_JOB = 'price_history'
+
+# Candle field aliases accepted from the chart API
+TIMESTAMP_KEYS = ('timestamp', 'time', 'date', 't')
+OHLCV_KEYS = {
+    'open_price': ('open', 'o'),
+    'high_price': ('high', 'h'),
+    'low_price': ('low', 'l'),
+    'close_price': ('close', 'c'),
+    'volume': ('volume', 'v'),
+    'adjusted_close': ('adjustedClose', 'adjusted_close', 'adjClose')
+}
+
+
+class PriceHistoryCollector:
+    """
+    Collects historical OHLCV candles per symbol with bounded concurrency.
+
+    Each symbol's history is crawled in fixed time windows from its checkpoint (or
+    `price_history.start`) up to now. Every window is bulk-loaded into stock_prices
+    and the symbol's checkpoint advanced before the next window is fetched, so at
+    most one window per symbol is held in memory, an interrupted backfill resumes
+    where it stopped, and daily runs only fetch new candles. Loads merge on
+    (stock_id, timestamp), so re-fetching the checkpoint window is harmless.
+
+    stock_prices has no interval column, so candles are always fetched at the one
+    stored resolution (`RAW_INTERVAL`); coarser intervals are resampled on read.
+    """
+
+    def __init__(self):
+        endpoints = config_manager.get('mubasher_endpoints', {})
+        self.config = config_manager.get('price_history', {})
+        self.base = endpoints.get('english_base', 'https://english.mubasher.info/')
+        self.endpoint = self.config.get('endpoint', 'api/1/stocks/{symbol}/chart?interval={interval}&from={start}&to={end}')
+        self.interval = RAW_INTERVAL
+        if self.config.get('interval', RAW_INTERVAL) != RAW_INTERVAL:
+            logger.warning(f"⚠️ price_history.interval is ignored: stock_prices stores {RAW_INTERVAL} candles only")
+        self.start = datetime.fromisoformat(self.config.get('start', '2000-01-01'))
+        self.window = timedelta(days=self.config.get('window_days', 90))
+        self.max_concurrency = self.config.get('max_concurrency', 4)
+        self.loader = BulkLoader(
+            StockPrice.__table__, ['stock_id', 'timestamp'],
+            batch_size=self.config.get('batch_size', 50000), partition_column='timestamp'
+        )
+        self.progress = self._new_progress(0, 0)
+
+    def _new_progress(self, symbols_total: int, windows_total: int) -> Dict[str, Any]:
+        return {
+            'running': False,
+            'symbols_total': symbols_total,
+            'symbols_done': 0,
+            'symbols_failed': 0,
+            'windows_total': windows_total,
+            'windows_done': 0,
+            'candles_loaded': 0,
+            'started_at': None,
+            'finished_at': None
+        }
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Get backfill progress with throughput and an ETA.
+
+        The ETA extrapolates the average time per completed window over the windows left.
+
+        Returns:
+            Progress counters, candles_per_second and eta_seconds
+        """
+        progress = dict(self.progress)
+        started = progress['started_at']
+        elapsed = ((progress['finished_at'] or datetime.now()) - started).total_seconds() if started else 0.0
+        done, total = progress['windows_done'], progress['windows_total']
+
+        progress['elapsed_seconds'] = round(elapsed, 1)
+        progress['candles_per_second'] = round(progress['candles_loaded'] / elapsed, 1) if elapsed else 0.0
+        progress['percent'] = round(100.0 * done / total, 1) if total else (100.0 if started else 0.0)
+        progress['eta_seconds'] = round(elapsed / done * (total - done), 1) if progress['running'] and done else None
+        return progress
+
+    def _build_url(self, symbol: str, start: datetime, end: datetime) -> str:
+        """
+        Build the chart URL for one window.
+
+        The endpoint template may use {symbol}, {interval}, {start}/{end} (ISO dates)
+        and {start_ts}/{end_ts} (epoch seconds).
+        """
+        path = self.endpoint.format(
+            symbol=symbol,
+            interval=self.interval,
+            start=start.date().isoformat(),
+            end=end.date().isoformat(),
+            start_ts=int(start.replace(tzinfo=timezone.utc).timestamp()),
+            end_ts=int(end.replace(tzinfo=timezone.utc).timestamp())
+        )
+        return f"{self.base}{path}"
+
+    async def _fetch_candles(self, symbol: str, start: datetime, end: datetime) -> Any:
+        """
+        Fetch one window of candles for a symbol.
+
+        Args:
+            symbol: Stock symbol
+            start: Window start
+            end: Window end
+
+        Returns:
+            Parsed JSON payload
+        """
+        url = self._build_url(symbol, start, end)
+        logger.debug(f"🌐 Fetching {symbol} candles from: {url}")
+
+        response = await http_client.get(url)
+        response.raise_for_status()
+        return response.json()
+
+    def _parse_timestamp(self, value: Any) -> Optional[datetime]:
+        """
+        Parse a candle timestamp (epoch seconds/milliseconds or ISO string) to naive UTC.
+
+        Args:
+            value: Raw timestamp
+
+        Returns:
+            Parsed datetime or None
+        """
+        if value is None:
+            return None
+        try:
+            if isinstance(value, (int, float)):
+                seconds = value / 1000 if value > 1e11 else value
+                return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+        except (ValueError, OverflowError, OSError):
+            logger.warning(f"Could not parse candle timestamp: {value}")
+            return None
+
+    def _parse_candles(self, payload: Any, stock_id: int) -> Iterator[Dict[str, Any]]:
+        """
+        Turn a chart payload into stock_prices rows.
+
+        Accepts a list of candle objects (optionally under `rows`/`data`/`candles`)
+        or column arrays (`t`/`o`/`h`/`l`/`c`/`v`). Candles without a timestamp
+        or close are skipped.
+
+        Args:
+            payload: Parsed JSON payload
+            stock_id: Stock the candles belong to
+
+        Yields:
+            Row dicts for stock_prices
+        """
+        if isinstance(payload, dict):
+            if isinstance(payload.get('t'), list):
+                columns = {key: payload.get(key) or [] for key in ('t', 'o', 'h', 'l', 'c', 'v')}
+                payload = [
+                    {key: values[index] if index < len(values) else None for key, values in columns.items()}
+                    for index in range(len(columns['t']))
+                ]
+            else:
+                payload = payload.get('rows') or payload.get('data') or payload.get('candles') or []
+
+        for candle in payload:
+            timestamp = self._parse_timestamp(next((candle[key] for key in TIMESTAMP_KEYS if key in candle), None))
+            row = {'stock_id': stock_id, 'timestamp': timestamp}
+            for column, keys in OHLCV_KEYS.items():
+                row[column] = next((candle[key] for key in keys if candle.get(key) is not None), None)
+            if row['timestamp'] is None or row['close_price'] is None:
+                continue
+            if row['volume'] is not None:
+                row['volume'] = int(row['volume'])
+            yield row
+
+    async def _get_active_stocks(self, symbols: Optional[List[str]] = None) -> List[Tuple[int, str]]:
+        """Get (id, symbol) of active stocks, optionally limited to `symbols`."""
+        query = select(Stock.id, Stock.symbol).where(Stock.is_active == True).order_by(Stock.symbol)
+        if symbols:
+            query = query.where(Stock.symbol.in_(symbols))
+        async with get_async_session() as session:
+            return [(stock_id, symbol) for stock_id, symbol in (await session.execute(query)).all()]
+
+    async def _get_checkpoints(self) -> Dict[int, datetime]:
+        """Get the last loaded candle timestamp per stock."""
+        async with get_async_session() as session:
+            result = await session.execute(
+                select(PriceHistoryCheckpoint.stock_id, PriceHistoryCheckpoint.last_timestamp)
+            )
+            return dict(result.all())
+
+    def _write_checkpoint(self, session, stock_id: int, last_timestamp: datetime):
+        """Upsert a stock's checkpoint; the caller owns the transaction."""
+        upsert(session, PriceHistoryCheckpoint.__table__, [{
+            'stock_id': stock_id,
+            'last_timestamp': last_timestamp,
+            'updated_at': datetime.utcnow()
+        }], ['stock_id'], ['last_timestamp', 'updated_at'])
+
+    def _windows(self, since: datetime, until: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Split [since, until) into fetch windows."""
+        window_start = since
+        while window_start < until:
+            window_end = min(window_start + self.window, until)
+            yield window_start, window_end
+            window_start = window_end
+
+    def _count_windows(self, since: datetime, until: datetime) -> int:
+        return max(0, math.ceil((until - since) / self.window))
+
+    async def collect_symbol_history(self, stock_id: int, symbol: str, since: datetime, until: datetime) -> int:
+        """
+        Crawl one symbol's candles window by window, loading and checkpointing each.
+
+        Args:
+            stock_id: Stock id
+            symbol: Stock symbol
+            since: First timestamp to fetch (the checkpoint or configured start)
+            until: End of the crawl (now)
+
+        Returns:
+            Number of candles loaded
+        """
+        loaded = 0
+        for window_start, window_end in self._windows(since, until):
+            payload = await self._fetch_candles(symbol, window_start, window_end)
+            rows = list(self._parse_candles(payload, stock_id))
+
+            if rows:
+                stats = await asyncio.to_thread(self.loader.load, rows)
+                await run_sync_transaction(self._write_checkpoint, stock_id, max(row['timestamp'] for row in rows))
+                loaded += stats['rows']
+                self.progress['candles_loaded'] += stats['rows']
+            elif window_end < until:
+                # Empty past windows (before listing, suspensions) are not re-crawled next time
+                await run_sync_transaction(self._write_checkpoint, stock_id, window_end)
+
+            self.progress['windows_done'] += 1
+
+        if loaded:
+            chart_cache.invalidate(symbol)
+        return loaded
+
+    @time_method
+    async def collect_price_history(self, symbols: Optional[List[str]] = None) -> int:
+        """
+        Backfill or refresh candles for every active stock.
+
+        Symbols are crawled concurrently (up to `price_history.max_concurrency`);
+        a failing symbol is logged and skipped, and picks up from its checkpoint on
+        the next run.
+
+        Args:
+            symbols: Limit the run to these symbols (None for every active stock)
+
+        Returns:
+            Number of candles loaded
+        """
+        if self.progress['running']:
+            raise RuntimeError("Price history collection is already running")
+
+        stocks = await self._get_active_stocks(symbols)
+        checkpoints = await self._get_checkpoints()
+        until = datetime.utcnow()
+        since_by_stock = {stock_id: checkpoints.get(stock_id, self.start) for stock_id, _ in stocks}
+
+        self.progress = self._new_progress(
+            len(stocks), sum(self._count_windows(since, until) for since in since_by_stock.values())
+        )
+        self.progress.update({'running': True, 'started_at': datetime.now()})
+        logger.info(f"🕯️ Collecting {self.interval} price history for {len(stocks)} stocks "
+                    f"({self.progress['windows_total']} windows)")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def collect(stock_id: int, symbol: str) -> int:
+            async with semaphore:
+                try:
+                    loaded = await self.collect_symbol_history(stock_id, symbol, since_by_stock[stock_id], until)
+                    self.progress['symbols_done'] += 1
+                    logger.info(f"✅ {symbol}: {loaded} candles loaded "
+                                f"({self.progress['symbols_done']}/{self.progress['symbols_total']} symbols)")
+                    return loaded
+                except CircuitOpenError as e:
+                    self.progress['symbols_failed'] += 1
+                    logger.warning(f"⚡ {symbol}: skipped, {e}")
+                except Exception as e:
+                    self.progress['symbols_failed'] += 1
+                    log_error_with_exception(f"❌ {symbol}: price history collection failed")
+                return 0
+
+        try:
+            results = await asyncio.gather(*(collect(stock_id, symbol) for stock_id, symbol in stocks))
+        finally:
+            self.progress.update({'running': False, 'finished_at': datetime.now()})
+
+        total = sum(results)
+        logger.info(f"🎉 Price history collection completed: {total} candles, "
+                    f"{self.progress['symbols_failed']} symbols failed")
+        return total
+
+
+# Global instance
+price_history_collector = PriceHistoryCollector()
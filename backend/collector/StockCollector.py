@@ -9,8 +9,18 @@ import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from shared import config_manager, logger, http_client, time_method, log_error_with_exception, get_session
-from data import entities, StockResponse
+from sqlalchemy import func, select, update
+
+from shared import config_manager, logger, http_client, time_method, log_error_with_exception, CircuitOpenError
+from shared import upsert, dimension_cache, get_async_session, run_sync_transaction, snapshot_cache, Snapshot
+from shared import job_manager, report_progress, CrawlStatus
+from data import entities
+from .IPOCollector import IPOS_SNAPSHOT
+
+# Snapshot cache entry serving GET /stocks
+STOCKS_SNAPSHOT = 'stocks'
+# Single-flight job name of stock collections
+STOCK_JOB = 'stocks'
 
 
 class StockCollector:
@@ -24,7 +34,6 @@ class StockCollector:
         self.english_base = self.config.get('english_base', 'https://english.mubasher.info/')
         self.listed_companies_endpoint = self.config.get('listed_companies', 'api/1/listed-companies?country=eg&size={size}&start={start}')
         self.max_size = self.config.get('max_size', 30)
-        self.request_delay = self.config.get('request_delay', 1.0)
 
     async def _fetch_stocks_arabic(self, page: int = 0, size: int = 0) -> Dict[str, Any]:
         """
@@ -137,19 +146,24 @@ class StockCollector:
             logger.warning(f"⚠️ Failed to parse date: {last_update_str}")
             return None
 
-    async def collect_all_stocks(self) -> List[Dict[str, Any]]:
+    async def collect_all_stocks(self, status: Optional[CrawlStatus] = None) -> List[Dict[str, Any]]:
         """
         Collect all stocks from both Arabic and English endpoints.
 
+        Args:
+            status: Receives whether every listing page was collected
+
         Returns:
             List of merged stock data dictionaries
         """
         logger.info("🚀 Starting stock collection from Mubasher API")
+        status = status if status is not None else CrawlStatus()
 
         all_stocks = []
         page = 0
+        total_pages = 1
 
-        while True:
+        while page < total_pages:
             try:
                 # Fetch data from both endpoints concurrently
                 ar_task = self._fetch_stocks_arabic(page, 600)
@@ -166,107 +180,115 @@ class StockCollector:
                     ar_data.get('numberOfPages', 1),
                     en_data.get('numberOfPages', 1)
                 )
+                report_progress(pages=2, pages_total=2 * total_pages if page == 0 else None)
 
                 logger.info(f"📄 Collected page {page + 1}/{total_pages} with {len(page_stocks)} stocks")
 
-                if page + 1 >= total_pages:
-                    break
-
-                page += 1
-
-                # Add delay between requests
-                if self.request_delay > 0:
-                    await asyncio.sleep(self.request_delay)
+            except CircuitOpenError as e:
+                logger.error(f"❌ Mubasher unavailable, stopping stock collection: {e}")
+                status.failed_pages.extend(range(page, total_pages))
+                break
 
             except Exception as e:
+                # Skip the failing page rather than aborting the whole crawl
                 log_error_with_exception(f"❌ Error collecting stocks from page {page}")
-                break
+                status.failed_pages.append(page)
+
+            page += 1
 
-        logger.info(f"✅ Collected total of {len(all_stocks)} stocks")
+        status.complete = not status.failed_pages
+        logger.info(f"✅ Collected total of {len(all_stocks)} stocks"
+                    + ("" if status.complete else f", missing pages {status.failed_pages}"))
         return all_stocks
 
-    def save_stocks_to_db(self, stocks_data: List[Dict[str, Any]]) -> int:
+    async def save_stocks_to_db(self, stocks_data: List[Dict[str, Any]], mark_missing_inactive: bool = False) -> int:
         """
-        Save stock data to the database.
+        Save stock data to the database with set-based statements.
+
+        Sectors and markets are resolved through the shared dimension cache
+        (missing ones inserted in one statement each), every stock is upserted with a single
+        INSERT ... ON CONFLICT (symbol) DO UPDATE, and symbols absent from the
+        snapshot can be marked inactive, all in one transaction on the async session.
 
         Args:
             stocks_data: List of stock data dictionaries
+            mark_missing_inactive: Deactivate stocks not present in the snapshot; only
+                pass True for a complete listing, or a failed page deactivates its stocks
 
         Returns:
             Number of stocks saved/updated
         """
-        saved_count = 0
+        # The last occurrence of a symbol wins; ON CONFLICT can't touch a row twice per statement
+        snapshot = {stock_data['symbol']: stock_data for stock_data in stocks_data if stock_data.get('symbol')}
+        if not snapshot:
+            return 0
 
         try:
-            with get_session() as session:
-                for stock_data in stocks_data:
-                    try:
-                        # Parse last update
-                        last_update = self._parse_last_update(stock_data.get('last_update_str'))
-
-                        # Check if stock already exists
-                        existing_stock = session.query(entities.Stock).filter(entities.Stock.symbol == stock_data['symbol']).first()
-
-                        # Get or create sector
-                        sector_en = stock_data.get('sector_en')
-                        sector_ar = stock_data.get('sector_ar')
-                        sector = session.query(entities.Sector).filter(entities.Sector.name == sector_en).first()
-                        if not sector:
-                            sector = entities.Sector(name=sector_en, name_ar=sector_ar)
-                            session.add(sector)
-                            session.flush()  # Get the ID
-
-                        # Get or create market
-                        market_en = stock_data.get('market_en')
-                        market_ar = stock_data.get('market_ar')
-                        market = session.query(entities.Market).filter(entities.Market.name == market_en).first()
-                        if not market:
-                            market = entities.Market(name=market_en, name_ar=market_ar)
-                            session.add(market)
-                            session.flush()  # Get the ID
-
-                        if existing_stock:
-                            # Update existing stock
-                            existing_stock.name_en = stock_data.get('name_en')
-                            existing_stock.name_ar = stock_data.get('name_ar')
-                            existing_stock.sector_id = sector.id
-                            existing_stock.market_id = market.id
-                            existing_stock.currency = stock_data.get('currency') or 'EGP'
-                            existing_stock.profile_url = stock_data.get('profile_url')
-                            existing_stock.current_price = stock_data.get('current_price')
-                            existing_stock.change_percentage = stock_data.get('change_percentage')
-                            existing_stock.last_update = last_update
-                            existing_stock.is_active = True
-                        else:
-                            # Create new stock
-                            new_stock = entities.Stock(
-                                symbol=stock_data['symbol'],
-                                name_en=stock_data.get('name_en'),
-                                name_ar=stock_data.get('name_ar'),
-                                sector_id=sector.id,
-                                market_id=market.id,
-                                currency=stock_data.get('currency') or 'EGP',
-                                profile_url=stock_data.get('profile_url'),
-                                current_price=stock_data.get('current_price'),
-                                change_percentage=stock_data.get('change_percentage'),
-                                last_update=last_update,
-                                is_active=True
-                            )
-                            session.add(new_stock)
-
-                        saved_count += 1
-
-                    except Exception as e:
-                        log_error_with_exception(f"❌ Error saving stock {stock_data.get('symbol')}")
-                        continue
-
-                session.commit()
-                logger.info(f"💾 Saved/updated {saved_count} stocks in database")
-
+            saved_count = await run_sync_transaction(self._write_stocks, snapshot, mark_missing_inactive)
         except Exception as e:
             log_error_with_exception("❌ Database error while saving stocks")
             raise
 
+        logger.info(f"💾 Saved/updated {saved_count} stocks in database")
+        report_progress(rows=saved_count)
+
+        # New symbols were written outside the cache, and the served lists are stale
+        # (IPOs embed the linked stock's name, market and sector)
+        dimension_cache.invalidate(entities.Stock)
+        snapshot_cache.invalidate(STOCKS_SNAPSHOT)
+        snapshot_cache.invalidate(IPOS_SNAPSHOT)
+
+        return saved_count
+
+    def _write_stocks(self, session, snapshot: Dict[str, Dict[str, Any]], mark_missing_inactive: bool) -> int:
+        """
+        Write a stock listing snapshot; the caller owns the transaction.
+
+        Args:
+            session: SQLAlchemy session
+            snapshot: Stock data keyed by symbol
+            mark_missing_inactive: Deactivate stocks not present in the snapshot
+
+        Returns:
+            Number of stocks saved/updated
+        """
+        sector_ids = dimension_cache.get_or_create_many(session, entities.Sector, (
+            (stock_data.get('sector_en'), stock_data.get('sector_ar')) for stock_data in snapshot.values()
+        ))
+        market_ids = dimension_cache.get_or_create_many(session, entities.Market, (
+            (stock_data.get('market_en'), stock_data.get('market_ar')) for stock_data in snapshot.values()
+        ))
+
+        rows = [
+            {
+                'symbol': symbol,
+                'name_en': stock_data.get('name_en'),
+                'name_ar': stock_data.get('name_ar'),
+                'sector_id': sector_ids.get(stock_data.get('sector_en')),
+                'market_id': market_ids.get(stock_data.get('market_en')),
+                'currency': stock_data.get('currency') or 'EGP',
+                'profile_url': stock_data.get('profile_url'),
+                'current_price': stock_data.get('current_price'),
+                'change_percentage': stock_data.get('change_percentage'),
+                'last_update': self._parse_last_update(stock_data.get('last_update_str')),
+                'is_active': True
+            }
+            for symbol, stock_data in snapshot.items()
+        ]
+        saved_count = upsert(
+            session, entities.Stock.__table__, rows, ['symbol'],
+            [column for column in rows[0] if column != 'symbol']
+        )
+
+        if mark_missing_inactive:
+            result = session.execute(
+                update(entities.Stock)
+                .where(entities.Stock.symbol.not_in(list(snapshot)), entities.Stock.is_active == True)
+                .values(is_active=False)
+            )
+            if result.rowcount:
+                logger.info(f"📴 Marked {result.rowcount} stocks missing from the listing as inactive")
+
         return saved_count
 
     @time_method
@@ -280,52 +302,76 @@ class StockCollector:
         logger.info("🎯 Starting complete stock collection and database update")
 
         # Collect data from API
-        stocks_data = await self.collect_all_stocks()
+        status = CrawlStatus()
+        stocks_data = await self.collect_all_stocks(status)
 
         if not stocks_data:
             logger.warning("⚠️ No stock data collected")
             return 0
 
-        # Save to database
-        saved_count = self.save_stocks_to_db(stocks_data)
+        # Save to database; only a complete listing says which stocks were delisted
+        if not status.complete:
+            logger.warning("⚠️ Stock listing incomplete, not deactivating stocks missing from it")
+        saved_count = await self.save_stocks_to_db(stocks_data, mark_missing_inactive=status.complete)
 
         logger.info(f"🎉 Stock collection completed: {saved_count} stocks processed")
         return saved_count
 
     @time_method
-    async def get_stocks_db(self) -> List[StockResponse]:
+    async def get_stocks_db(self) -> List[Dict[str, Any]]:
         """
-        Retrieve all active stocks from the database.
+        Retrieve all active stocks from the database with one joined query.
+
+        Sector and market names come from outer joins in the same SELECT and rows
+        are returned as plain dicts in the StockResponse shape, so no ORM objects
+        or relationship loads are involved.
 
         Returns:
-            List of Stock entities
+            List of stock dicts
         """
+        Stock, Sector, Market = entities.Stock, entities.Sector, entities.Market
+        query = (
+            select(
+                func.coalesce(Stock.symbol, '').label('symbol'),
+                func.coalesce(Stock.name_en, '').label('name_en'),
+                func.coalesce(Stock.name_ar, '').label('name_ar'),
+                func.coalesce(Sector.name, '').label('sector_en'),
+                func.coalesce(Sector.name_ar, '').label('sector_ar'),
+                func.coalesce(Market.name, '').label('market_en'),
+                func.coalesce(Market.name_ar, '').label('market_ar'),
+                Stock.currency,
+                Stock.profile_url,
+                Stock.current_price,
+                Stock.change_percentage,
+                Stock.last_update,
+                Stock.is_active
+            )
+            .outerjoin(Sector, Stock.sector_id == Sector.id)
+            .outerjoin(Market, Stock.market_id == Market.id)
+            .where(Stock.is_active == True)
+            .order_by(Stock.symbol)
+        )
+
         try:
-            with get_session() as session:
-                stocks = session.query(entities.Stock).filter(entities.Stock.is_active == True).all()
-                logger.info(f"📊 Retrieved {len(stocks)} active stocks from database")
-
-                return [
-                    StockResponse(
-                        symbol=stock.symbol or "",
-                        name_en=stock.name_en or "",
-                        name_ar=stock.name_ar or "",
-                        sector_en=stock.sector.name if stock.sector and stock.sector.name else "",
-                        sector_ar=stock.sector.name_ar if stock.sector and stock.sector.name_ar else "",
-                        market_en=stock.market.name if stock.market and stock.market.name else "",
-                        market_ar=stock.market.name_ar if stock.market and stock.market.name_ar else "",
-                        currency=stock.currency,
-                        profile_url=stock.profile_url,
-                        current_price=stock.current_price,
-                        change_percentage=stock.change_percentage,
-                        last_update=stock.last_update,
-                        is_active=stock.is_active
-                    )
-                    for stock in stocks
-                ]
+            async with get_async_session() as session:
+                stocks = [dict(row) for row in (await session.execute(query)).mappings()]
         except Exception as e:
             log_error_with_exception("❌ Error retrieving stocks from database")
-        return []
+            raise
+
+        logger.info(f"📊 Retrieved {len(stocks)} active stocks from database")
+        return stocks
+
+    async def get_stocks_snapshot(self) -> Snapshot:
+        """
+        Get the active stock list as a cached, pre-serialized snapshot.
+
+        The snapshot is rebuilt only after `save_stocks_to_db` commits new data.
+
+        Returns:
+            Current stocks snapshot
+        """
+        return await snapshot_cache.get(STOCKS_SNAPSHOT, self.get_stocks_db)
 
 # Global collector instance
 stock_collector = StockCollector()
@@ -356,7 +402,8 @@ async def run_stock_collection() -> int:
         Number of stocks collected and saved
     """
     try:
-        stocks_collected = await stock_collector.collect_and_save_stocks()
+        # Joins the in-flight collection, if any, instead of starting another
+        stocks_collected = await job_manager.run(STOCK_JOB, stock_collector.collect_and_save_stocks)
         logger.info(f"✅ Stock collection completed: {stocks_collected} stocks processed")
         return stocks_collected
     except Exception as e:
@@ -4,6 +4,8 @@
 from .StockCollector import stock_collector, StockCollector
 from .FairValueCollector import fair_value_collector, FairValueCollector
 from .IPOCollector import ipo_collector, IPOCollector
+from .PriceHistoryCollector import price_history_collector, PriceHistoryCollector
+from .pipeline import CollectionPipeline
 from .api.main import app as collector_app
 
 __all__ = [
@@ -13,5 +15,8 @@ __all__ = [
     'FairValueCollector',
     'ipo_collector',
     'IPOCollector',
+    'price_history_collector',
+    'PriceHistoryCollector',
+    'CollectionPipeline',
     'collector_app'
 ]
\ No newline at end of file
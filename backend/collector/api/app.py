@@ -2,6 +2,8 @@
 FastAPI application setup and configuration.
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,7 +11,8 @@ import shared as sh
 from shared import logger
 from data import entities, responses
 
-from .routes import health_check, get_collector_config, collect_stocks, collect_stocks_sync, get_stocks, collect_fair_values, collect_fair_values_sync, get_fair_values, collect_ipos, collect_ipos_sync, get_ipos
+from .middleware import CacheControlMiddleware, CompressionMiddleware
+from .routes import health_check, get_collector_config, collect_stocks, collect_stocks_sync, get_stocks, get_stock_prices, collect_fair_values, collect_fair_values_sync, get_fair_values, collect_ipos, collect_ipos_sync, get_ipos, collect_price_history, get_price_history_progress, get_job, list_jobs
 from typing import List
 
 # Create FastAPI app
@@ -28,6 +31,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],  # Caching and pagination headers
+)
+
+# Market-aware Cache-Control on validated responses, then compression (outermost)
+app.add_middleware(CacheControlMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=sh.config_manager.get('http.compression_min_size', 1024),
+    gzip_level=sh.config_manager.get('http.gzip_level', 6),
+    brotli_quality=sh.config_manager.get('http.brotli_quality', 5),
+    cache_entries=sh.config_manager.get('http.compressed_cache_entries', 32)
 )
 
 app.get("/health", response_model=responses.HealthResponse)(health_check)
@@ -35,12 +49,17 @@ app.get("/config")(get_collector_config)
 app.post("/collect/stocks", response_model=responses.StockCollectionResponse)(collect_stocks)
 app.get("/collect/stocksSync", response_model=responses.StockCollectionResponse)(collect_stocks_sync)
 app.get("/stocks", response_model=List[responses.StockResponse])(get_stocks)
+app.get("/stocks/{symbol}/prices", response_model=responses.PriceHistoryResponse)(get_stock_prices)
 app.post("/collect/fairValues", response_model=responses.FairValueCollectionResponse)(collect_fair_values)
 app.get("/collect/fairValuesSync", response_model=responses.FairValueCollectionResponse)(collect_fair_values_sync)
 app.get("/fairValues", response_model=List[responses.FairValueResponse])(get_fair_values)
 app.post("/collect/ipos", response_model=responses.IPOCollectionResponse)(collect_ipos)
 app.get("/collect/iposSync", response_model=responses.IPOCollectionResponse)(collect_ipos_sync)
 app.get("/ipos", response_model=List[responses.IPOResponse])(get_ipos)
+app.post("/collect/prices", response_model=responses.StockCollectionResponse)(collect_price_history)
+app.get("/prices/progress")(get_price_history_progress)
+app.get("/jobs", response_model=List[responses.JobResponse])(list_jobs)
+app.get("/jobs/{job_id}", response_model=responses.JobResponse)(get_job)
 
 
 @app.get("/", response_model=responses.ServiceInfo)
@@ -52,12 +71,17 @@ async def root():
             "collect_stocks": "POST /collect/stocks",
             "collect_stocks_sync": "GET /collect/stocksSync",
             "get_stocks": "GET /stocks",
+            "get_stock_prices": "GET /stocks/{symbol}/prices",
             "collect_fair_values": "POST /collect/fairValues",
             "collect_fair_values_sync": "GET /collect/fairValuesSync",
             "get_fair_values": "GET /fairValues",
             "collect_ipos": "POST /collect/ipos",
             "collect_ipos_sync": "GET /collect/iposSync",
             "get_ipos": "GET /ipos",
+            "collect_prices": "POST /collect/prices",
+            "price_history_progress": "GET /prices/progress",
+            "list_jobs": "GET /jobs",
+            "get_job": "GET /jobs/{job_id}",
             "config": "/config"
         }
     )
@@ -86,9 +110,31 @@ async def startup_event():
     else:
         logger.info("✅ Database connection established")
 
+    # Keep future stock_prices partitions ahead of incoming data
+    app.state.partition_task = asyncio.create_task(maintain_partitions())
+
+
+async def maintain_partitions():
+    """Create upcoming monthly partitions now, then again every maintenance interval."""
+    interval = sh.config_manager.get('partitions.maintenance_interval_hours', 24) * 3600
+    while True:
+        try:
+            await asyncio.to_thread(sh.partition_manager.ensure_configured_partitions, 'stock_prices')
+        except Exception:
+            sh.log_error_with_exception("❌ Partition maintenance failed")
+        await asyncio.sleep(interval)
+
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks."""
     logger.info("🛑 Shutting down Collector Microservice")
+
+    partition_task = getattr(app.state, 'partition_task', None)
+    if partition_task is not None:
+        partition_task.cancel()
+        try:
+            await partition_task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,262 @@
+"""
+HTTP middleware: response compression and market-aware caching headers.
+"""
+
+import gzip
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from shared import config_manager, market_hours
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+_ENCODED_ETAG = re.compile(r'^(W/)?"(.*)-(br|gzip)"$')
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported content coding for a request: brotli, then gzip."""
+    accepted = _accepted_encodings(accept_encoding or '')
+    for coding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if accepted.get(coding, accepted.get('*', 0.0)) > 0:
+            return coding
+    return None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a compressed representation: '"abc"' -> '"abc-br"' (strong ETags differ per coding)."""
+    weak = etag.startswith('W/')
+    value = etag[2:] if weak else etag
+    return f'{"W/" if weak else ""}"{value.strip(chr(34))}-{encoding}"'
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON/NDJSON/text responses with brotli or gzip.
+
+    Buffered responses smaller than `minimum_size` pass through untouched; streamed
+    responses (NDJSON) are compressed chunk by chunk and flushed per chunk. Compressed
+    bodies of responses with an ETag are kept in a small LRU keyed by (ETag, coding),
+    so a hot snapshot is compressed once per generation rather than per request.
+
+    Compressed representations get their own strong ETag (`"<etag>-br"`); the suffix
+    is stripped from If-None-Match before the request reaches the endpoints, so
+    their generation checks keep working.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache_entries: int = 32):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get('accept-encoding'))
+        matched_etags = self._strip_if_none_match(scope, request_headers)
+        if encoding is None and not matched_etags:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        etag = None
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, etag
+
+            if message['type'] == 'http.response.start':
+                start_message = message
+                if message['status'] == 304:
+                    self._restore_etag(message, matched_etags)
+                    await send(message)
+                    start_message = None
+                return
+
+            if start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start_message)
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if compressor is None:
+                if not self._should_compress(start_message, headers, encoding, body, more_body):
+                    await send(start_message)
+                    await send(message)
+                    start_message = None
+                    return
+
+                etag = headers.get('etag')
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                if etag:
+                    headers['ETag'] = encoded_etag(etag, encoding)
+
+                if not more_body:
+                    compressed = self._compress_cached(etag, encoding, body)
+                    headers['Content-Length'] = str(len(compressed))
+                    await send(start_message)
+                    await send({'type': 'http.response.body', 'body': compressed})
+                    start_message = None
+                    return
+
+                # Streamed response: length unknown, compress incrementally
+                del headers['Content-Length']
+                compressor = self._stream_compressor(encoding)
+                await send(start_message)
+
+            chunk = compressor.compress(body, final=not more_body)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _strip_if_none_match(self, scope, headers: Headers) -> Dict[str, str]:
+        """Rewrite If-None-Match to the endpoints' own ETags; remember what the client sent."""
+        if_none_match = headers.get('if-none-match')
+        if not if_none_match:
+            return {}
+
+        matched, tags = {}, []
+        for tag in (tag.strip() for tag in if_none_match.split(',')):
+            match = _ENCODED_ETAG.match(tag)
+            if match:
+                base = f'{match.group(1) or ""}"{match.group(2)}"'
+                matched[base.replace('W/', '')] = tag
+                tags.append(base)
+            else:
+                tags.append(tag)
+        if matched:
+            raw = [(key, value) for key, value in scope['headers'] if key != b'if-none-match']
+            scope['headers'] = raw + [(b'if-none-match', ', '.join(tags).encode('latin-1'))]
+        return matched
+
+    @staticmethod
+    def _restore_etag(message, matched_etags: Dict[str, str]):
+        """Answer a 304 with the (compressed) ETag the client validated."""
+        headers = MutableHeaders(scope=message)
+        etag = headers.get('etag')
+        if etag and etag.replace('W/', '') in matched_etags:
+            headers['ETag'] = matched_etags[etag.replace('W/', '')]
+
+    def _should_compress(self, start_message, headers: MutableHeaders, encoding: Optional[str],
+                         body: bytes, more_body: bool) -> bool:
+        if encoding is None or start_message['status'] != 200 or 'content-encoding' in headers:
+            return False
+        content_type = headers.get('content-type', '')
+        if not any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def _compress_cached(self, etag: Optional[str], encoding: str, body: bytes) -> bytes:
+        if not etag or not self.cache_entries:
+            return self._compress(encoding, body)
+
+        key = (etag, encoding)
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                return compressed
+
+        compressed = self._compress(encoding, body)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def _stream_compressor(self, encoding: str) -> '_StreamCompressor':
+        return _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+
+
+class _StreamCompressor:
+    """Incremental gzip/brotli compressor that flushes after every chunk."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 writes the gzip container
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool = False) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CacheControlMiddleware:
+    """
+    Add Cache-Control to validated GET responses, depending on the EGX session.
+
+    Only responses carrying an ETag (data endpoints with generation validators) and
+    no Cache-Control of their own are touched. While the market is in session data
+    changes often, so clients keep responses for `http.max_age_open` seconds; outside
+    the session they may keep them until the next open, capped at
+    `http.max_age_closed`. Either way a stale copy is revalidated with its ETag.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.max_age_open = config_manager.get('http.max_age_open', 15)
+        self.max_age_closed = config_manager.get('http.max_age_closed', 3600)
+
+    def cache_control(self) -> str:
+        if market_hours.is_open():
+            return f'public, max-age={self.max_age_open}'
+        max_age = int(min(market_hours.seconds_until_open(), self.max_age_closed))
+        return f'public, max-age={max_age}'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message['type'] == 'http.response.start' and message['status'] in (200, 304):
+                headers = MutableHeaders(scope=message)
+                if 'etag' in headers and 'cache-control' not in headers:
+                    headers['Cache-Control'] = self.cache_control()
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
@@ -9,9 +9,11 @@ from datetime import datetime
 from .config import get_collector_config
 from .health import health_check
 from shared import logger, log_error_with_exception
-from .stocks import get_stocks, collect_stocks, collect_stocks_sync
+from .stocks import get_stocks, collect_stocks, collect_stocks_sync, get_stock_prices
 from .fair_values import get_fair_values, collect_fair_values, collect_fair_values_sync
 from .ipos import get_ipos, collect_ipos, collect_ipos_sync
+from .prices import collect_price_history, get_price_history_progress
+from .jobs import get_job, list_jobs
 
 
 __all__ = [
@@ -20,10 +22,15 @@ __all__ = [
     'get_stocks',
     'collect_stocks',
     'collect_stocks_sync',
+    'get_stock_prices',
     'get_fair_values',
     'collect_fair_values',
     'collect_fair_values_sync',
     'get_ipos',
     'collect_ipos',
-    'collect_ipos_sync'
+    'collect_ipos_sync',
+    'collect_price_history',
+    'get_price_history_progress',
+    'get_job',
+    'list_jobs'
 ]
\ No newline at end of file
@@ -5,7 +5,7 @@ Configuration endpoints.
 from fastapi import HTTPException
 from datetime import datetime
 
-from shared import config_manager
+from shared import config_manager, get_pool_stats, http_client
 from shared.custom_logging import logger, log_error_with_exception
 
 async def get_collector_config():
@@ -15,11 +15,16 @@ async def get_collector_config():
         collector_config = {
             "mubasher_endpoints": config.get("mubasher_endpoints", {}),
             "retry": config.get("retry", {}),
-            "scraping": config.get("scraping", {})
+            "scraping": config.get("scraping", {}),
+            "http": config.get("http", {})
         }
         return {
             "service": "collector",
             "config": collector_config,
+            "rate_limits": http_client.get_rate_limit_stats(),
+            "http_cache": http_client.get_cache_stats(),
+            "hosts": http_client.get_host_stats(),
+            "database_pool": get_pool_stats(),
             "timestamp": datetime.now()
         }
     except Exception as e:
@@ -2,30 +2,39 @@
 Fair value-related endpoints.
 """
 
-from fastapi import HTTPException, BackgroundTasks
-from typing import List
+from fastapi import HTTPException, Header, Response
+from typing import List, Optional, Tuple
 from datetime import datetime
+import base64
 
-from shared import logger, log_error_with_exception, get_session
-from ...FairValueCollector import fair_value_collector
+from sqlalchemy import null, or_, select, tuple_
+
+from shared import logger, log_error_with_exception, get_async_session, config_manager
+from shared import check_response_format, fast_json_response, ndjson_response, ndjson_stream, snapshot_cache
+from shared import job_manager
+from shared.snapshot_cache import etag_matches
+from shared.fast_json import rows_to_dicts
+from ...FairValueCollector import fair_value_collector, FAIR_VALUES_GENERATION, FAIR_VALUE_JOB
+from ...StockCollector import STOCKS_SNAPSHOT
 from data import responses
 
 
-async def run_fair_value_collection() -> int:
+async def run_fair_value_collection(full_resync: bool = False) -> int:
     """
     Run fair value data collection.
 
+    Args:
+        full_resync: Crawl every page instead of stopping at the watermarks
+
     Returns:
         Number of fair values collected
     """
     try:
         logger.info("🔄 Running fair value collection")
 
-        # Collect fair values
-        fair_values_data = await fair_value_collector.collect_fair_values()
-
-        # Save to database
-        saved_count = await fair_value_collector.save_fair_values(fair_values_data)
+        # Collect fair values and stream them into the database as pages arrive;
+        # watermarks only advance once every batch is committed
+        saved_count = await fair_value_collector.collect_and_save_fair_values(full_resync=full_resync)
 
         logger.info(f"✅ Fair value collection completed: {saved_count} records saved")
         return saved_count
@@ -35,102 +44,226 @@ async def run_fair_value_collection() -> int:
         raise
 
 
-async def collect_fair_values(background_tasks: BackgroundTasks):
+def _start_fair_value_job(full_resync: bool):
+    """
+    Start a fair value collection job, or join the running one in the same mode.
+
+    Raises:
+        HTTPException: 409 when a run in the other mode is in flight
+    """
+    running = job_manager.running(FAIR_VALUE_JOB)
+    if running is not None and running.params.get('full_resync') != full_resync:
+        mode = "full resync" if running.params.get('full_resync') else "incremental"
+        raise HTTPException(status_code=409,
+                            detail=f"Fair value collection job {running.id} ({mode}) is already running; "
+                                   f"retry when it finishes")
+    return job_manager.start(FAIR_VALUE_JOB, lambda: run_fair_value_collection(full_resync), full_resync=full_resync)
+
+
+async def collect_fair_values(full_resync: bool = False):
     """
     Trigger fair value data collection from Mubasher API.
 
     This endpoint starts the fair value collection process in the background
-    and returns immediately with a status response.
+    and returns immediately with the job id to poll at GET /jobs/{job_id}.
+    Pass `full_resync=true` to crawl every page instead of an incremental
+    refresh. A collection already running in the same mode is joined instead
+    of started again; one running in the other mode is answered with 409.
     """
     try:
         logger.info("🚀 Starting fair value collection via API")
 
-        # Run collection in background
-        background_tasks.add_task(run_fair_value_collection)
+        job = _start_fair_value_job(full_resync)
 
         return responses.StockCollectionResponse(  # Reuse the response model
             success=True,
-            message="Fair value collection started in background",
+            message="Fair value collection started in background" if job.requests == 1
+            else "Fair value collection already running; joined it",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         log_error_with_exception("Failed to start fair value collection")
         raise HTTPException(status_code=500, detail=f"Failed to start collection: {str(e)}")
 
 
-async def collect_fair_values_sync():
+async def collect_fair_values_sync(full_resync: bool = False):
     """
     Trigger synchronous fair value data collection from Mubasher API.
 
-    This endpoint waits for the collection to complete before returning.
-    Use with caution as it may take several minutes.
+    This endpoint waits for the collection to complete before returning;
+    while one is already running in the same mode it waits for that run instead of
+    starting another (409 when the running one is in the other mode).
+    Use with caution as it may take several minutes with `full_resync=true`.
     """
     try:
         logger.info("🚀 Starting synchronous fair value collection via API")
 
-        # Run collection synchronously
-        fair_values_collected = await run_fair_value_collection()
+        job = _start_fair_value_job(full_resync)
+        fair_values_collected = await job_manager.wait(job)
 
         return responses.StockCollectionResponse(
             success=True,
             message=f"Fair value collection completed synchronously: {fair_values_collected} records collected",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         log_error_with_exception("Synchronous fair value collection failed")
         raise HTTPException(status_code=500, detail=f"Collection failed: {str(e)}")
 
 
-async def get_fair_values():
+def _encode_cursor(released_at: Optional[datetime], fair_value_id: int) -> str:
+    """Opaque keyset cursor for the row after which the next page starts (undated rows have no date part)."""
+    date_part = released_at.isoformat() if released_at is not None else ''
+    return base64.urlsafe_b64encode(f"{date_part}|{fair_value_id}".encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
     """
-    Retrieve all fair value records from the database.
+    Decode a cursor from `_encode_cursor`.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor
     """
+    try:
+        released_at, fair_value_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+        return (datetime.fromisoformat(released_at) if released_at else None), int(fair_value_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def get_fair_values(response: Response, if_none_match: Optional[str] = Header(None), symbol: Optional[str] = None, source: Optional[str] = None,
+                          recommendation: Optional[str] = None, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None, cursor: Optional[str] = None,
+                          limit: Optional[int] = None, format: Optional[str] = None):
+    """
+    Retrieve fair value records, newest first, one page at a time.
+
+    Pages are keyset-paginated on (released_at, id), which the
+    ix_fair_values_released_at_id index serves directly, so every page costs the
+    same regardless of history size. Records without a release date follow the
+    dated ones, newest id first (as with NULLS LAST). When more records exist, the
+    X-Next-Cursor response header holds the `cursor` for the next page. Filters:
+    `symbol`, `source` and `recommendation` (English or Arabic name) and
+    released_at in [start, end) (a date range excludes undated records).
+
+    `format=fast` encodes the page straight from the SQL rows with orjson, skipping
+    per-item response model validation; `format=ndjson` streams every matching
+    record after `cursor` as newline-delimited JSON, ignoring `limit`.
+
+    Pages carry an ETag derived from the fair value and stock data generations and
+    the query, so a matching If-None-Match is answered with 304 without querying.
+    """
+    format = check_response_format(format)
+    from data.models.fair_value import FairValue
+    from data.models.stock import Stock
+    from data.models.source import Source
+    from data.models.recommendation import Recommendation
+    from data.models.sector import Sector
+    from data.models.market import Market
+
+    limit = min(limit or config_manager.get('fair_values.page_size', 100), config_manager.get('fair_values.max_page_size', 1000))
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+
+    query = (
+        select(
+            FairValue.id,
+            Stock.symbol,
+            FairValue.released_at,
+            Source.name.label('source'),
+            Source.name_ar.label('source_ar'),
+            Recommendation.name.label('recommendation'),
+            Recommendation.name_ar.label('recommendation_ar'),
+            Market.name.label('market'),
+            Sector.name.label('sector'),
+            null().label('market_url'),  # Not stored
+            FairValue.value,
+            FairValue.price,
+            FairValue.last_price,
+            FairValue.change,
+            FairValue.change_percentage
+        )
+        .join(Stock, FairValue.stock_id == Stock.id)
+        .join(Market, Stock.market_id == Market.id)
+        .join(Sector, Stock.sector_id == Sector.id)
+        .join(Source, FairValue.source_id == Source.id)
+        .join(Recommendation, FairValue.recommendation_id == Recommendation.id)
+    )
+    if symbol:
+        query = query.where(Stock.symbol == symbol.upper())
+    if source:
+        query = query.where(or_(Source.name == source, Source.name_ar == source))
+    if recommendation:
+        query = query.where(or_(Recommendation.name == recommendation, Recommendation.name_ar == recommendation))
+    if start:
+        query = query.where(FairValue.released_at >= start)
+    if end:
+        query = query.where(FairValue.released_at < end)
+
+    # Dated records first, then undated ones; each part is a plain index range scan
+    dated = query.where(FairValue.released_at.isnot(None)).order_by(FairValue.released_at.desc(), FairValue.id.desc())
+    undated = query.where(FairValue.released_at.is_(None)).order_by(FairValue.id.desc())
+    if cursor:
+        cursor_released_at, cursor_id = _decode_cursor(cursor)
+        if cursor_released_at is None:
+            dated = None
+            undated = undated.where(FairValue.id < cursor_id)
+        else:
+            dated = dated.where(tuple_(FairValue.released_at, FairValue.id) < tuple_(cursor_released_at, cursor_id))
+    if start or end:
+        undated = None
+    parts = [part for part in (dated, undated) if part is not None]
+
+    if format == 'ndjson':
+        return ndjson_response(_stream_fair_values(parts))
+
+    # Rows also carry stock, market and sector names, so stock writes change them too
+    etag = snapshot_cache.generation_etag(
+        FAIR_VALUES_GENERATION, snapshot_cache.version(STOCKS_SNAPSHOT),
+        symbol, source, recommendation, start, end, cursor, limit, format
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+
     try:
         logger.info("📊 Fetching fair values from database")
 
-        with get_session() as session:
-            from data.models.fair_value import FairValue
-            from data.models.stock import Stock
-            from data.models.source import Source
-            from data.models.recommendation import Recommendation
-            from data.models.sector import Sector
-            from data.models.market import Market
-
-            result = session.execute(
-                session.query(FairValue, Stock.symbol, Market.name.label('market_en'), Sector.name.label('sector_en'), Source.name.label('source_name'), Source.name_ar.label('source_name_ar'), Recommendation.name.label('recommendation_name'), Recommendation.name_ar.label('recommendation_name_ar'))
-                .join(Stock, FairValue.stock_id == Stock.id)
-                .join(Market, Stock.market_id == Market.id)
-                .join(Sector, Stock.sector_id == Sector.id)
-                .join(Source, FairValue.source_id == Source.id)
-                .join(Recommendation, FairValue.recommendation_id == Recommendation.id)
-                .order_by(FairValue.released_at.desc())
-            )
-
-            fair_values = []
-            for fv, symbol, market_en, sector_en, source_name, source_name_ar, recommendation_name, recommendation_name_ar in result:
-                fair_values.append({
-                    'id': fv.id,
-                    'symbol': symbol,
-                    'released_at': fv.released_at,
-                    'source': source_name,
-                    'source_ar': source_name_ar,
-                    'recommendation': recommendation_name,
-                    'recommendation_ar': recommendation_name_ar,
-                    'market': market_en,
-                    'sector': sector_en,
-                    'market_url': None,  # Not stored, set to None
-                    'value': fv.value,
-                    'price': fv.price,
-                    'last_price': fv.last_price,
-                    'change': fv.change,
-                    'change_percentage': fv.change_percentage
-                })
+        fair_values = []
+        async with get_async_session() as session:
+            for part in parts:
+                result = await session.execute(part.limit(limit + 1 - len(fair_values)))
+                fair_values.extend(rows_to_dicts(list(result.keys()), result.all()))
+                if len(fair_values) > limit:
+                    break
+
+        headers = {'ETag': etag}
+        if len(fair_values) > limit:
+            fair_values = fair_values[:limit]
+            headers['X-Next-Cursor'] = _encode_cursor(fair_values[-1]['released_at'], fair_values[-1]['id'])
 
         logger.info(f"✅ Retrieved {len(fair_values)} fair value records")
+        if format == 'fast':
+            return fast_json_response(fair_values, headers)
+        response.headers.update(headers)
         return fair_values
 
     except Exception as e:
         log_error_with_exception("Failed to fetch fair values")
         raise HTTPException(status_code=500, detail=f"Failed to fetch fair values: {str(e)}")
+
+
+async def _stream_fair_values(queries):
+    """Stream fair value queries, one after another, as NDJSON chunks over server-side cursors."""
+    async with get_async_session() as session:
+        for query in queries:
+            result = await session.stream(query)
+            async for chunk in ndjson_stream(result):
+                yield chunk
@@ -6,30 +6,40 @@ from fastapi import HTTPException
 from datetime import datetime
 
 from data import Config, HealthResponse
-from shared import check_connection, get_session, log_error_with_exception
+from sqlalchemy import func, select
+
+from shared import check_connection_async, config_manager, get_pool_stats, get_async_session, log_error_with_exception
 
 async def health_check():
     """Health check endpoint."""
     try:
-        db_status = check_connection()
+        db_status = await check_connection_async()
 
         # Also check if database is initialized
         db_initialized = False
         if db_status:
             try:
-                with get_session() as session:
+                async with get_async_session() as session:
                     # Check if config table exists and has data
-                    config_count = session.query(Config).count()
+                    config_count = (await session.execute(select(func.count()).select_from(Config))).scalar_one()
                     db_initialized = config_count > 0
             except Exception:
                 db_initialized = False
 
         status = "healthy" if (db_status and db_initialized) else "unhealthy"
 
+        # A pool close to capacity means requests are about to queue for connections
+        pool_stats = get_pool_stats()
+        threshold = config_manager.get('database.pool_saturation_threshold', 0.9)
+        pool_stats['saturated'] = pool_stats.get('saturation', 0.0) >= threshold
+        if status == "healthy" and pool_stats['saturated']:
+            status = "degraded"
+
         return HealthResponse(
             status=status,
             database=db_status,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            pool=pool_stats
         )
     except Exception as e:
         log_error_with_exception("Health check failed")
@@ -2,12 +2,13 @@
 IPO-related endpoints.
 """
 
-from fastapi import HTTPException, BackgroundTasks
-from typing import List
+from fastapi import HTTPException, Header
+from typing import List, Optional
 from datetime import datetime
 
-from shared import logger, log_error_with_exception, get_session
-from ...IPOCollector import ipo_collector
+from shared import logger, log_error_with_exception, json_response, serialize_json, snapshot_response, view_etag
+from shared import check_response_format, ndjson_lines, ndjson_response, job_manager
+from ...IPOCollector import ipo_collector, IPO_JOB
 from data import responses
 
 
@@ -21,11 +22,8 @@ async def run_ipo_collection() -> int:
     try:
         logger.info("🔄 Running IPO collection")
 
-        # Collect IPOs
-        ipos_data = await ipo_collector.collect_ipos()
-
-        # Save to database
-        saved_count = await ipo_collector.save_ipos(ipos_data)
+        # Collect IPOs and stream them into the database as pages arrive
+        saved_count = await ipo_collector.collect_and_save_ipos()
 
         logger.info(f"✅ IPO collection completed: {saved_count} records saved")
         return saved_count
@@ -35,22 +33,24 @@ async def run_ipo_collection() -> int:
         raise
 
 
-async def collect_ipos(background_tasks: BackgroundTasks):
+async def collect_ipos():
     """
     Trigger IPO data collection from Mubasher API.
 
     This endpoint starts the IPO collection process in the background
-    and returns immediately with a status response.
+    and returns immediately with the job id to poll at GET /jobs/{job_id}.
+    A collection that is already running is joined instead of started again.
     """
     try:
         logger.info("🚀 Starting IPO collection via API")
 
-        # Run collection in background
-        background_tasks.add_task(run_ipo_collection)
+        job = job_manager.start(IPO_JOB, run_ipo_collection)
 
         return responses.StockCollectionResponse(  # Reuse the response model
             success=True,
-            message="IPO collection started in background",
+            message="IPO collection started in background" if job.requests == 1
+            else "IPO collection already running; joined it",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
@@ -63,18 +63,20 @@ async def collect_ipos_sync():
     """
     Trigger synchronous IPO data collection from Mubasher API.
 
-    This endpoint waits for the collection to complete before returning.
+    This endpoint waits for the collection to complete before returning;
+    while one is already running it waits for that run instead of starting another.
     Use with caution as it may take several minutes.
     """
     try:
         logger.info("🚀 Starting synchronous IPO collection via API")
 
-        # Run collection synchronously
-        ipos_collected = await run_ipo_collection()
+        job = job_manager.start(IPO_JOB, run_ipo_collection)
+        ipos_collected = await job_manager.wait(job)
 
         return responses.StockCollectionResponse(
             success=True,
             message=f"IPO collection completed synchronously: {ipos_collected} records collected",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
@@ -83,69 +85,49 @@ async def collect_ipos_sync():
         raise HTTPException(status_code=500, detail=f"Collection failed: {str(e)}")
 
 
-async def get_ipos():
+def _matches(value: Optional[str], *candidates: Optional[str]) -> bool:
+    """Case-insensitive match of a filter value against English/Arabic names."""
+    return value is None or any(candidate and candidate.casefold() == value for candidate in candidates)
+
+
+async def get_ipos(status: Optional[str] = None, sector: Optional[str] = None, offset: int = 0,
+                   limit: Optional[int] = None, format: Optional[str] = None,
+                   if_none_match: Optional[str] = Header(None)):
     """
-    Retrieve all IPO records from the database.
+    Retrieve IPO records, newest first.
+
+    The listing is served from an in-memory snapshot that is rebuilt only after an
+    IPO collection commits; a matching If-None-Match gets 304. `status` and
+    `sector` (English or Arabic name) filter the snapshot, and `offset`/`limit`
+    page it, with the filtered total in the X-Total-Count header. Snapshot bodies
+    skip per-item validation already (`format=fast` is the default behaviour);
+    `format=ndjson` streams the page one IPO per line.
     """
-    try:
-        logger.info("📊 Fetching IPOs from database")
-
-        with get_session() as session:
-            from data.models.ipo import IPO
-            from data.models.stock import Stock
-            from data.models.sector import Sector
-            from data.models.market import Market
-            from data.models.ipo_type import IPOType
-            from data.models.ipo_status import IPOStatus
-
-            result = session.execute(
-                session.query(IPO, Stock, Sector.name.label('sector_en'), Sector.name_ar.label('sector_ar'), Market.name.label('market_en'), Market.name_ar.label('market_ar'), IPOType.name.label('type_en'), IPOType.name_ar.label('type_ar'), IPOStatus.name.label('status_en'), IPOStatus.name_ar.label('status_ar'))
-                .join(Stock, IPO.stock_id == Stock.id, isouter=True)
-                .join(Sector, IPO.sector_id == Sector.id, isouter=True)
-                .join(Market, IPO.market_id == Market.id, isouter=True)
-                .join(IPOType, IPO.type_id == IPOType.id, isouter=True)
-                .join(IPOStatus, IPO.status_id == IPOStatus.id, isouter=True)
-                .order_by(IPO.announced_at.desc())
-            )
-
-            ipos = []
-            for ipo, stock, sector_en, sector_ar, market_en, market_ar, type_en, type_ar, status_en, status_ar in result:
-                stock_base_data = {
-                    'id': stock.id,
-                    'symbol': stock.symbol,
-                    'name': stock.name_en,
-                    'name_ar': stock.name_ar,
-                    'market': stock.market.name if stock and stock.market else None,
-                    'sector': stock.sector.name if stock and stock.sector else None,
-                    'currency': stock.currency
-                } if stock else None
-
-                ipos.append({
-                    'id': ipo.id,
-                    'name': ipo.name,
-                    'name_ar': ipo.name_ar,
-                    'url': ipo.url,
-                    'status': status_en,
-                    'status_ar': status_ar,
-                    'attachment': ipo.attachment,
-                    'type': type_en,
-                    'type_ar': type_ar,
-                    'market': market_en,
-                    'market_ar': market_ar,
-                    'sector': sector_en,
-                    'sector_ar': sector_ar,
-                    'market_url': None,  # Not stored, set to None
-                    'volume': ipo.volume,
-                    'announced_at': ipo.announced_at,
-                    'stock_symbol': stock.symbol if stock else None,
-                    'stock_name': stock.name_en if stock else None,
-                    'stock_name_ar': stock.name_ar if stock else None,
-                    'stock_base_data': stock_base_data
-                })
-
-        logger.info(f"✅ Retrieved {len(ipos)} IPO records")
-        return ipos
+    format = check_response_format(format)
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="offset must be non-negative and limit positive")
 
+    try:
+        snapshot = await ipo_collector.get_ipos_snapshot()
+        unfiltered = status is None and sector is None and not offset and limit is None
+        if unfiltered and format != 'ndjson':
+            return snapshot_response(snapshot, if_none_match)
+
+        status_key = status.casefold() if status else None
+        sector_key = sector.casefold() if sector else None
+        etag = view_etag(snapshot, status_key, sector_key, offset, limit)
+
+        ipos = [
+            ipo for ipo in snapshot.data
+            if _matches(status_key, ipo['status'], ipo['status_ar']) and _matches(sector_key, ipo['sector'], ipo['sector_ar'])
+        ]
+        page = ipos[offset:offset + limit if limit is not None else None]
+        if format == 'ndjson':
+            return ndjson_response(ndjson_lines(page), {'X-Total-Count': str(len(ipos))})
+        return json_response(serialize_json(page), etag, if_none_match, {'X-Total-Count': str(len(ipos))})
+
+    except HTTPException:
+        raise
     except Exception as e:
         log_error_with_exception("Failed to fetch IPOs")
         raise HTTPException(status_code=500, detail=f"Failed to fetch IPOs: {str(e)}")
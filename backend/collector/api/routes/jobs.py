@@ -0,0 +1,38 @@
+"""
+Collection job endpoints.
+"""
+
+from fastapi import HTTPException
+from typing import List, Optional
+
+from shared import job_manager
+
+
+async def get_job(job_id: str):
+    """
+    Get the status and progress of a collection job.
+
+    Args:
+        job_id: Id returned by a collection endpoint
+
+    Returns:
+        Status, pages fetched, rows written and elapsed time
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
+async def list_jobs(name: Optional[str] = None, status: Optional[str] = None) -> List[dict]:
+    """
+    List running and recently finished collection jobs, newest first.
+
+    Args:
+        name: Only jobs of this collection (stocks, fair_values, ipos)
+        status: Only jobs in this status (running, succeeded, failed)
+    """
+    return [
+        job.to_dict() for job in job_manager.list()
+        if (name is None or job.name == name) and (status is None or job.status == status)
+    ]
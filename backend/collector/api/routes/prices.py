@@ -0,0 +1,81 @@
+"""
+Price history-related endpoints.
+"""
+
+from fastapi import HTTPException
+from typing import List, Optional
+from datetime import datetime
+
+from shared import logger, log_error_with_exception, job_manager
+from ...PriceHistoryCollector import price_history_collector, PRICE_HISTORY_JOB
+from data import responses
+
+
+async def run_price_history_collection(symbols: Optional[List[str]] = None) -> int:
+    """
+    Run price history collection.
+
+    Args:
+        symbols: Limit the run to these symbols (None for every active stock)
+
+    Returns:
+        Number of candles loaded
+    """
+    try:
+        logger.info("🔄 Running price history collection")
+
+        candles_loaded = await price_history_collector.collect_price_history(symbols)
+
+        logger.info(f"✅ Price history collection completed: {candles_loaded} candles loaded")
+        return candles_loaded
+
+    except Exception as e:
+        log_error_with_exception("Price history collection failed")
+        raise
+
+
+async def collect_price_history(symbols: Optional[str] = None):
+    """
+    Trigger historical price collection from Mubasher.
+
+    This endpoint starts the backfill in the background and returns immediately
+    with the job id to poll at GET /jobs/{job_id}. Each symbol resumes from its
+    checkpoint, so re-running only fetches new candles. Pass `symbols=COMI,HRHO`
+    to limit the run; follow it via GET /prices/progress. While a backfill is
+    running, another is answered with 409 (its symbols may differ).
+    """
+    try:
+        # The job is registered before this returns, so concurrent triggers can't both pass
+        running = job_manager.running(PRICE_HISTORY_JOB)
+        if running is not None:
+            raise HTTPException(status_code=409,
+                                detail=f"Price history collection job {running.id} is already running")
+
+        logger.info("🚀 Starting price history collection via API")
+
+        symbol_list = [symbol.strip() for symbol in symbols.split(',') if symbol.strip()] if symbols else None
+        job = job_manager.start(PRICE_HISTORY_JOB, lambda: run_price_history_collection(symbol_list),
+                                symbols=symbol_list)
+
+        return responses.StockCollectionResponse(  # Reuse the response model
+            success=True,
+            message="Price history collection started in background",
+            job_id=job.id,
+            timestamp=datetime.now()
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error_with_exception("Failed to start price history collection")
+        raise HTTPException(status_code=500, detail=f"Failed to start collection: {str(e)}")
+
+
+async def get_price_history_progress():
+    """
+    Get the progress of the current (or last) price history collection.
+
+    Returns:
+        Symbols and windows done, candles loaded, throughput and ETA
+    """
+    return price_history_collector.get_progress()
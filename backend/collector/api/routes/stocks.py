@@ -2,33 +2,40 @@
 Stock-related endpoints.
 """
 
-from fastapi import HTTPException, BackgroundTasks
-from typing import List
-from datetime import datetime
+from fastapi import HTTPException, Header, Response
+from typing import List, Optional
+from datetime import datetime, timezone
 
+import numpy as np
 from sqlalchemy import false
 
-from shared import logger, log_error_with_exception, get_session
-from ...StockCollector import stock_collector, run_stock_collection, run_get_stocks
+from shared import logger, log_error_with_exception, get_session, config_manager, get_price_series, snapshot_response
+from shared import check_response_format, ndjson_lines, ndjson_response
+from shared import snapshot_cache, job_manager
+from shared.charting import INTERVALS, PRICES_GENERATION, downsample, series_length, slice_series
+from shared.snapshot_cache import etag_matches
+from ...StockCollector import stock_collector, run_get_stocks, STOCK_JOB
 from data import responses, Stock
 
 
-async def collect_stocks(background_tasks: BackgroundTasks):
+async def collect_stocks():
     """
     Trigger stock data collection from Mubasher API.
 
     This endpoint starts the stock collection process in the background
-    and returns immediately with a status response.
+    and returns immediately with the job id to poll at GET /jobs/{job_id}.
+    A collection that is already running is joined instead of started again.
     """
     try:
         logger.info("🚀 Starting stock collection via API")
 
-        # Run collection in background
-        background_tasks.add_task(run_stock_collection)
+        job = job_manager.start(STOCK_JOB, stock_collector.collect_and_save_stocks)
 
         return responses.StockCollectionResponse(
             success=True,
-            message="Stock collection started in background",
+            message="Stock collection started in background" if job.requests == 1
+            else "Stock collection already running; joined it",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
@@ -41,19 +48,25 @@ async def collect_stocks_sync():
     """
     Trigger synchronous stock data collection from Mubasher API.
 
-    This endpoint waits for the collection to complete before returning.
+    This endpoint waits for the collection to complete before returning;
+    while one is already running it waits for that run instead of starting another.
     Use with caution as it may take several minutes.
     """
     try:
         logger.info("🚀 Starting synchronous stock collection via API")
 
-        # Run collection synchronously
-        stocks_collected = await run_stock_collection()
+        job = job_manager.start(STOCK_JOB, stock_collector.collect_and_save_stocks)
+        try:
+            stocks_collected = await job_manager.wait(job)
+        except Exception:
+            log_error_with_exception("❌ Stock collection failed")
+            stocks_collected = -1
 
         if stocks_collected == -1 or stocks_collected == 0:
             return responses.StockCollectionResponse(
             success=False,
             message="Stock collection failed or no stocks collected",
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
@@ -62,6 +75,7 @@ async def collect_stocks_sync():
             success=True,
             message="Stock collection completed successfully",
             stocks_collected=stocks_response,
+            job_id=job.id,
             timestamp=datetime.now()
         )
 
@@ -69,17 +83,97 @@ async def collect_stocks_sync():
         log_error_with_exception("Stock collection failed")
         raise HTTPException(status_code=500, detail=f"Collection failed: {str(e)}")
 
-async def get_stocks():
+async def get_stocks(format: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     """
     Get all collected stocks from the database.
 
+    Served from an in-memory snapshot that is rebuilt only after a stock collection
+    commits; clients sending the snapshot's ETag in If-None-Match get 304. The
+    snapshot body is already encoded without per-item validation, so `format=fast`
+    is the same as the default; `format=ndjson` streams one stock per line.
+
     Returns:
         List of stock data
     """
+    format = check_response_format(format)
     try:
-        stocks_response = await run_get_stocks()
-        logger.info(f"✅ Stock got from the Database: {len(stocks_response)} stocks returned")
-        return stocks_response
+        snapshot = await stock_collector.get_stocks_snapshot()
+        if format == 'ndjson':
+            return ndjson_response(ndjson_lines(snapshot.data))
+        return snapshot_response(snapshot, if_none_match)
     except Exception as e:
-        log_error_with_exception("❌ Stock collection failed")
+        log_error_with_exception("❌ Failed to get stocks")
         return []
+
+
+def _epoch_seconds(value: datetime) -> int:
+    """Epoch seconds of a query datetime (naive values are UTC, like stored candles)."""
+    return int((value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp())
+
+
+async def get_stock_prices(response: Response, symbol: str, interval: str = "1d", start: Optional[datetime] = None,
+                           end: Optional[datetime] = None, cursor: Optional[int] = None,
+                           limit: Optional[int] = None, max_points: Optional[int] = None,
+                           if_none_match: Optional[str] = Header(None)):
+    """
+    Get chart-ready OHLCV bars for a stock.
+
+    Bars are resampled to `interval` (15m, 1h, 1d, 1w, 1M) and returned oldest first.
+    A page holds the newest `limit` bars in [start, end); when older bars exist,
+    `next_cursor` is set and passing it as `cursor` returns the page before it
+    (keyset paging by bar time). `max_points` downsamples the page with LTTB to fit
+    the chart viewport. Responses carry an ETag of the price data generation and
+    the query; a matching If-None-Match gets 304 without any work.
+
+    Returns:
+        Symbol, interval, next_cursor and the bars
+    """
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval '{interval}', use one of {', '.join(INTERVALS)}")
+
+    max_page_size = config_manager.get('charts.max_page_size', 20000)
+    limit = min(limit or config_manager.get('charts.page_size', 5000), max_page_size)
+    if limit < 1 or (max_points is not None and max_points < 3):
+        raise HTTPException(status_code=400, detail="limit must be positive and max_points at least 3")
+
+    symbol = symbol.upper()
+    etag = snapshot_cache.generation_etag(PRICES_GENERATION, symbol, interval, start, end, cursor, limit, max_points)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+
+    try:
+        series = await get_price_series(symbol, interval)
+        if series is None:
+            raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
+
+        # Keyset window on the sorted bar times: [start, min(end, cursor))
+        times = series['time']
+        lower = np.searchsorted(times, _epoch_seconds(start), 'left') if start else 0
+        upper = np.searchsorted(times, _epoch_seconds(end), 'left') if end else len(times)
+        if cursor is not None:
+            upper = min(upper, np.searchsorted(times, cursor, 'left'))
+        first = max(lower, upper - limit)
+
+        page = slice_series(series, first, max(first, upper))
+        if max_points:
+            page = downsample(page, max_points)
+
+        columns = [page[column].tolist() for column in ('time', 'open', 'high', 'low', 'close', 'volume')]
+        response.headers['ETag'] = etag
+        bars = [
+            {'time': bar_time, 'open': bar_open, 'high': high, 'low': low, 'close': close, 'volume': volume}
+            for bar_time, bar_open, high, low, close, volume in zip(*columns)
+        ]
+        return {
+            'symbol': symbol,
+            'interval': interval,
+            'count': series_length(page),
+            'next_cursor': int(times[first]) if first > lower else None,
+            'bars': bars
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error_with_exception(f"Failed to fetch prices for {symbol}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch prices: {str(e)}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Bilingual Join Stage
+Pairs English and Arabic rows of the same record as pages arrive from both endpoints.
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from shared import logger
+
+ENGLISH = "English"
+ARABIC = "Arabic"
+
+
+class BilingualJoiner:
+    """
+    Streaming hash join of English and Arabic rows on a shared key.
+
+    Rows are added in whatever order pages complete. When both languages of a key
+    have been seen, one merged record is emitted and the buffered half is released,
+    so memory holds only rows still waiting for their counterpart.
+
+    Each row also carries an identity within its own language (e.g. its name). A
+    row repeating a key with the same identity shifted between pages and is
+    dropped; a key shared by two different identities is ambiguous, so rows with
+    that key are never paired (English ones are released unmatched) rather than
+    risking a wrong translation.
+    """
+
+    def __init__(self, merge_func: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]], label: str = "records"):
+        """
+        Args:
+            merge_func: Builds the merged record from (english_row, arabic_row)
+            label: Description used in log messages
+        """
+        self.merge_func = merge_func
+        self.label = label
+        self._pending = {ENGLISH: {}, ARABIC: {}}
+        self._identities = {ENGLISH: {}, ARABIC: {}}
+        self._ambiguous = set()
+        self._unmatched_english: List[Dict[str, Any]] = []
+        self.matched = 0
+        self.unmatched_arabic = 0
+
+    def add(self, language: str, key: Hashable, row: Dict[str, Any],
+            identity: Optional[Hashable] = None) -> Optional[Dict[str, Any]]:
+        """
+        Add a row and return the merged record if its counterpart has already arrived.
+
+        Args:
+            language: ENGLISH or ARABIC
+            key: Join key shared by both language versions of the record
+            row: Processed row
+            identity: Identity of the row within its language (None to treat repeats as duplicates)
+
+        Returns:
+            Merged record, or None while waiting for the other language
+        """
+        other = ARABIC if language == ENGLISH else ENGLISH
+
+        seen = self._identities[language]
+        if key in seen:
+            if identity in seen[key]:
+                return None  # Rows can repeat when they shift between pages mid-crawl
+            seen[key] = seen[key] | {identity}
+            self._mark_ambiguous(key)
+        else:
+            seen[key] = frozenset([identity])
+
+        if key in self._ambiguous:
+            self._release(language, row)
+            return None
+
+        counterpart = self._pending[other].pop(key, None)
+        if counterpart is None:
+            self._pending[language][key] = row
+            return None
+
+        self.matched += 1
+        if language == ENGLISH:
+            return self.merge_func(row, counterpart)
+        return self.merge_func(counterpart, row)
+
+    def _mark_ambiguous(self, key: Hashable):
+        """Stop pairing a key two different records share; release what is buffered under it."""
+        if key in self._ambiguous:
+            return
+        self._ambiguous.add(key)
+        if not any(key in pending for pending in self._pending.values()):
+            logger.warning(f"⚠️ Bilingual join of {self.label}: key {key} is ambiguous after it was already paired")
+        for language in (ENGLISH, ARABIC):
+            row = self._pending[language].pop(key, None)
+            if row is not None:
+                self._release(language, row)
+
+    def _release(self, language: str, row: Dict[str, Any]):
+        if language == ENGLISH:
+            self._unmatched_english.append(row)
+        else:
+            self.unmatched_arabic += 1
+            logger.info(f"🗑️ Dropping Arabic {self.label} row without an English counterpart: {row}")
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Release the English rows that never found an Arabic counterpart.
+
+        Unmatched Arabic rows are dropped (and counted in `unmatched_arabic`):
+        without the English name they cannot be keyed.
+
+        Returns:
+            Unmatched English rows
+        """
+        for language, pending in self._pending.items():
+            for row in pending.values():
+                self._release(language, row)
+        unmatched_english, self._unmatched_english = self._unmatched_english, []
+        if unmatched_english or self.unmatched_arabic:
+            logger.warning(
+                f"⚠️ Bilingual join of {self.label}: {len(unmatched_english)} English rows without Arabic, "
+                f"{self.unmatched_arabic} Arabic rows without English ({len(self._ambiguous)} ambiguous keys)"
+            )
+        self._pending = {ENGLISH: {}, ARABIC: {}}
+        return unmatched_english
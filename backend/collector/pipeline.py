@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Collection Pipeline
+Bounded producer/consumer pipeline streaming parsed rows from page fetches to DB writes.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from shared import config_manager, logger
+
+_DONE = None  # Queue sentinel telling the writer no more batches will arrive
+
+
+class CollectionPipeline:
+    """
+    Streams rows from fetch tasks into batched DB writes.
+
+    Producers call `put()` with the rows parsed from each page. Rows are grouped
+    into batches of `batch_size` and pushed onto a bounded asyncio queue; a single
+    writer task drains it, committing one batch at a time. When the writer falls
+    behind, the queue fills and `put()` blocks, throttling the fetchers.
+
+    Fetching and writing overlap, so total time approaches max(fetch, write)
+    instead of their sum, and at most `max_pending_batches` batches are held in memory.
+
+    Usage:
+        pipeline = CollectionPipeline(save_batch, name="fair values")
+        stats = await pipeline.run(crawl_english(pipeline), crawl_arabic(pipeline))
+    """
+
+    def __init__(self, writer: Callable[[List[Dict[str, Any]]], Awaitable[int]], batch_size: Optional[int] = None,
+                 max_pending_batches: Optional[int] = None, name: str = "rows"):
+        """
+        Args:
+            writer: Coroutine function persisting one batch and returning the rows written
+            batch_size: Rows per write batch (default `pipeline.batch_size`)
+            max_pending_batches: Queue capacity in batches (default `pipeline.max_pending_batches`)
+            name: Description used in log messages
+        """
+        pipeline_config = config_manager.get('pipeline', {})
+        self.writer = writer
+        self.batch_size = batch_size or pipeline_config.get('batch_size', 500)
+        self.max_pending_batches = max_pending_batches or pipeline_config.get('max_pending_batches', 4)
+        self.name = name
+
+        self.stats = {
+            'rows_received': 0,
+            'rows_written': 0,
+            'batches_written': 0,
+            'write_seconds': 0.0,
+            'elapsed_seconds': 0.0
+        }
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Future] = None
+
+    async def put(self, rows: List[Dict[str, Any]]):
+        """
+        Hand parsed rows to the pipeline; blocks while the write queue is full.
+
+        Args:
+            rows: Rows parsed from one page
+        """
+        if self._queue is None:
+            raise RuntimeError("Pipeline is not running; call put() from a producer passed to run()")
+
+        self.stats['rows_received'] += len(rows)
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.batch_size:
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            await self._enqueue(batch)
+
+    async def _enqueue(self, item: Optional[List[Dict[str, Any]]]):
+        """Put an item on the queue, failing fast if the writer has died."""
+        put_task = asyncio.ensure_future(self._queue.put(item))
+        done, _ = await asyncio.wait({put_task, self._writer_task}, return_when=asyncio.FIRST_COMPLETED)
+        if put_task not in done:
+            put_task.cancel()
+            self._writer_task.result()  # Re-raise the writer's error
+            raise RuntimeError(f"{self.name} pipeline writer stopped unexpectedly")
+
+    async def _drain(self):
+        """Writer loop: persist batches until the sentinel arrives."""
+        while True:
+            batch = await self._queue.get()
+            if batch is _DONE:
+                return
+
+            started = time.perf_counter()
+            written = await self.writer(batch)
+            self.stats['write_seconds'] += time.perf_counter() - started
+            self.stats['rows_written'] += written or 0
+            self.stats['batches_written'] += 1
+            logger.info(f"💾 {self.name} batch {self.stats['batches_written']}: {written} rows written "
+                        f"({self.stats['rows_written']} total, queue {self._queue.qsize()}/{self.max_pending_batches})")
+
+    async def run(self, *producers: Awaitable[Any]) -> Dict[str, Any]:
+        """
+        Run the producers and the writer until every row is persisted.
+
+        Args:
+            producers: Coroutines that call `put()` with parsed rows
+
+        Returns:
+            Pipeline statistics
+
+        Raises:
+            Exception: The first producer or writer error; the other side is cancelled
+        """
+        started = time.perf_counter()
+        self._queue = asyncio.Queue(maxsize=self.max_pending_batches)
+        self._buffer = []
+        self._writer_task = asyncio.ensure_future(self._drain())
+        producing = asyncio.ensure_future(asyncio.gather(*producers))
+
+        try:
+            done, _ = await asyncio.wait({producing, self._writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            if producing not in done:
+                producing.cancel()
+                self._writer_task.result()
+                raise RuntimeError(f"{self.name} pipeline writer stopped unexpectedly")
+            producing.result()
+
+            if self._buffer:
+                batch, self._buffer = self._buffer, []
+                await self._enqueue(batch)
+            await self._enqueue(_DONE)
+            await self._writer_task
+        finally:
+            for task in (producing, self._writer_task):
+                if not task.done():
+                    task.cancel()
+            self._queue = None
+            self.stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+
+        logger.info(f"🏁 {self.name} pipeline finished: {self.stats}")
+        return self.stats
@@ -1,14 +1,20 @@
-﻿from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+﻿from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from shared.db_engine import Base
 
 class StockPrice(Base):
-    """Model for historical stock price data."""
+    """
+    Model for historical stock price data (one row per stock per candle).
+
+    On PostgreSQL the table is range-partitioned by month on `timestamp`; partitions
+    are created by `shared.partitions`. The (stock_id, timestamp) primary key makes
+    re-ingestion idempotent, and a BRIN index keeps time-range scans cheap.
+    """
     __tablename__ = 'stock_prices'
 
-    id = Column(Integer, primary_key=True, index=True)
-    stock_id = Column(Integer, ForeignKey('stocks.id'), nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    # Partitioned tables need the partition key in the primary key
+    stock_id = Column(Integer, ForeignKey('stocks.id'), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
     open_price = Column(Float)
     high_price = Column(Float)
     low_price = Column(Float)
@@ -16,5 +22,10 @@ class StockPrice(Base):
     volume = Column(Integer)
     adjusted_close = Column(Float)  # For splits/dividends
 
+    __table_args__ = (
+        Index('ix_stock_prices_timestamp_brin', 'timestamp', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
+
     # Relationships
     stock = relationship("Stock", back_populates="prices")
\ No newline at end of file
@@ -16,6 +16,8 @@ from .market import Market
 from .ipo_type import IPOType
 from .ipo_status import IPOStatus
 from .ipo import IPO
+from .price_checkpoint import PriceHistoryCheckpoint
+from .indicator_state import IndicatorState
 
 __all__ = [
     'Stock',
@@ -33,5 +35,7 @@ __all__ = [
     'Market',
     'IPOType',
     'IPOStatus',
-    'IPO'
+    'IPO',
+    'PriceHistoryCheckpoint',
+    'IndicatorState'
 ]
\ No newline at end of file
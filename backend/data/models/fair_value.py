@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+﻿from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from shared.db_engine import Base
 
@@ -17,8 +17,12 @@ class FairValue(Base):
     change = Column(Float)
     change_percentage = Column(Float)
 
-    # Unique constraint on released_at, source_id, and stock_id
-    __table_args__ = (UniqueConstraint('released_at', 'source_id', 'stock_id'),)
+    # Unique constraint on released_at, source_id, and stock_id; the (released_at, id)
+    # index serves newest-first keyset pagination
+    __table_args__ = (
+        UniqueConstraint('released_at', 'source_id', 'stock_id'),
+        Index('ix_fair_values_released_at_id', 'released_at', 'id'),
+    )
 
     # Relationships
     stock = relationship("Stock", back_populates="fair_values")
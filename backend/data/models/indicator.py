@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, Boolean, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, Boolean, String, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from shared.db_engine import Base
 
@@ -28,5 +28,8 @@ class Indicator(Base):
     direction = Column(String)  # 'up', 'down', or None
     strength = Column(Float)  # Strength of the turning point signal
 
+    # One row per stock per candle; bulk loads merge on this key
+    __table_args__ = (UniqueConstraint('stock_id', 'timestamp'),)
+
     # Relationships
     stock = relationship("Stock", back_populates="indicators")
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from shared.db_engine import Base
+
+class IndicatorState(Base):
+    """Model for the serialized streaming indicator state of a stock."""
+    __tablename__ = 'indicator_states'
+
+    stock_id = Column(Integer, ForeignKey('stocks.id'), primary_key=True)
+    last_timestamp = Column(DateTime, nullable=False)  # Newest candle folded into the state
+    state = Column(LargeBinary, nullable=False)  # Packed by sanitizer.indicator_state
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    stock = relationship("Stock")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from shared.db_engine import Base
+
+class PriceHistoryCheckpoint(Base):
+    """Model for the newest candle loaded per stock, so backfills can resume."""
+    __tablename__ = 'price_history_checkpoints'
+
+    stock_id = Column(Integer, ForeignKey('stocks.id'), primary_key=True)
+    last_timestamp = Column(DateTime, nullable=False)  # Newest candle stored in stock_prices
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    stock = relationship("Stock")
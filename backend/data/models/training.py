@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from shared.db_engine import Base
 
@@ -26,5 +26,8 @@ class TrainingData(Base):
     is_training_sample = Column(Boolean, default=True)
     fold_id = Column(Integer)  # For cross-validation
 
+    # One row per stock per candle; bulk loads merge on this key
+    __table_args__ = (UniqueConstraint('stock_id', 'timestamp'),)
+
     # Relationships
     stock = relationship("Stock")
@@ -9,6 +9,8 @@ from .fair_value_response import FairValueResponse
 from .fair_value_collection_response import FairValueCollectionResponse
 from .ipo_response import IPOResponse
 from .ipo_collection_response import IPOCollectionResponse
+from .price_history_response import PriceBar, PriceHistoryResponse
+from .job_response import JobResponse
 
 __all__ = [
     "StockResponse",
@@ -18,5 +20,8 @@ __all__ = [
     "FairValueResponse",
     "FairValueCollectionResponse",
     "IPOResponse",
-    "IPOCollectionResponse"
+    "IPOCollectionResponse",
+    "PriceBar",
+    "PriceHistoryResponse",
+    "JobResponse"
 ]
@@ -11,5 +11,6 @@ class FairValueCollectionResponse(BaseModel):
     success: bool
     message: str
     fair_values_collected: Optional[list[FairValueResponse]] = None
+    job_id: Optional[str] = None
     timestamp: datetime
     service: str = "collector"
@@ -4,9 +4,11 @@ Pydantic models for API responses.
 
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Any, Dict, Optional
 
 class HealthResponse(BaseModel):
     status: str
     database: bool
     service: str = "collector"
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+    pool: Optional[Dict[str, Any]] = None
\ No newline at end of file
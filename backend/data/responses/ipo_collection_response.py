@@ -11,5 +11,6 @@ class IPOCollectionResponse(BaseModel):
     success: bool
     message: str
     ipos_collected: Optional[list[IPOResponse]] = None
+    job_id: Optional[str] = None
     timestamp: datetime
     service: str = "collector"
@@ -0,0 +1,22 @@
+"""
+Pydantic models for collection job API responses.
+"""
+
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: str
+    name: str
+    params: Dict[str, Any] = {}
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
+    pages_fetched: int = 0
+    pages_total: Optional[int] = None
+    rows_written: int = 0
+    requests: int = 1
+    result: Any = None
+    error: Optional[str] = None
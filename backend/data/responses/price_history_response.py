@@ -0,0 +1,21 @@
+"""
+Pydantic models for chart price history responses.
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+class PriceBar(BaseModel):
+    time: int  # UTC epoch seconds (TradingView Lightweight Charts UTCTimestamp)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+class PriceHistoryResponse(BaseModel):
+    symbol: str
+    interval: str
+    count: int
+    next_cursor: Optional[int]  # Pass as `cursor` to load the bars before this page
+    bars: List[PriceBar]
@@ -11,5 +11,6 @@ class StockCollectionResponse(BaseModel):
     success: bool
     message: str
     stocks_collected: Optional[list[StockResponse]] = None
+    job_id: Optional[str] = None
     timestamp: datetime
     service: str = "collector"
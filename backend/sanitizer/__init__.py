@@ -1,10 +1,19 @@
 # Sanitizer package - Data processing and cleaning
 
-# Import main sanitization functions (when implemented)
-# from .sanitize import clean_data, compute_indicators, label_news
+# Import main sanitization functions
+from .indicators import compute_indicators, compute_all_indicators, compute_stock_indicators
+from .indicator_state import StreamingIndicators, refresh_indicators
+from .turning_points import detect_turning_points, detect_all_turning_points
+# from .sanitize import clean_data, label_news
 
 __all__ = [
+    'compute_indicators',
+    'compute_all_indicators',
+    'compute_stock_indicators',
+    'StreamingIndicators',
+    'refresh_indicators',
+    'detect_turning_points',
+    'detect_all_turning_points',
     # 'clean_data',
-    # 'compute_indicators',
     # 'label_news'
-]
\ No newline at end of file
+]
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicator State
+Constant-time indicator updates per new candle, persisted as a compact binary blob per stock.
+"""
+
+import math
+import struct
+import sys
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from shared import logger, get_session, price_range_query, upsert
+from data.models import Indicator, IndicatorState, Stock, StockPrice
+from .indicators import (
+    INDICATOR_COLUMNS, SMA_SHORT, SMA_LONG, EMA_FAST, EMA_SLOW, MACD_SIGNAL, RSI_PERIOD,
+    BOLLINGER_PERIOD, BOLLINGER_STDDEV, VOLUME_SMA, ema_alpha, wilder_alpha
+)
+
+NAN = float('nan')
+
+# Serialized layout: version, candle count, six scalar states, then the lengths
+# and contents of the close/volume windows and the pending seed buffers
+STATE_VERSION = 1
+_HEADER = struct.Struct('<BI6d4B')
+
+
+def _window_sum(values: Iterable[float]) -> float:
+    """Sum oldest to newest, the same order as `indicators.rolling_sum`."""
+    total = 0.0
+    for value in values:
+        total += value
+    return total
+
+
+def _tail(window: deque, size: int) -> List[float]:
+    """The newest `size` values of a window, oldest first."""
+    return list(window)[len(window) - size:]
+
+
+def _valid(value: float) -> bool:
+    return not math.isnan(value)
+
+
+class StreamingIndicators:
+    """
+    Incremental state for every Indicator column of one stock.
+
+    Holds running EMA values, Wilder RSI averages, the MACD signal EMA, and ring
+    buffers of the last closes and volumes for the SMA/Bollinger windows. Each
+    `update()` costs O(longest window) regardless of history length, and returns
+    exactly what `indicators.compute_indicators` produces for that candle: the
+    smoothing coefficients, seeding and summation order are the same.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.prev_close = NAN
+        self.ema_fast = NAN
+        self.ema_slow = NAN
+        self.macd_signal = NAN
+        self.avg_gain = NAN
+        self.avg_loss = NAN
+        self.closes = deque(maxlen=max(SMA_LONG, BOLLINGER_PERIOD, EMA_SLOW))
+        self.volumes = deque(maxlen=VOLUME_SMA)
+        # Values collected until a recursive average has enough to be seeded
+        self.macd_seed: List[float] = []
+        self.gain_seed: List[float] = []
+        self.loss_seed: List[float] = []
+
+    def _ema_step(self, previous: float, value: float, period: int, alpha: float) -> float:
+        """Advance an EMA over closes, seeding it with the SMA of the first `period` closes."""
+        index = self.count
+        if index < period - 1:
+            return NAN
+        if index == period - 1:
+            return _window_sum(_tail(self.closes, period)) / period
+        return alpha * value + (1.0 - alpha) * previous
+
+    def _sma(self, window: deque, period: int) -> float:
+        if len(window) < period:
+            return NAN
+        return _window_sum(_tail(window, period)) / period
+
+    def _bollinger(self, mean: float) -> Tuple[float, float]:
+        if not _valid(mean):
+            return NAN, NAN
+        deviations = 0.0
+        for value in _tail(self.closes, BOLLINGER_PERIOD):
+            deviation = value - mean
+            deviations += deviation * deviation
+        width = BOLLINGER_STDDEV * math.sqrt(deviations / BOLLINGER_PERIOD)
+        return mean + width, mean - width
+
+    def _update_signal(self, macd: float):
+        if not _valid(macd):
+            return
+        if _valid(self.macd_signal):
+            alpha = ema_alpha(MACD_SIGNAL)
+            self.macd_signal = alpha * macd + (1.0 - alpha) * self.macd_signal
+            return
+        self.macd_seed.append(macd)
+        if len(self.macd_seed) == MACD_SIGNAL:
+            self.macd_signal = _window_sum(self.macd_seed) / MACD_SIGNAL
+            self.macd_seed = []
+
+    def _update_rsi(self, close: float) -> float:
+        if not _valid(self.prev_close):
+            return NAN
+
+        change = close - self.prev_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if _valid(self.avg_gain):
+            alpha = wilder_alpha(RSI_PERIOD)
+            self.avg_gain = alpha * gain + (1.0 - alpha) * self.avg_gain
+            self.avg_loss = alpha * loss + (1.0 - alpha) * self.avg_loss
+        else:
+            self.gain_seed.append(gain)
+            self.loss_seed.append(loss)
+            if len(self.gain_seed) < RSI_PERIOD:
+                return NAN
+            self.avg_gain = _window_sum(self.gain_seed) / RSI_PERIOD
+            self.avg_loss = _window_sum(self.loss_seed) / RSI_PERIOD
+            self.gain_seed, self.loss_seed = [], []
+
+        if self.avg_loss == 0.0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+    def update(self, close: float, volume: Optional[float]) -> Dict[str, Optional[float]]:
+        """
+        Fold one new candle into the state.
+
+        Args:
+            close: Close price
+            volume: Volume (None if missing)
+
+        Returns:
+            Indicator column values for this candle (None where not yet defined)
+        """
+        close = float(close)
+        self.closes.append(close)
+        self.volumes.append(NAN if volume is None else float(volume))
+
+        self.ema_fast = self._ema_step(self.ema_fast, close, EMA_FAST, ema_alpha(EMA_FAST))
+        self.ema_slow = self._ema_step(self.ema_slow, close, EMA_SLOW, ema_alpha(EMA_SLOW))
+        macd = self.ema_fast - self.ema_slow
+        self._update_signal(macd)
+        rsi = self._update_rsi(close)
+        sma_20 = self._sma(self.closes, SMA_SHORT)
+        bollinger_upper, bollinger_lower = self._bollinger(self._sma(self.closes, BOLLINGER_PERIOD))
+
+        values = {
+            'rsi': rsi,
+            'sma_20': sma_20,
+            'sma_50': self._sma(self.closes, SMA_LONG),
+            'ema_12': self.ema_fast,
+            'ema_26': self.ema_slow,
+            'macd': macd,
+            'macd_signal': self.macd_signal,
+            'macd_histogram': macd - self.macd_signal,
+            'bollinger_upper': bollinger_upper,
+            'bollinger_lower': bollinger_lower,
+            'volume_sma': self._sma(self.volumes, VOLUME_SMA)
+        }
+
+        self.prev_close = close
+        self.count += 1
+        return {column: (value if _valid(value) else None) for column, value in values.items()}
+
+    def to_bytes(self) -> bytes:
+        """Pack the state into a compact little-endian blob (about 1 KB)."""
+        buffers = (list(self.closes), list(self.volumes), self.macd_seed, self.gain_seed + self.loss_seed)
+        header = _HEADER.pack(
+            STATE_VERSION, self.count, self.prev_close, self.ema_fast, self.ema_slow,
+            self.macd_signal, self.avg_gain, self.avg_loss,
+            len(buffers[0]), len(buffers[1]), len(buffers[2]), len(self.gain_seed)
+        )
+        values = [value for buffer in buffers for value in buffer]
+        return header + struct.pack(f'<{len(values)}d', *values)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'StreamingIndicators':
+        """
+        Restore a state packed by `to_bytes`.
+
+        Raises:
+            ValueError: Unknown state version
+        """
+        (version, count, prev_close, ema_fast, ema_slow, macd_signal, avg_gain, avg_loss,
+         n_closes, n_volumes, n_macd, n_rsi) = _HEADER.unpack_from(data)
+        if version != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version {version}")
+
+        total = n_closes + n_volumes + n_macd + 2 * n_rsi
+        values = list(struct.unpack_from(f'<{total}d', data, _HEADER.size))
+
+        state = cls()
+        state.count = count
+        state.prev_close, state.ema_fast, state.ema_slow = prev_close, ema_fast, ema_slow
+        state.macd_signal, state.avg_gain, state.avg_loss = macd_signal, avg_gain, avg_loss
+        offset = 0
+        for target, size in ((state.closes, n_closes), (state.volumes, n_volumes)):
+            target.extend(values[offset:offset + size])
+            offset += size
+        state.macd_seed = values[offset:offset + n_macd]
+        offset += n_macd
+        state.gain_seed = values[offset:offset + n_rsi]
+        state.loss_seed = values[offset + n_rsi:offset + 2 * n_rsi]
+        return state
+
+
+def apply_candles(state: StreamingIndicators, stock_id: int,
+                  candles: Iterable[Tuple[datetime, float, Optional[float]]]) -> List[Dict[str, Any]]:
+    """
+    Fold candles into a state and build the Indicator rows for them.
+
+    Args:
+        state: Streaming state (mutated)
+        stock_id: Stock id
+        candles: (timestamp, close, volume) tuples in time order
+
+    Returns:
+        Indicator row dicts, one per candle
+    """
+    return [
+        {'stock_id': stock_id, 'timestamp': timestamp, **state.update(close, volume)}
+        for timestamp, close, volume in candles
+    ]
+
+
+def refresh_stock(session, stock_id: int) -> int:
+    """
+    Bring one stock's indicators up to date with its newest candles.
+
+    Only candles after the stored state's last timestamp are read; a stock without a
+    stored state is bootstrapped by replaying its whole history once. Indicator rows
+    and the new state are written in the caller's transaction.
+
+    Args:
+        session: SQLAlchemy session
+        stock_id: Stock id
+
+    Returns:
+        Number of indicator rows written
+    """
+    record = session.get(IndicatorState, stock_id)
+    since = record.last_timestamp if record else None
+    state = StreamingIndicators.from_bytes(record.state) if record else StreamingIndicators()
+
+    result = session.execute(price_range_query(
+        stock_id, start=since, columns=[StockPrice.timestamp, StockPrice.close_price, StockPrice.volume]
+    ))
+    candles = [candle for candle in result if since is None or candle[0] > since]
+    if not candles:
+        return 0
+
+    rows = apply_candles(state, stock_id, candles)
+    upsert(session, Indicator.__table__, rows, ['stock_id', 'timestamp'], list(INDICATOR_COLUMNS))
+    upsert(session, IndicatorState.__table__, [{
+        'stock_id': stock_id,
+        'last_timestamp': candles[-1][0],
+        'state': state.to_bytes(),
+        'updated_at': datetime.utcnow()
+    }], ['stock_id'], ['last_timestamp', 'state', 'updated_at'])
+    return len(rows)
+
+
+def reset_stock_state(session, stock_id: int):
+    """
+    Forget a stock's streaming state, e.g. after past candles were corrected.
+
+    The next refresh replays the full history.
+    """
+    session.query(IndicatorState).filter(IndicatorState.stock_id == stock_id).delete()
+
+
+def refresh_indicators(stock_ids: Optional[Sequence[int]] = None) -> Dict[str, int]:
+    """
+    Incrementally refresh indicators for many stocks, one transaction per stock.
+
+    Args:
+        stock_ids: Stocks to refresh (None for every active stock)
+
+    Returns:
+        Totals: stocks updated, failed and rows written
+    """
+    with get_session() as session:
+        if stock_ids is None:
+            stock_ids = [stock_id for (stock_id,) in session.query(Stock.id).filter(Stock.is_active == True).all()]
+
+        totals = {'stocks': 0, 'failed': 0, 'rows': 0}
+        for stock_id in stock_ids:
+            try:
+                rows = refresh_stock(session, stock_id)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                totals['failed'] += 1
+                logger.error(f"❌ Incremental indicator refresh failed for stock {stock_id}: {e}")
+                continue
+            if rows:
+                totals['stocks'] += 1
+                totals['rows'] += rows
+
+    logger.info(f"⚡ Incremental indicator refresh: {totals}")
+    return totals
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Technical Indicator Engine
+Vectorized computation of the Indicator columns from stock_prices, fanned out across stocks.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.signal import lfilter
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from shared import config_manager, logger, get_session, price_range_query, bulk_load
+from shared.db_engine import engine
+from data.models import Indicator, Stock, StockPrice
+
+# Indicator periods
+SMA_SHORT = 20
+SMA_LONG = 50
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BOLLINGER_PERIOD = 20
+BOLLINGER_STDDEV = 2.0
+VOLUME_SMA = 20
+
+# Columns written by the engine; turning point columns are left untouched
+INDICATOR_COLUMNS = (
+    'rsi', 'sma_20', 'sma_50', 'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_histogram',
+    'bollinger_upper', 'bollinger_lower', 'volume_sma'
+)
+
+# Every recursive smoother below uses exactly these coefficients and the update
+# `alpha * x + decay * previous`, and every window reduction sums oldest to newest,
+# so the incremental state in `indicator_state` reproduces these values bit for bit.
+
+
+def ema_alpha(period: int) -> float:
+    """Smoothing factor of a standard EMA."""
+    return 2.0 / (period + 1)
+
+
+def wilder_alpha(period: int) -> float:
+    """Smoothing factor of Wilder's moving average (used by RSI)."""
+    return 1.0 / period
+
+
+def rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Sum of each trailing window, NaN until the first full window.
+
+    The window is accumulated oldest to newest with one vectorized add per offset,
+    so the cost is O(len * period) without per-candle Python loops.
+
+    Args:
+        values: Input series
+        period: Window length
+
+    Returns:
+        Array aligned with `values`
+    """
+    out = np.full(len(values), np.nan)
+    count = len(values) - period + 1
+    if count <= 0:
+        return out
+
+    total = values[0:count].astype(np.float64, copy=True)
+    for offset in range(1, period):
+        total += values[offset:offset + count]
+    out[period - 1:] = total
+    return out
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average, NaN until the first full window."""
+    return rolling_sum(values, period) / period
+
+
+def rolling_std(values: np.ndarray, period: int, means: np.ndarray) -> np.ndarray:
+    """
+    Population standard deviation of each trailing window.
+
+    Args:
+        values: Input series
+        period: Window length
+        means: SMA of the same window (from `sma`)
+
+    Returns:
+        Array aligned with `values`
+    """
+    out = np.full(len(values), np.nan)
+    count = len(values) - period + 1
+    if count <= 0:
+        return out
+
+    window_means = means[period - 1:]
+    deviation = values[0:count] - window_means
+    total = deviation * deviation
+    for offset in range(1, period):
+        deviation = values[offset:offset + count] - window_means
+        total += deviation * deviation
+    out[period - 1:] = np.sqrt(total / period)
+    return out
+
+
+def smoothed(values: np.ndarray, alpha: float, start: int, period: int) -> np.ndarray:
+    """
+    Recursive moving average seeded with the SMA of its first `period` values.
+
+    y[i] = alpha * x[i] + (1 - alpha) * y[i - 1], run as an IIR filter by lfilter.
+
+    Args:
+        values: Input series (values before `start` are ignored)
+        alpha: Smoothing factor
+        start: Index of the first valid input value
+        period: Seed window length
+
+    Returns:
+        Array aligned with `values`, NaN before `start + period - 1`
+    """
+    out = np.full(len(values), np.nan)
+    seed_index = start + period - 1
+    if seed_index >= len(values):
+        return out
+
+    seed = rolling_sum(values[start:start + period], period)[-1] / period
+    out[seed_index] = seed
+    if seed_index + 1 < len(values):
+        decay = 1.0 - alpha
+        out[seed_index + 1:], _ = lfilter([alpha], [1.0, -decay], values[seed_index + 1:], zi=[decay * seed])
+    return out
+
+
+def rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing.
+
+    Args:
+        closes: Close prices
+        period: RSI period
+
+    Returns:
+        Array aligned with `closes`, NaN until `period` changes are available
+    """
+    out = np.full(len(closes), np.nan)
+    if len(closes) <= period:
+        return out
+
+    changes = np.diff(closes)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+    alpha = wilder_alpha(period)
+    avg_gain = smoothed(gains, alpha, 0, period)
+    avg_loss = smoothed(losses, alpha, 0, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    out[1:] = np.where(np.isnan(avg_gain), np.nan, values)
+    return out
+
+
+def compute_indicators(closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute every Indicator column for one price series.
+
+    Args:
+        closes: Close prices in time order
+        volumes: Volumes in time order (NaN where missing)
+
+    Returns:
+        Mapping of Indicator column name to an array aligned with the candles
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+
+    sma_20 = sma(closes, SMA_SHORT)
+    ema_12 = smoothed(closes, ema_alpha(EMA_FAST), 0, EMA_FAST)
+    ema_26 = smoothed(closes, ema_alpha(EMA_SLOW), 0, EMA_SLOW)
+    macd = ema_12 - ema_26
+    macd_signal = smoothed(macd, ema_alpha(MACD_SIGNAL), EMA_SLOW - 1, MACD_SIGNAL)
+    bollinger_mid = sma(closes, BOLLINGER_PERIOD)
+    bollinger_width = BOLLINGER_STDDEV * rolling_std(closes, BOLLINGER_PERIOD, bollinger_mid)
+
+    return {
+        'rsi': rsi(closes),
+        'sma_20': sma_20,
+        'sma_50': sma(closes, SMA_LONG),
+        'ema_12': ema_12,
+        'ema_26': ema_26,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd - macd_signal,
+        'bollinger_upper': bollinger_mid + bollinger_width,
+        'bollinger_lower': bollinger_mid - bollinger_width,
+        'volume_sma': sma(volumes, VOLUME_SMA)
+    }
+
+
+def load_price_series(session, stock_id: int):
+    """
+    Load a stock's candles as NumPy arrays.
+
+    Args:
+        session: SQLAlchemy session
+        stock_id: Stock id
+
+    Returns:
+        (timestamps, closes, volumes) arrays in time order
+    """
+    rows = session.execute(price_range_query(
+        stock_id, columns=[StockPrice.timestamp, StockPrice.close_price, StockPrice.volume]
+    )).all()
+    if not rows:
+        return np.array([], dtype=object), np.array([]), np.array([])
+
+    timestamps, closes, volumes = zip(*rows)
+    return (
+        np.array(timestamps, dtype=object),
+        np.array(closes, dtype=np.float64),
+        np.array([np.nan if volume is None else volume for volume in volumes], dtype=np.float64)
+    )
+
+
+def indicator_rows(stock_id: int, timestamps: np.ndarray, values: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Turn indicator arrays into Indicator row dicts (NaN becomes NULL).
+
+    Args:
+        stock_id: Stock id
+        timestamps: Candle timestamps
+        values: Output of `compute_indicators`
+
+    Returns:
+        Row dicts for the bulk loader
+    """
+    matrix = np.column_stack([values[column] for column in INDICATOR_COLUMNS]).astype(object)
+    matrix[np.isnan(matrix.astype(np.float64))] = None
+    return [
+        {'stock_id': stock_id, 'timestamp': timestamp, **dict(zip(INDICATOR_COLUMNS, row))}
+        for timestamp, row in zip(timestamps, matrix.tolist())
+    ]
+
+
+def _init_worker():
+    """Drop connections inherited from the parent process."""
+    engine.dispose(close=False)
+
+
+def compute_stock_indicators(stock_id: int) -> Dict[str, Any]:
+    """
+    Recompute and store indicators for one stock (runs in a worker process).
+
+    Args:
+        stock_id: Stock id
+
+    Returns:
+        Stats with the stock id, candles read and rows written
+    """
+    with get_session() as session:
+        timestamps, closes, volumes = load_price_series(session, stock_id)
+
+    if not len(timestamps):
+        return {'stock_id': stock_id, 'candles': 0, 'rows': 0}
+
+    rows = indicator_rows(stock_id, timestamps, compute_indicators(closes, volumes))
+    stats = bulk_load(Indicator.__table__, rows, ['stock_id', 'timestamp'], list(INDICATOR_COLUMNS),
+                      batch_size=config_manager.get('indicators.batch_size', 50000))
+    return {'stock_id': stock_id, 'candles': len(timestamps), 'rows': stats['rows']}
+
+
+def compute_all_indicators(stock_ids: Optional[Sequence[int]] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Recompute indicators for many stocks in parallel worker processes.
+
+    Args:
+        stock_ids: Stocks to process (None for every active stock)
+        max_workers: Worker processes (default `indicators.max_workers`; 0 means CPU count)
+
+    Returns:
+        Totals: stocks, failed, candles, rows and seconds
+    """
+    if stock_ids is None:
+        with get_session() as session:
+            stock_ids = [stock_id for (stock_id,) in session.query(Stock.id).filter(Stock.is_active == True).all()]
+
+    max_workers = max_workers or config_manager.get('indicators.max_workers') or os.cpu_count() or 1
+    totals = {'stocks': 0, 'failed': 0, 'candles': 0, 'rows': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    logger.info(f"📈 Computing indicators for {len(stock_ids)} stocks with {max_workers} workers")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(compute_stock_indicators, stock_id): stock_id for stock_id in stock_ids}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                totals['failed'] += 1
+                logger.error(f"❌ Indicator computation failed for stock {futures[future]}: {e}")
+                continue
+            totals['stocks'] += 1
+            totals['candles'] += result['candles']
+            totals['rows'] += result['rows']
+
+    totals['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"🎉 Indicators computed: {totals}")
+    return totals
+
+
+def main():
+    """Command-line interface for indicator recomputation."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recompute technical indicators from stock prices")
+    parser.add_argument("--stock-id", type=int, action="append", help="Stock id to process (repeatable)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    args = parser.parse_args()
+
+    totals = compute_all_indicators(args.stock_id, args.workers)
+    sys.exit(1 if totals['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Turning Point Detector
+Marks swing highs and lows in each stock's price history on the Indicator rows.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.signal import find_peaks
+from sqlalchemy import func, select, update
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from shared import config_manager, logger, get_session, price_range_query, upsert
+from data.models import Indicator, Stock, StockPrice
+from .indicators import _init_worker
+
+UP = 'up'
+DOWN = 'down'
+
+
+def detect_turning_points(closes: np.ndarray, min_swing: float, min_distance: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find swing highs and lows in one vectorized pass.
+
+    A candle is a turning point when it is a local extremum whose prominence (the
+    move to the higher of its surrounding bases) is at least `min_swing` of its
+    price. Prominence only grows as later candles arrive, so a point near the end
+    of the series is reported only once the reversal after it has reached the
+    minimum swing, and is never retracted afterwards.
+
+    Args:
+        closes: Close prices in time order
+        min_swing: Minimum relative swing, e.g. 0.05 for 5%
+        min_distance: Minimum number of candles between turning points of the same kind
+
+    Returns:
+        (indices, directions, strengths): candle indices sorted by time, the direction
+        of the move that starts there ('up' after a low, 'down' after a high), and the
+        swing size relative to the price
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(closes) < 3:
+        return np.array([], dtype=np.int64), np.array([], dtype=object), np.array([])
+
+    threshold = min_swing * np.abs(closes)
+    peaks, peak_props = find_peaks(closes, prominence=threshold, distance=max(1, min_distance))
+    troughs, trough_props = find_peaks(-closes, prominence=threshold, distance=max(1, min_distance))
+
+    indices = np.concatenate([peaks, troughs])
+    directions = np.concatenate([np.full(len(peaks), DOWN, dtype=object), np.full(len(troughs), UP, dtype=object)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strengths = np.concatenate([peak_props['prominences'], trough_props['prominences']]) / np.abs(closes[indices])
+
+    order = np.argsort(indices, kind='stable')
+    return indices[order], directions[order], strengths[order]
+
+
+def _last_turning_point(session, stock_id: int):
+    """Timestamp of the newest stored turning point of a stock (None if there is none)."""
+    return session.execute(
+        select(func.max(Indicator.timestamp)).where(Indicator.stock_id == stock_id, Indicator.is_turning_point == True)
+    ).scalar_one_or_none()
+
+
+def _incremental_start(session, stock_id: int, context: int):
+    """
+    Start of the trailing window to re-examine.
+
+    Returns:
+        (first candle to load, last confirmed turning point); both None for a full pass
+    """
+    last_point = _last_turning_point(session, stock_id)
+    if last_point is None:
+        return None, None
+
+    # Keep `context` candles up to the last confirmed point so its neighbourhood is seen again;
+    # a shorter history is simply read from its start
+    first = session.execute(
+        select(StockPrice.timestamp)
+        .where(StockPrice.stock_id == stock_id, StockPrice.timestamp <= last_point)
+        .order_by(StockPrice.timestamp.desc())
+        .offset(max(context - 1, 0))
+        .limit(1)
+    ).scalar_one_or_none()
+    return first, last_point
+
+
+def update_stock_turning_points(session, stock_id: int, incremental: bool = False,
+                                min_swing: Optional[float] = None, min_distance: Optional[int] = None) -> int:
+    """
+    Detect and store turning points for one stock; the caller commits.
+
+    A full pass re-examines the whole history. The incremental pass only re-examines
+    candles after the newest stored turning point (with `turning_points.context`
+    candles before it for context): earlier points are already confirmed.
+
+    Args:
+        session: SQLAlchemy session
+        stock_id: Stock id
+        incremental: Only re-examine the trailing unconfirmed window
+        min_swing: Minimum relative swing (default `turning_points.min_swing`)
+        min_distance: Minimum candles between points (default `turning_points.min_distance`)
+
+    Returns:
+        Number of turning points written
+    """
+    min_swing = min_swing if min_swing is not None else config_manager.get('turning_points.min_swing', 0.05)
+    min_distance = min_distance or config_manager.get('turning_points.min_distance', 1)
+
+    start, last_point = (None, None)
+    if incremental:
+        start, last_point = _incremental_start(session, stock_id, config_manager.get('turning_points.context', 500))
+
+    rows = session.execute(price_range_query(
+        stock_id, start=start, columns=[StockPrice.timestamp, StockPrice.close_price]
+    )).all()
+    if not rows:
+        return 0
+
+    timestamps = np.array([row[0] for row in rows], dtype=object)
+    closes = np.array([row[1] for row in rows], dtype=np.float64)
+    indices, directions, strengths = detect_turning_points(closes, min_swing, min_distance)
+
+    # Clear previous marks in the re-examined range, then set the new ones
+    clear = update(Indicator).where(Indicator.stock_id == stock_id, Indicator.is_turning_point == True)
+    if last_point is not None:
+        clear = clear.where(Indicator.timestamp > last_point)
+        keep = timestamps[indices] > last_point
+        indices, directions, strengths = indices[keep], directions[keep], strengths[keep]
+    session.execute(clear.values(is_turning_point=False, direction=None, strength=None)
+                    .execution_options(synchronize_session=False))
+
+    points = [
+        {'stock_id': stock_id, 'timestamp': timestamp, 'is_turning_point': True,
+         'direction': direction, 'strength': float(strength)}
+        for timestamp, direction, strength in zip(timestamps[indices], directions, strengths)
+    ]
+    upsert(session, Indicator.__table__, points, ['stock_id', 'timestamp'], ['is_turning_point', 'direction', 'strength'])
+    return len(points)
+
+
+def detect_stock_turning_points(stock_id: int, incremental: bool = False) -> Dict[str, Any]:
+    """
+    Detect and commit turning points for one stock (runs in a worker process).
+
+    Args:
+        stock_id: Stock id
+        incremental: Only re-examine the trailing unconfirmed window
+
+    Returns:
+        Stats with the stock id and points written
+    """
+    with get_session() as session:
+        try:
+            points = update_stock_turning_points(session, stock_id, incremental)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    return {'stock_id': stock_id, 'points': points}
+
+
+def detect_all_turning_points(stock_ids: Optional[Sequence[int]] = None, incremental: bool = False,
+                              max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Detect turning points for many stocks in parallel worker processes.
+
+    Args:
+        stock_ids: Stocks to process (None for every active stock)
+        incremental: Only re-examine each stock's trailing unconfirmed window
+        max_workers: Worker processes (default `indicators.max_workers`; 0 means CPU count)
+
+    Returns:
+        Totals: stocks, failed, points and seconds
+    """
+    if stock_ids is None:
+        with get_session() as session:
+            stock_ids = [stock_id for (stock_id,) in session.query(Stock.id).filter(Stock.is_active == True).all()]
+
+    max_workers = max_workers or config_manager.get('indicators.max_workers') or os.cpu_count() or 1
+    totals = {'stocks': 0, 'failed': 0, 'points': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    logger.info(f"🔀 Detecting turning points for {len(stock_ids)} stocks "
+                f"({'incremental' if incremental else 'full'}, {max_workers} workers)")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(detect_stock_turning_points, stock_id, incremental): stock_id for stock_id in stock_ids}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                totals['failed'] += 1
+                logger.error(f"❌ Turning point detection failed for stock {futures[future]}: {e}")
+                continue
+            totals['stocks'] += 1
+            totals['points'] += result['points']
+
+    totals['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"🎉 Turning points detected: {totals}")
+    return totals
+
+
+def main():
+    """Command-line interface for turning point detection."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect turning points in stock prices")
+    parser.add_argument("--stock-id", type=int, action="append", help="Stock id to process (repeatable)")
+    parser.add_argument("--incremental", action="store_true", help="Only re-examine the trailing unconfirmed window")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    args = parser.parse_args()
+
+    totals = detect_all_turning_points(args.stock_id, args.incremental, args.workers)
+    sys.exit(1 if totals['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,21 @@
 
 # Import all shared utilities
 from .config_manager import config_manager, CONFIG
-from .db_engine import create_tables, check_connection, get_session, get_db
+from .db_engine import create_tables, check_connection, get_session, get_db, get_pool_stats
+from .db_engine import get_async_session, run_sync_transaction, check_connection_async
 from .db_init import DatabaseInitializer
+from .bulk import upsert, upsert_counting, build_upsert, dialect_insert
+from .bulk_loader import BulkLoader, bulk_load
+from .charting import chart_cache, get_price_series
+from .dimension_cache import dimension_cache, DimensionCache
 from .http_client import http_client
+from .job_manager import job_manager, report_progress, Job
+from .pagination import iter_pages, CrawlStatus
+from .market_hours import market_hours, MarketHours
+from .partitions import partition_manager, price_range_query, range_filter
+from .fast_json import fast_json_response, ndjson_response, ndjson_lines, ndjson_stream, check_response_format
+from .resilience import CircuitOpenError
+from .snapshot_cache import snapshot_cache, snapshot_response, json_response, serialize_json, view_etag, Snapshot
 from .custom_logging import logger, time_method, log_error_with_exception
 from .retry import smart_retry
 from .scrapers import web_scraper
@@ -16,8 +28,44 @@ __all__ = [
     'check_connection',
     'get_session',
     'get_db',
+    'get_pool_stats',
+    'get_async_session',
+    'run_sync_transaction',
+    'check_connection_async',
     'DatabaseInitializer',
+    'upsert',
+    'upsert_counting',
+    'build_upsert',
+    'dialect_insert',
+    'BulkLoader',
+    'bulk_load',
+    'chart_cache',
+    'get_price_series',
+    'dimension_cache',
+    'DimensionCache',
     'http_client',
+    'job_manager',
+    'report_progress',
+    'Job',
+    'iter_pages',
+    'CrawlStatus',
+    'market_hours',
+    'MarketHours',
+    'partition_manager',
+    'price_range_query',
+    'range_filter',
+    'fast_json_response',
+    'ndjson_response',
+    'ndjson_lines',
+    'ndjson_stream',
+    'check_response_format',
+    'CircuitOpenError',
+    'snapshot_cache',
+    'snapshot_response',
+    'json_response',
+    'serialize_json',
+    'view_etag',
+    'Snapshot',
     'logger',
     'time_method',
     'smart_retry',
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bulk Write Utilities Module
+Set-based INSERT ... ON CONFLICT helpers for PostgreSQL, with an SQLite equivalent for tests.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, func, literal_column, select
+
+# Stay well below the bind-parameter limits (PostgreSQL 65535, SQLite 32766)
+MAX_BIND_PARAMS = 30000
+
+
+def dialect_insert(dialect_name: str):
+    """Dialect-specific insert() supporting ON CONFLICT."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported for dialect '{dialect_name}'")
+    return insert
+
+
+def build_upsert(dialect_name: str, table: Table, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+                 update_columns: Optional[Sequence[str]] = None):
+    """
+    Build a multi-row INSERT ... ON CONFLICT statement.
+
+    Args:
+        dialect_name: 'postgresql' or 'sqlite'
+        table: Target table
+        rows: Row dicts; all must have the same keys
+        index_elements: Columns of the unique constraint to conflict on
+        update_columns: Columns overwritten from the incoming row on conflict
+            (None or empty means DO NOTHING)
+
+    Returns:
+        Executable insert statement
+    """
+    insert = dialect_insert(dialect_name)
+    stmt = insert(table).values(rows)
+    if update_columns:
+        return stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+
+
+def chunked(rows: List[Dict[str, Any]], columns_per_row: int) -> Iterable[List[Dict[str, Any]]]:
+    """Split rows so each statement stays under the bind-parameter limit."""
+    size = max(1, MAX_BIND_PARAMS // max(1, columns_per_row))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def upsert(session, table: Table, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+           update_columns: Optional[Sequence[str]] = None) -> int:
+    """
+    Upsert rows in as few statements as the bind-parameter limit allows.
+
+    The caller owns the transaction (commit/rollback).
+
+    Args:
+        session: SQLAlchemy session
+        table: Target table
+        rows: Row dicts; all must have the same keys and unique conflict keys
+        index_elements: Columns of the unique constraint to conflict on
+        update_columns: Columns overwritten on conflict (None means DO NOTHING)
+
+    Returns:
+        Number of rows sent
+    """
+    if not rows:
+        return 0
+
+    dialect_name = session.get_bind().dialect.name
+    for chunk in chunked(rows, len(rows[0])):
+        session.execute(build_upsert(dialect_name, table, chunk, index_elements, update_columns))
+    return len(rows)
+
+
+def upsert_counting(session, table: Table, rows: List[Dict[str, Any]], index_elements: Sequence[str],
+                    update_columns: Sequence[str]) -> Tuple[int, int]:
+    """
+    Upsert rows like `upsert()` and report how many were inserted vs updated.
+
+    PostgreSQL reports it per row with RETURNING (xmax = 0), which is true only for
+    freshly inserted tuples, so no lookup of existing keys is needed. Other dialects
+    compare the table's row count before and after (fine for the SQLite test setup).
+
+    Args:
+        session: SQLAlchemy session
+        table: Target table
+        rows: Row dicts; all must have the same keys and unique, non-NULL conflict keys
+        index_elements: Columns of the unique constraint to conflict on
+        update_columns: Columns overwritten on conflict
+
+    Returns:
+        (inserted, updated) counts
+    """
+    if not rows:
+        return 0, 0
+
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name != 'postgresql':
+        before = session.execute(select(func.count()).select_from(table)).scalar_one()
+        upsert(session, table, rows, index_elements, update_columns)
+        inserted = session.execute(select(func.count()).select_from(table)).scalar_one() - before
+        return inserted, len(rows) - inserted
+
+    inserted = 0
+    for chunk in chunked(rows, len(rows[0])):
+        stmt = build_upsert(dialect_name, table, chunk, index_elements, update_columns)
+        inserted += sum(1 for (was_inserted,) in session.execute(stmt.returning(literal_column('xmax') == 0))
+                        if was_inserted)
+    return inserted, len(rows) - inserted
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader Module
+Streams large row sets into time-series tables: COPY into a staging table and
+merge with ON CONFLICT on PostgreSQL, executemany batches elsewhere.
+"""
+
+import io
+import json
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Table
+
+from .bulk import dialect_insert
+from .custom_logging import logger
+from .db_engine import engine
+from .partitions import partition_manager
+
+# Staging-table column numbering rows in COPY order
+STAGING_SEQUENCE = '_load_seq'
+
+
+def _copy_value(value: Any) -> str:
+    """Render one value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=' ')
+    elif isinstance(value, date):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    else:
+        value = str(value)
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy_buffer(rows: List[Dict[str, Any]], columns: Sequence[str]) -> io.StringIO:
+    """Serialize rows into a COPY FROM STDIN text buffer."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(row.get(column)) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+class BulkLoader:
+    """
+    Loads rows into a table keyed by a unique constraint, replacing existing rows.
+
+    On PostgreSQL each batch is streamed with COPY FROM STDIN into a temporary
+    staging table, then merged into the target with one
+    INSERT ... SELECT ... ON CONFLICT statement and committed, so memory stays at one
+    batch and re-loading the same rows is idempotent. Other databases (SQLite in
+    tests) get executemany INSERT ... ON CONFLICT batches. On both paths the last
+    of several rows with the same key within a batch wins.
+
+    Usage:
+        loader = BulkLoader(StockPrice.__table__, ['stock_id', 'timestamp'], partition_column='timestamp')
+        stats = loader.load(candle_rows())
+    """
+
+    def __init__(self, table: Table, key_columns: Sequence[str], update_columns: Optional[Sequence[str]] = None,
+                 batch_size: int = 50000, partition_column: Optional[str] = None, bind=None):
+        """
+        Args:
+            table: Target table
+            key_columns: Columns of the unique constraint to merge on
+            update_columns: Columns overwritten on conflict (None: every non-key column;
+                empty: keep existing rows)
+            batch_size: Rows per COPY/merge round trip
+            partition_column: Timestamp column of a monthly-partitioned table; missing
+                partitions for each batch are created before it is merged
+            bind: Engine to load through (default: the shared engine)
+        """
+        self.table = table
+        self.key_columns = list(key_columns)
+        self.update_columns = update_columns
+        self.batch_size = batch_size
+        self.partition_column = partition_column
+        self.bind = bind or engine
+
+    def load(self, rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Load rows, committing after every batch.
+
+        Args:
+            rows: Row dicts (any iterable, e.g. a generator); every row must have the same keys
+            columns: Columns to load (default: keys of the first row)
+
+        Returns:
+            Load statistics: rows (unique keys per batch), batches, seconds and rows_per_second
+        """
+        iterator = iter(rows)
+        first_batch = list(islice(iterator, self.batch_size))
+        stats = {'table': self.table.name, 'rows': 0, 'batches': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+        if not first_batch:
+            return stats
+
+        columns = list(columns or first_batch[0].keys())
+        update_columns = self._update_columns(columns)
+        started = time.perf_counter()
+
+        def batches():
+            batch = first_batch
+            while batch:
+                yield batch
+                batch = list(islice(iterator, self.batch_size))
+
+        if self.bind.dialect.name == 'postgresql':
+            load_batches = self._copy_batches
+        else:
+            load_batches = self._executemany_batches
+
+        for loaded in load_batches(batches(), columns, update_columns):
+            stats['rows'] += loaded
+            stats['batches'] += 1
+
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        stats['rows_per_second'] = round(stats['rows'] / stats['seconds'], 1) if stats['seconds'] else float(stats['rows'])
+        logger.info(f"🚚 Bulk loaded {stats['rows']} rows into {self.table.name} in {stats['seconds']}s "
+                    f"({stats['rows_per_second']} rows/s, {stats['batches']} batches)")
+        return stats
+
+    def _update_columns(self, columns: Sequence[str]) -> List[str]:
+        if self.update_columns is not None:
+            return list(self.update_columns)
+        return [column for column in columns if column not in self.key_columns]
+
+    def _ensure_partitions(self, batch: List[Dict[str, Any]]):
+        if not self.partition_column:
+            return
+        timestamps = [row[self.partition_column] for row in batch if row.get(self.partition_column) is not None]
+        if timestamps:
+            partition_manager.ensure_partitions(self.table.name, min(timestamps), max(timestamps))
+
+    def _unique_rows(self, batch: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+        """Rows of a batch by key; later duplicates win, matching row-by-row semantics."""
+        return {tuple(row.get(column) for column in self.key_columns): row for row in batch}
+
+    def _merge_sql(self, staging: str, columns: Sequence[str], update_columns: Sequence[str]) -> str:
+        """INSERT ... SELECT from staging, keeping the last copied row of each duplicate key."""
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        key_list = ', '.join(f'"{column}"' for column in self.key_columns)
+        sql = (f'INSERT INTO "{self.table.name}" ({column_list}) '
+               f'SELECT DISTINCT ON ({key_list}) {column_list} FROM "{staging}" '
+               f'ORDER BY {key_list}, "{STAGING_SEQUENCE}" DESC '
+               f'ON CONFLICT ({key_list}) ')
+        if update_columns:
+            assignments = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in update_columns)
+            return sql + f'DO UPDATE SET {assignments}'
+        return sql + 'DO NOTHING'
+
+    def _copy_batches(self, batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str],
+                      update_columns: Sequence[str]) -> Iterable[int]:
+        """COPY each batch into a staging table and merge it into the target."""
+        staging = f"_staging_{self.table.name}"
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        merge_sql = self._merge_sql(staging, columns, update_columns)
+
+        connection = self.bind.raw_connection()
+        try:
+            cursor = connection.cursor()
+            # Rows are cleared on every commit; the table itself lives for the connection.
+            # The sequence column numbers rows in COPY order so the merge keeps the last duplicate
+            cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" '
+                           f'(LIKE "{self.table.name}" INCLUDING DEFAULTS, "{STAGING_SEQUENCE}" bigserial) '
+                           f'ON COMMIT DELETE ROWS')
+            connection.commit()
+
+            for batch in batches:
+                self._ensure_partitions(batch)
+                cursor.copy_expert(f'COPY "{staging}" ({column_list}) FROM STDIN', _copy_buffer(batch, columns))
+                cursor.execute(merge_sql)
+                connection.commit()
+                yield len(self._unique_rows(batch))
+
+            cursor.execute(f'DROP TABLE IF EXISTS "{staging}"')
+            connection.commit()
+            cursor.close()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def _executemany_batches(self, batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str],
+                             update_columns: Sequence[str]) -> Iterable[int]:
+        """Fallback: one executemany INSERT ... ON CONFLICT per batch."""
+        insert = dialect_insert(self.bind.dialect.name)
+        stmt = insert(self.table)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=self.key_columns,
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=self.key_columns)
+
+        for batch in batches:
+            unique = self._unique_rows(batch)
+            with self.bind.begin() as conn:
+                conn.execute(stmt, [{column: row.get(column) for column in columns} for row in unique.values()])
+            yield len(unique)
+
+
+def bulk_load(table: Table, rows: Iterable[Dict[str, Any]], key_columns: Sequence[str],
+              update_columns: Optional[Sequence[str]] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Load rows into `table` with a one-off BulkLoader.
+
+    Args:
+        table: Target table
+        rows: Row dicts (any iterable)
+        key_columns: Columns of the unique constraint to merge on
+        update_columns: Columns overwritten on conflict (None: every non-key column)
+        **kwargs: Extra BulkLoader options (batch_size, partition_column, bind)
+
+    Returns:
+        Load statistics
+    """
+    return BulkLoader(table, key_columns, update_columns, **kwargs).load(rows)
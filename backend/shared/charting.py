@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Charting Module
+Chart-ready OHLCV series: interval resampling, LTTB downsampling and an in-process cache of hot symbols.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from .config_manager import config_manager
+from .custom_logging import logger
+from .db_engine import get_async_session
+from .partitions import price_range_query
+from .snapshot_cache import snapshot_cache
+
+# A series is a dict of aligned NumPy arrays; `time` holds UTC epoch seconds
+SERIES_COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+# Fixed-width bucket sizes in seconds; weeks and months are calendar buckets
+INTERVAL_SECONDS = {'15m': 900, '1h': 3600, '1d': 86400}
+INTERVALS = ('15m', '1h', '1d', '1w', '1M')
+RAW_INTERVAL = '15m'
+
+# Data generation behind price endpoint ETags, bumped whenever candles are loaded
+PRICES_GENERATION = 'prices'
+
+WEEK_SECONDS = 7 * 86400
+# Weeks start on Sunday, the first EGX trading day (1970-01-04 was a Sunday)
+WEEK_OFFSET = 3 * 86400
+
+
+def empty_series() -> Dict[str, np.ndarray]:
+    return {column: np.array([], dtype=np.int64 if column == 'time' else np.float64) for column in SERIES_COLUMNS}
+
+
+def series_length(series: Dict[str, np.ndarray]) -> int:
+    return len(series['time'])
+
+
+def slice_series(series: Dict[str, np.ndarray], start: int, stop: int) -> Dict[str, np.ndarray]:
+    """Rows [start, stop) of a series (views, no copies)."""
+    return {column: values[start:stop] for column, values in series.items()}
+
+
+def bucket_starts(times: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Start of the interval bucket of every timestamp.
+
+    Args:
+        times: UTC epoch seconds
+        interval: One of INTERVALS
+
+    Returns:
+        Bucket start epoch seconds aligned with `times`
+    """
+    if interval == '1M':
+        return times.astype('datetime64[s]').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+    if interval == '1w':
+        return (times - WEEK_OFFSET) // WEEK_SECONDS * WEEK_SECONDS + WEEK_OFFSET
+    seconds = INTERVAL_SECONDS[interval]
+    return times // seconds * seconds
+
+
+def aggregate(series: Dict[str, np.ndarray], starts: np.ndarray, times: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Merge consecutive runs of candles into one candle each.
+
+    Args:
+        series: Input series in time order
+        starts: Index of the first candle of every run (ascending, starting at 0)
+        times: Timestamp of every run (default: time of its first candle)
+
+    Returns:
+        Series with one candle per run
+    """
+    if not len(starts):
+        return empty_series()
+    ends = np.append(starts[1:], series_length(series)) - 1
+    return {
+        'time': series['time'][starts] if times is None else times,
+        'open': series['open'][starts],
+        'high': np.maximum.reduceat(series['high'], starts),
+        'low': np.minimum.reduceat(series['low'], starts),
+        'close': series['close'][ends],
+        'volume': np.add.reduceat(series['volume'], starts)
+    }
+
+
+def resample_ohlcv(series: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Resample a candle series to a coarser interval in one vectorized pass.
+
+    Args:
+        series: Candles in time order
+        interval: One of INTERVALS
+
+    Returns:
+        One candle per non-empty bucket, stamped with the bucket start
+    """
+    if not series_length(series):
+        return empty_series()
+    keys = bucket_starts(series['time'], interval)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return aggregate(series, starts, keys[starts])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    Keeps the first and last points and, from each of `threshold - 2` equal buckets
+    in between, the point forming the largest triangle with the previously kept
+    point and the average of the next bucket. One vectorized step per output point.
+
+    Args:
+        x: Ascending x values
+        y: Values to preserve the shape of
+        threshold: Number of points to keep
+
+    Returns:
+        Ascending indices of the kept points
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    x = x.astype(np.float64)
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        low, high = edges[bucket], edges[bucket + 1]
+        next_high = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        avg_x, avg_y = x[high:next_high].mean(), y[high:next_high].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[low:high] - y[previous])
+            - (x[previous] - x[low:high]) * (avg_y - y[previous])
+        )
+        previous = low + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(series: Dict[str, np.ndarray], max_points: int) -> Dict[str, np.ndarray]:
+    """
+    Reduce a candle series to at most `max_points` candles.
+
+    LTTB picks the candles that best preserve the shape of the close line; each kept
+    candle then absorbs the candles up to the next kept one, so highs, lows and
+    volume inside the gaps are not lost.
+
+    Args:
+        series: Candles in time order
+        max_points: Maximum number of candles
+
+    Returns:
+        Downsampled series
+    """
+    if series_length(series) <= max_points:
+        return series
+    return aggregate(series, lttb(series['time'], series['close'], max_points))
+
+
+class ChartCache:
+    """
+    LRU cache of resampled price series per (symbol, interval).
+
+    Entries expire after `charts.cache_ttl_seconds` and are dropped as soon as new
+    candles for a symbol are loaded, so hot symbols are served from memory without
+    ever going more than one TTL stale.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, np.ndarray]]]" = OrderedDict()
+
+    def get(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, symbol: str, interval: str, series: Dict[str, np.ndarray]):
+        with self._lock:
+            self._entries[(symbol, interval)] = (time.monotonic(), series)
+            self._entries.move_to_end((symbol, interval))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """
+        Drop cached series of one symbol (or all symbols).
+
+        Args:
+            symbol: Symbol whose candles changed (None for all)
+        """
+        snapshot_cache.invalidate(PRICES_GENERATION)
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == symbol]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+async def _load_candles(stock_id: int) -> Dict[str, np.ndarray]:
+    """Load a stock's stored candles as a series (missing O/H/L fall back to the close)."""
+    from data.models import StockPrice
+
+    async with get_async_session() as session:
+        rows = (await session.execute(price_range_query(stock_id, columns=[
+            StockPrice.timestamp, StockPrice.open_price, StockPrice.high_price,
+            StockPrice.low_price, StockPrice.close_price, StockPrice.volume
+        ]))).all()
+    if not rows:
+        return empty_series()
+
+    timestamps, opens, highs, lows, closes, volumes = zip(*rows)
+    close = np.array(closes, dtype=np.float64)
+
+    def with_close(values):
+        array = np.array(values, dtype=np.float64)
+        return np.where(np.isnan(array), close, array)
+
+    return {
+        'time': np.array(timestamps, dtype='datetime64[s]').astype(np.int64),
+        'open': with_close(opens),
+        'high': with_close(highs),
+        'low': with_close(lows),
+        'close': close,
+        'volume': np.nan_to_num(np.array(volumes, dtype=np.float64))
+    }
+
+
+async def get_price_series(symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Get a symbol's full candle history at an interval, from the cache when hot.
+
+    Coarser intervals are resampled from the cached raw series, so one database read
+    serves every interval of a symbol.
+
+    Args:
+        symbol: Stock symbol
+        interval: One of INTERVALS
+
+    Returns:
+        Series in time order, or None for an unknown symbol
+    """
+    series = chart_cache.get(symbol, interval)
+    if series is not None:
+        return series
+
+    # Candles loaded while a price write invalidates the cache must not be cached
+    # under the new generation's ETag
+    generation = snapshot_cache.version(PRICES_GENERATION)
+    if interval == RAW_INTERVAL:
+        from data.models import Stock
+
+        async with get_async_session() as session:
+            stock_id = (await session.execute(select(Stock.id).where(Stock.symbol == symbol))).scalar_one_or_none()
+        if stock_id is None:
+            return None
+        started = time.perf_counter()
+        series = resample_ohlcv(await _load_candles(stock_id), RAW_INTERVAL)
+        logger.debug(f"📉 Loaded {series_length(series)} {symbol} candles in {time.perf_counter() - started:.3f}s")
+    else:
+        raw = await get_price_series(symbol, RAW_INTERVAL)
+        if raw is None:
+            return None
+        series = resample_ohlcv(raw, interval)
+
+    if snapshot_cache.version(PRICES_GENERATION) == generation:
+        chart_cache.put(symbol, interval, series)
+    return series
+
+
+# Global chart cache instance
+chart_cache = ChartCache(
+    max_entries=config_manager.get('charts.cache_max_entries', 64),
+    ttl=config_manager.get('charts.cache_ttl_seconds', 60)
+)
@@ -15,6 +15,7 @@ sys.path.insert(0, str(backend_dir))
 
 from shared.db_engine import create_tables, check_connection, get_session
 from shared.custom_logging import logger, log_error_with_exception
+from shared.partitions import partition_manager
 from data.models import Stock, Config
 
 class DatabaseInitializer:
@@ -40,6 +41,7 @@ class DatabaseInitializer:
         try:
             logger.info("Creating database schema...")
             create_tables()
+            partition_manager.ensure_configured_partitions('stock_prices')
             logger.info("✅ Database schema created successfully")
             return True
         except Exception as e:
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Dimension Cache Module
+Process-wide natural key -> id cache for small lookup tables (sectors, markets, IPO types, ...).
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, event, select, update
+from sqlalchemy.orm import Session
+
+from .bulk import upsert
+from .custom_logging import logger
+
+# Natural key column per table; everything else is keyed by `name`
+KEY_COLUMNS = {'stocks': 'symbol'}
+
+_PENDING_KEY = 'dimension_cache_pending'
+_PENDING_NAME_AR_KEY = 'dimension_cache_pending_name_ar'
+
+
+class DimensionCache:
+    """
+    Thread-safe cache mapping natural keys to ids for lookup tables.
+
+    Each table is warmed with one query on first use. `get_or_create_many` resolves
+    a whole batch of keys at once and inserts all unseen keys in a single
+    ON CONFLICT DO NOTHING statement, so per-row lookups cost O(dimensions)
+    queries per batch instead of O(rows x dimensions).
+
+    Ids inserted inside a transaction are only published to the shared cache when
+    that session commits (and dropped on rollback), so other threads never see ids
+    of rows that might not exist. Arabic-name fills are tracked the same way, so a
+    rolled-back fill is retried by the next batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids: Dict[str, Dict[Any, int]] = {}
+        self._has_name_ar: Dict[str, set] = {}
+
+    @staticmethod
+    def _key_column(model):
+        return getattr(model, KEY_COLUMNS.get(model.__tablename__, 'name'))
+
+    def warm(self, session, model):
+        """Load a whole lookup table into the cache with one query."""
+        table = model.__tablename__
+        key_column = self._key_column(model)
+        has_name_ar = hasattr(model, 'name_ar') and table not in KEY_COLUMNS
+
+        columns = [key_column, model.id] + ([model.name_ar] if has_name_ar else [])
+        rows = session.execute(select(*columns)).all()
+
+        with self._lock:
+            self._ids[table] = {row[0]: row[1] for row in rows}
+            self._has_name_ar[table] = {row[0] for row in rows if has_name_ar and row[2]}
+        logger.debug(f"🗂️ Dimension cache warmed {table}: {len(rows)} keys")
+
+    def _table_ids(self, session, model) -> Dict[Any, int]:
+        table = model.__tablename__
+        with self._lock:
+            ids = self._ids.get(table)
+        if ids is None:
+            self.warm(session, model)
+            with self._lock:
+                ids = self._ids[table]
+        return ids
+
+    def _pending(self, session, model) -> Dict[Any, int]:
+        """Ids created in this session's open transaction, not yet published."""
+        return session.info.setdefault(_PENDING_KEY, {}).setdefault(model.__tablename__, {})
+
+    def _pending_name_ar(self, session, model) -> set:
+        """Names whose Arabic name was filled in this session's open transaction, not yet published."""
+        return session.info.setdefault(_PENDING_NAME_AR_KEY, {}).setdefault(model.__tablename__, set())
+
+    def get_ids(self, session, model, keys: Iterable[Any]) -> Dict[Any, int]:
+        """
+        Resolve existing keys to ids without creating anything.
+
+        Args:
+            session: SQLAlchemy session
+            model: Lookup model (e.g. Stock, keyed by symbol)
+            keys: Natural keys to resolve
+
+        Returns:
+            Mapping of key to id for keys that exist
+        """
+        ids = self._table_ids(session, model)
+        pending = self._pending(session, model)
+        resolved = {}
+        for key in keys:
+            if key in pending:
+                resolved[key] = pending[key]
+            elif key in ids:
+                resolved[key] = ids[key]
+        return resolved
+
+    def get_id(self, session, model, key: Any) -> Optional[int]:
+        """Resolve a single existing key to its id (None if unknown)."""
+        return self.get_ids(session, model, [key]).get(key)
+
+    def get_or_create_many(self, session, model, names: Iterable[Tuple[Optional[str], Optional[str]]],
+                           extra: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Resolve (name, name_ar) pairs to ids, inserting unseen names in one statement.
+
+        Existing rows missing their Arabic name get it filled in with one UPDATE.
+
+        Args:
+            session: SQLAlchemy session
+            model: Lookup model with `id`, unique `name` and `name_ar` columns
+            names: (English name, Arabic name) pairs; None names are ignored
+            extra: Extra column values for inserted rows (e.g. a source's type_id)
+
+        Returns:
+            Mapping of name to id
+        """
+        table = model.__tablename__
+        wanted: Dict[str, Optional[str]] = {}
+        for name, name_ar in names:
+            if name is not None and (name not in wanted or not wanted[name]):
+                wanted[name] = name_ar
+        if not wanted:
+            return {}
+
+        resolved = self.get_ids(session, model, wanted)
+        missing = [name for name in wanted if name not in resolved]
+
+        if missing:
+            rows = [{'name': name, 'name_ar': wanted[name], **(extra or {})} for name in missing]
+            upsert(session, model.__table__, rows, ['name'])
+            created = dict(session.execute(
+                select(model.name, model.id).where(model.name.in_(missing))
+            ).all())
+            self._pending(session, model).update(created)
+            resolved.update(created)
+
+        pending_ar = self._pending_name_ar(session, model)
+        with self._lock:
+            known_ar = self._has_name_ar.get(table, set()) | pending_ar
+        fill_ar = {name: name_ar for name, name_ar in wanted.items()
+                   if name_ar and name not in missing and name not in known_ar}
+        if fill_ar:
+            session.execute(
+                update(model)
+                .where(model.name.in_(list(fill_ar)), model.name_ar.is_(None))
+                .values(name_ar=case(fill_ar, value=model.name))
+                .execution_options(synchronize_session=False)
+            )
+            pending_ar.update(fill_ar)
+
+        return resolved
+
+    def invalidate(self, model=None):
+        """
+        Drop cached ids for one table (or all tables); they are reloaded on next use.
+
+        Args:
+            model: Model whose table was written outside the cache (None for all)
+        """
+        with self._lock:
+            if model is None:
+                self._ids.clear()
+                self._has_name_ar.clear()
+            else:
+                self._ids.pop(model.__tablename__, None)
+                self._has_name_ar.pop(model.__tablename__, None)
+
+    def _publish(self, session):
+        """Move ids and Arabic-name fills of a committed transaction into the shared cache."""
+        pending = session.info.pop(_PENDING_KEY, None)
+        pending_name_ar = session.info.pop(_PENDING_NAME_AR_KEY, None)
+        if not pending and not pending_name_ar:
+            return
+        with self._lock:
+            for table, ids in (pending or {}).items():
+                if table in self._ids:
+                    self._ids[table].update(ids)
+            for table, names in (pending_name_ar or {}).items():
+                if table in self._has_name_ar:
+                    self._has_name_ar[table].update(names)
+
+    def _discard(self, session):
+        """Forget ids and Arabic-name fills of a rolled-back transaction."""
+        session.info.pop(_PENDING_KEY, None)
+        session.info.pop(_PENDING_NAME_AR_KEY, None)
+
+
+# Global dimension cache instance
+dimension_cache = DimensionCache()
+
+event.listen(Session, 'after_commit', dimension_cache._publish)
+event.listen(Session, 'after_rollback', dimension_cache._discard)
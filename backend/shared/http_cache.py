@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache Module
+On-disk response cache with conditional-GET revalidation and size-based LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .custom_logging import logger, log_error_with_exception
+
+
+class HttpCache:
+    """
+    Disk-backed cache of GET response bodies keyed by URL.
+
+    Each entry is stored as `<sha256>.body` plus `<sha256>.json` metadata holding the
+    ETag/Last-Modified validators. Entries are reused in two ways:
+    - TTL freshness: an entry younger than its TTL is served without any request;
+    - revalidation: stale entries send If-None-Match/If-Modified-Since and a 304
+      is answered from the stored body.
+    Total body size is capped; least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory: str = "cache/http", max_bytes: int = 256 * 1024 * 1024, default_ttl: float = 0.0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files on disk, oldest access first."""
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            if not body_path.exists():
+                meta_path.unlink(missing_ok=True)
+                continue
+            entries.append((meta_path.stat().st_mtime, meta_path.stem, body_path.stat().st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+        if entries:
+            logger.info(f"🗄️ HTTP cache loaded {len(entries)} entries ({self._total_bytes} bytes) from {self.directory}")
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """Stable file-name key for a URL."""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the cached entry for a URL, if any.
+
+        Returns:
+            Metadata dict with the body under 'content', or None
+        """
+        key = self.cache_key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['content'] = f.read()
+            os.utime(meta_path)  # Record the access for LRU ordering across restarts
+            return entry
+        except (OSError, json.JSONDecodeError):
+            self._remove(key)
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Whether an entry is still within its TTL and can be served without a request."""
+        ttl = entry.get('ttl') or 0
+        return ttl > 0 and time.time() - entry['stored_at'] < ttl
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Validator headers to revalidate a stale entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, response: httpx.Response, ttl: Optional[float] = None):
+        """
+        Store a 200 response if it can be reused (has validators or a positive TTL).
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified and ttl <= 0:
+            return
+
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+
+        key = self.cache_key(url)
+        meta_path, body_path = self._paths(key)
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': response.headers.get('Content-Type'),
+            'stored_at': time.time(),
+            'ttl': ttl
+        }
+
+        try:
+            with open(body_path, 'wb') as f:
+                f.write(content)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+        except OSError:
+            log_error_with_exception(f"⚠️ Failed to write HTTP cache entry for {url}", level="WARNING")
+            self._remove(key)
+            return
+
+        with self._lock:
+            self._total_bytes += len(content) - self._index.pop(key, 0)
+            self._index[key] = len(content)
+            self._evict()
+
+    def touch(self, entry: Dict[str, Any]):
+        """Restart the TTL of an entry after a successful 304 revalidation."""
+        meta_path, _ = self._paths(self.cache_key(entry['url']))
+        metadata = {k: v for k, v in entry.items() if k != 'content'}
+        metadata['stored_at'] = time.time()
+        try:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f)
+        except OSError:
+            logger.warning(f"⚠️ Failed to refresh HTTP cache entry for {entry['url']}")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits. Caller holds the lock."""
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._total_bytes -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def build_response(self, url: str, entry: Dict[str, Any]) -> httpx.Response:
+        """Rebuild a 200 response from a cached entry."""
+        headers = {'X-Cache': 'HIT'}
+        if entry.get('content_type'):
+            headers['Content-Type'] = entry['content_type']
+        if entry.get('etag'):
+            headers['ETag'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['Last-Modified'] = entry['last_modified']
+        return httpx.Response(200, headers=headers, content=entry['content'], request=httpx.Request("GET", url))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size."""
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved,
+            'entries': len(self._index),
+            'size_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
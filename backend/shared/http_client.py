@@ -1,24 +1,48 @@
 #!/usr/bin/env python3
 """
 HTTP Client Module
-Provides a robust HTTP client with connection pooling, retry logic, and logging hooks.
+Provides a robust HTTP client with connection pooling, retry logic, per-host rate limiting,
+an opt-in conditional-GET response cache and logging hooks.
 """
 
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from .config_manager import config_manager
 from .custom_logging import logger
+from .rate_limiter import HostRateLimiter
+from .http_cache import HttpCache
+from .resilience import RetryBudget, CircuitBreaker, LatencyTracker
+
+# Responses worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
 class HttpClient:
     """
     Asynchronous HTTP client with connection pooling, retry logic, and logging hooks.
     Reads configuration from the database config table.
+
+    Every request is paced by a per-host adaptive rate limiter (`http.rate_limit`),
+    shared by all collectors using the global instance. GET responses can be cached
+    on disk and revalidated with ETag/Last-Modified (`http.cache`, opt-in).
+
+    GETs are retried with jittered exponential backoff (`http.retry`, `retry.jitter_range`),
+    limited by a per-host retry budget, short-circuited while a host's circuit breaker
+    is open, and optionally hedged when a response is slower than usual (`http.hedging`).
     """
 
     def __init__(self):
         self.client = None
+        self.rate_limiter = None
+        self.cache = None
+        self._hosts = {}
         self._initialized = False
 
     def _ensure_initialized(self):
@@ -33,6 +57,15 @@ class HttpClient:
                 limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
             )
             logger.info("✅ HTTP client initialized successfully")
+
+            rate_limit_config = config_manager.get('http.rate_limit', {})
+            if rate_limit_config.get('enabled', True):
+                self.rate_limiter = HostRateLimiter(rate_limit_config)
+                logger.info(f"🚦 Per-host rate limiting enabled at {self.rate_limiter.bucket_settings['initial_rate']} req/s")
+
+            if config_manager.get('http.cache.enabled', False):
+                self._create_cache()
+
             self._initialized = True
 
         except Exception as e:
@@ -40,6 +73,40 @@ class HttpClient:
             self.client = None
             self._initialized = True  # Don't try again
 
+    def _create_cache(self) -> HttpCache:
+        """Create the on-disk response cache from the `http.cache` config section."""
+        cache_config = config_manager.get('http.cache', {})
+        self.cache = HttpCache(
+            directory=cache_config.get('directory', 'cache/http'),
+            max_bytes=int(cache_config.get('max_size_mb', 256)) * 1024 * 1024,
+            default_ttl=float(cache_config.get('ttl_seconds', 0))
+        )
+        logger.info(f"🗄️ HTTP response cache enabled at {self.cache.directory}")
+        return self.cache
+
+    def _host_state(self, url: str) -> Dict[str, Any]:
+        """Get (or lazily create) the retry budget, circuit breaker and latency tracker for a host."""
+        host = urlparse(str(url)).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            budget_config = config_manager.get('http.retry_budget', {})
+            breaker_config = config_manager.get('http.circuit_breaker', {})
+            state = {
+                'budget': RetryBudget(
+                    ratio=float(budget_config.get('ratio', 0.2)),
+                    min_retries=int(budget_config.get('min_retries', 3)),
+                    window_seconds=float(budget_config.get('window_seconds', 10.0))
+                ),
+                'breaker': CircuitBreaker(
+                    host,
+                    failure_threshold=int(breaker_config.get('failure_threshold', 5)),
+                    reset_timeout=float(breaker_config.get('reset_timeout', 30.0))
+                ),
+                'latency': LatencyTracker()
+            }
+            self._hosts[host] = state
+        return state
+
     def _log_request(self, request):
         """Log outgoing HTTP requests."""
         logger.info(f"🌐 HTTP Request: {request.method} {request.url}")
@@ -48,12 +115,175 @@ class HttpClient:
         """Log incoming HTTP responses."""
         logger.info(f"🌐 HTTP Response: {response.status_code} {response.url}")
 
-    async def get(self, url: str, **kwargs) -> httpx.Response:
-        """Perform GET request with retry logic."""
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the host's rate limiter and feed the outcome back to it."""
         self._ensure_initialized()
         if self.client is None:
             raise RuntimeError("HTTP client not initialized. Check configuration and database connection.")
-        return await self.client.get(url, **kwargs)
+
+        if self.rate_limiter is None:
+            return await self.client.request(method, url, **kwargs)
+
+        await self.rate_limiter.acquire(url)
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            self.rate_limiter.record_failure(url)
+            raise
+
+        self.rate_limiter.record_response(url, response)
+        return response
+
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current per-host rate and queue depth of the rate limiter."""
+        return self.rate_limiter.stats() if self.rate_limiter is not None else {}
+
+    def get_host_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state and retry budget usage per host."""
+        return {
+            host: {**state['breaker'].stats(), 'retry_budget': state['budget'].stats()}
+            for host, state in self._hosts.items()
+        }
+
+    async def _hedged_get(self, url: str, state: Dict[str, Any], **kwargs) -> httpx.Response:
+        """
+        Send a GET, firing a second copy if the first is slower than the host's usual latency.
+
+        The hedge delay is the configured percentile of recent latencies (falling back to
+        `http.hedging.delay`), and each hedge is paid for from the retry budget.
+        """
+        hedge_config = config_manager.get('http.hedging', {})
+        latency = state['latency']
+        started = time.monotonic()
+
+        if not hedge_config.get('enabled', False):
+            response = await self._send("GET", url, **kwargs)
+            latency.record(time.monotonic() - started)
+            return response
+
+        hedge_delay = latency.percentile(float(hedge_config.get('percentile', 0.95)))
+        if hedge_delay is None:
+            hedge_delay = float(hedge_config.get('delay', 2.0))
+
+        tasks = [asyncio.ensure_future(self._send("GET", url, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done and state['budget'].try_spend():
+                logger.info(f"🪁 Hedging slow GET {url} after {hedge_delay:.2f}s")
+                tasks.append(asyncio.ensure_future(self._send("GET", url, **kwargs)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        latency.record(time.monotonic() - started)
+                        return task.result()
+
+            # Every copy failed: surface the primary's error
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _resilient_get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET with jittered exponential retry, a per-host retry budget and a circuit breaker.
+
+        Raises:
+            CircuitOpenError: The host's circuit breaker is open
+            httpx.TransportError: The last attempt failed at the transport level
+        """
+        retry_config = config_manager.get('http.retry', {})
+        max_attempts = int(retry_config.get('max_attempts', 3))
+        base_delay = float(retry_config.get('base_delay', 1.0))
+        max_delay = float(retry_config.get('max_delay', 60.0))
+        backoff_factor = float(config_manager.get('retry.backoff_factor', 2))
+        jitter_low, jitter_high = config_manager.get('retry.jitter_range', [0.5, 1.5])
+
+        state = self._host_state(url)
+        breaker, budget = state['breaker'], state['budget']
+        budget.record_request()
+
+        attempt = 1
+        while True:
+            breaker.before_request()
+            response, error = None, None
+            try:
+                response = await self._hedged_get(url, state, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+                breaker.record_failure()
+            except BaseException:
+                # Cancelled or failed without a verdict on the host: free the half-open probe slot
+                breaker.release_probe()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+
+            if attempt >= max_attempts or not budget.try_spend():
+                if response is not None:
+                    return response
+                raise error
+
+            delay = min(max_delay, base_delay * backoff_factor ** (attempt - 1)) * random.uniform(jitter_low, jitter_high)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logger.warning(f"⚠️ GET {url} failed (attempt {attempt}/{max_attempts}): {reason}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response cache."""
+        return self.cache.stats() if self.cache is not None else {'enabled': False}
+
+    async def get(self, url: str, use_cache: Optional[bool] = None, cache_ttl: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        Perform GET request with retry logic.
+
+        Args:
+            url: URL to fetch
+            use_cache: Force the response cache on/off for this call (None follows `http.cache.enabled`)
+            cache_ttl: Freshness lifetime in seconds for this response, for endpoints without validators
+        """
+        self._ensure_initialized()
+        if use_cache and self.cache is None:
+            self._create_cache()
+
+        cache = self.cache if use_cache is not False else None
+        if cache is None:
+            return await self._resilient_get(url, **kwargs)
+
+        cache_url = str(httpx.URL(url, params=kwargs.get('params')))
+        entry = await asyncio.to_thread(cache.lookup, cache_url)
+
+        if entry is not None and cache.is_fresh(entry):
+            cache.hits += 1
+            cache.bytes_saved += len(entry['content'])
+            return cache.build_response(cache_url, entry)
+
+        if entry is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(cache.conditional_headers(entry))
+            kwargs['headers'] = headers
+
+        response = await self._resilient_get(url, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            cache.bytes_saved += len(entry['content'])
+            await asyncio.to_thread(cache.touch, entry)
+            return cache.build_response(cache_url, entry)
+
+        cache.misses += 1
+        if response.status_code == 200:
+            await asyncio.to_thread(cache.store, cache_url, response, cache_ttl)
+        return response
 
     @retry(
         stop=stop_after_attempt(3),  # Default fallback
@@ -73,10 +303,7 @@ class HttpClient:
     )
     async def post(self, url: str, **kwargs) -> httpx.Response:
         """Perform POST request with retry logic."""
-        self._ensure_initialized()
-        if self.client is None:
-            raise RuntimeError("HTTP client not initialized. Check configuration and database connection.")
-        return await self.client.post(url, **kwargs)
+        return await self._send("POST", url, **kwargs)
 
     @retry(
         stop=stop_after_attempt(3),  # Default fallback
@@ -96,10 +323,7 @@ class HttpClient:
     )
     async def put(self, url: str, **kwargs) -> httpx.Response:
         """Perform PUT request with retry logic."""
-        self._ensure_initialized()
-        if self.client is None:
-            raise RuntimeError("HTTP client not initialized. Check configuration and database connection.")
-        return await self.client.put(url, **kwargs)
+        return await self._send("PUT", url, **kwargs)
 
     @retry(
         stop=stop_after_attempt(3),  # Default fallback
@@ -119,10 +343,7 @@ class HttpClient:
     )
     async def delete(self, url: str, **kwargs) -> httpx.Response:
         """Perform DELETE request with retry logic."""
-        self._ensure_initialized()
-        if self.client is None:
-            raise RuntimeError("HTTP client not initialized. Check configuration and database connection.")
-        return await self.client.delete(url, **kwargs)
+        return await self._send("DELETE", url, **kwargs)
 
     async def close(self):
         """Close the HTTP client."""
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Job Manager Module
+Single-flight background jobs with ids and progress reported through a context variable.
+"""
+
+import asyncio
+import contextvars
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config_manager import config_manager
+from .custom_logging import logger
+
+
+@dataclass
+class Job:
+    """One run of a named collection and its progress counters."""
+    id: str
+    name: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = 'running'  # running, succeeded or failed
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    pages_fetched: int = 0
+    pages_total: Optional[int] = None
+    rows_written: int = 0
+    requests: int = 1  # Requests served by this run, including coalesced ones
+    result: Any = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _started: float = field(default_factory=time.monotonic, repr=False)
+    _elapsed: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def running(self) -> bool:
+        return self.status == 'running'
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self._elapsed if self._elapsed is not None else time.monotonic() - self._started
+        return {
+            'id': self.id,
+            'name': self.name,
+            'params': self.params,
+            'status': self.status,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed_seconds': round(elapsed, 1),
+            'pages_fetched': self.pages_fetched,
+            'pages_total': self.pages_total,
+            'rows_written': self.rows_written,
+            'requests': self.requests,
+            'result': self.result,
+            'error': self.error
+        }
+
+
+# Job of the running collection; tasks and threads started from it inherit it
+current_job: "contextvars.ContextVar[Optional[Job]]" = contextvars.ContextVar('current_job', default=None)
+
+
+def report_progress(pages: int = 0, rows: int = 0, pages_total: Optional[int] = None):
+    """
+    Add to the progress of the job running in the current context (no-op outside jobs).
+
+    Args:
+        pages: Pages fetched since the last report
+        rows: Rows written since the last report
+        pages_total: Pages this run expects to fetch in all (added to the total)
+    """
+    job = current_job.get()
+    if job is None:
+        return
+    job.pages_fetched += pages
+    job.rows_written += rows
+    if pages_total is not None:
+        job.pages_total = (job.pages_total or 0) + pages_total
+
+
+class JobManager:
+    """
+    Runs at most one job per name at a time.
+
+    `start()` returns the in-flight job when one with the same name is running
+    (single-flight), so repeated triggers and sync requests share one crawl instead
+    of competing for rate limits and locks. Finished jobs stay queryable by id
+    until `jobs.max_history` newer ones have finished.
+    """
+
+    def __init__(self, max_history: int = 100):
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._running: Dict[str, Job] = {}
+
+    def start(self, name: str, factory: Callable[[], Awaitable[Any]], **params) -> Job:
+        """
+        Start a job, or join the running job of the same name.
+
+        Args:
+            name: Collection name (the single-flight key)
+            factory: Coroutine function doing the work
+            **params: Parameters recorded on the job for display
+
+        Returns:
+            The new or in-flight job
+        """
+        job = self._running.get(name)
+        if job is not None:
+            job.requests += 1
+            logger.info(f"🔗 Joined running {name} job {job.id} ({job.requests} requests)")
+            return job
+
+        job = Job(id=uuid.uuid4().hex, name=name, params=params)
+        self._running[name] = job
+        self._jobs[job.id] = job
+        # The context copy taken here carries `current_job` into the task
+        token = current_job.set(job)
+        try:
+            job.task = asyncio.create_task(self._run(job, factory))
+        finally:
+            current_job.reset(token)
+        # Failures are recorded on the job; don't warn about unawaited background runs
+        job.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        logger.info(f"🚀 Started {name} job {job.id}")
+        return job
+
+    async def run(self, name: str, factory: Callable[[], Awaitable[Any]], **params) -> Any:
+        """
+        Start or join a job and wait for its result.
+
+        Cancelling the waiter does not cancel the shared run.
+
+        Returns:
+            The job's result (its exception is raised on failure)
+        """
+        return await self.wait(self.start(name, factory, **params))
+
+    async def wait(self, job: Job) -> Any:
+        """
+        Wait for a job's result without cancelling the shared run if the waiter is cancelled.
+
+        Returns:
+            The job's result (its exception is raised on failure)
+        """
+        return await asyncio.shield(job.task)
+
+    async def _run(self, job: Job, factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            job.result = await factory()
+            job.status = 'succeeded'
+            return job.result
+        except BaseException as e:
+            job.status = 'failed'
+            job.error = str(e) or type(e).__name__
+            raise
+        finally:
+            job.finished_at = datetime.now()
+            job._elapsed = time.monotonic() - job._started
+            self._running.pop(job.name, None)
+            self._prune()
+            logger.info(f"🏁 {job.name} job {job.id} {job.status} in {job._elapsed:.1f}s: "
+                        f"{job.pages_fetched} pages, {job.rows_written} rows")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.running]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def running(self, name: str) -> Optional[Job]:
+        """The in-flight job of a name, if any."""
+        return self._running.get(name)
+
+    def list(self) -> List[Job]:
+        """Known jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+
+# Global job manager instance
+job_manager = JobManager(max_history=config_manager.get('jobs.max_history', 100))
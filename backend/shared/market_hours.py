@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Market Hours Module
+EGX trading session calendar (Africa/Cairo, Sunday-Thursday 10:00-14:30 by default).
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from .config_manager import config_manager
+
+
+class MarketHours:
+    """
+    Trading session calendar of the exchange.
+
+    Configured under `market_hours`: `timezone`, `trading_days` (Python weekdays,
+    Monday=0 ... Sunday=6), and `open`/`close` local times. Public holidays are
+    not modelled; on a holiday the market is reported open during session hours.
+    """
+
+    def __init__(self):
+        config = config_manager.get('market_hours', {})
+        self.timezone = ZoneInfo(config.get('timezone', 'Africa/Cairo'))
+        self.trading_days = set(config.get('trading_days', [6, 0, 1, 2, 3]))
+        self.open_time = time.fromisoformat(config.get('open', '10:00'))
+        self.close_time = time.fromisoformat(config.get('close', '14:30'))
+
+    def now(self) -> datetime:
+        """Current time in the exchange's timezone."""
+        return datetime.now(self.timezone)
+
+    def _local(self, now: Optional[datetime]) -> datetime:
+        if now is None:
+            return self.now()
+        return now.replace(tzinfo=self.timezone) if now.tzinfo is None else now.astimezone(self.timezone)
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """
+        Whether the market is in session.
+
+        Args:
+            now: Moment to check (default: now); naive values are taken as local time
+
+        Returns:
+            True between the open and close of a trading day
+        """
+        now = self._local(now)
+        return now.weekday() in self.trading_days and self.open_time <= now.time() < self.close_time
+
+    def seconds_until_open(self, now: Optional[datetime] = None) -> float:
+        """
+        Seconds until the next session opens (0 while in session).
+
+        Args:
+            now: Moment to measure from (default: now)
+
+        Returns:
+            Seconds to the next open
+        """
+        now = self._local(now)
+        if self.is_open(now):
+            return 0.0
+        for days in range(8):
+            day = (now + timedelta(days=days)).date()
+            if day.weekday() not in self.trading_days:
+                continue
+            opens_at = datetime.combine(day, self.open_time, tzinfo=self.timezone)
+            if opens_at > now:
+                return (opens_at - now).total_seconds()
+        return 0.0
+
+
+# Global market hours instance
+market_hours = MarketHours()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Pagination Utilities Module
+Fetches paged Mubasher API listings with bounded concurrency.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .custom_logging import logger
+from .job_manager import report_progress
+
+PageFetcher = Callable[[int], Awaitable[Dict[str, Any]]]
+
+
+class CrawlStatus:
+    """
+    Outcome of a paged crawl, filled in by the page iterator.
+
+    `complete` is set only once every page of the listing was fetched: it stays
+    False after a failed page, a `max_pages` cutoff, or a consumer that stopped
+    early. Callers must not treat a partial crawl as the full listing (e.g. to
+    advance watermarks or deactivate rows missing from it).
+    """
+
+    def __init__(self):
+        self.complete = False
+        self.failed_pages: List[int] = []
+
+
+async def iter_pages(fetch_func: PageFetcher, max_pages: Optional[int] = None,
+                     max_concurrency: int = 4, label: str = "pages",
+                     status: Optional[CrawlStatus] = None) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (page, response) pairs as pages complete.
+
+    Page 0 is fetched first to learn `numberOfPages`; the remaining pages are then
+    fetched concurrently, at most `max_concurrency` at a time. Pages are yielded in
+    completion order, so callers that need page order must reassemble it.
+
+    A failure on page 0 propagates; a failure on any later page is logged and the
+    page is skipped so one flaky page does not abort the whole crawl.
+
+    Args:
+        fetch_func: Coroutine function taking a 0-based page number
+        max_pages: Maximum number of pages to fetch (None for all)
+        max_concurrency: Maximum number of pages in flight at once
+        label: Description used in log messages
+        status: Receives whether the whole listing was fetched
+    """
+    status = status if status is not None else CrawlStatus()
+    if max_pages is not None and max_pages <= 0:
+        return
+
+    first = await fetch_func(0)
+    number_of_pages = (first.get('numberOfPages') or 1) if first.get('rows') else 1
+    last_page = number_of_pages if max_pages is None else min(number_of_pages, max_pages)
+    report_progress(pages=1, pages_total=last_page)
+    yield 0, first
+
+    if last_page <= 1:
+        status.complete = last_page == number_of_pages
+        return
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(page: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+        async with semaphore:
+            try:
+                response = await fetch_func(page)
+                report_progress(pages=1)
+                return page, response
+            except Exception as e:
+                logger.error(f"❌ Error fetching {label} page {page}: {e}")
+                status.failed_pages.append(page)
+                return page, None
+
+    logger.info(f"📄 Fetching {last_page - 1} more {label} pages with concurrency {max_concurrency}")
+    tasks = [asyncio.ensure_future(fetch(page)) for page in range(1, last_page)]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            page, response = await next_done
+            if response is not None:
+                yield page, response
+        status.complete = not status.failed_pages and last_page == number_of_pages
+    finally:
+        # Consumer stopped early or was cancelled: don't leave fetches running
+        for task in tasks:
+            if not task.done():
+                task.cancel()
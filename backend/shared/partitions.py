@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Table Partitioning Module
+Monthly range partitions for time-series tables and partition-pruning-friendly range queries.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import select, text
+
+from .config_manager import config_manager
+from .custom_logging import logger
+from .db_engine import engine
+
+DateLike = Union[date, datetime]
+
+
+def month_start(value: DateLike) -> date:
+    """First day of the month containing `value`."""
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    """First day of the month after `value`."""
+    return date(value.year + 1, 1, 1) if value.month == 12 else date(value.year, value.month + 1, 1)
+
+
+def month_range(start: DateLike, end: DateLike) -> Iterable[Tuple[date, date]]:
+    """
+    Yield [lower, upper) bounds of every month overlapping [start, end].
+
+    Args:
+        start: First date to cover
+        end: Last date to cover (inclusive)
+
+    Yields:
+        (month start, next month start) tuples
+    """
+    lower, last = month_start(start), month_start(end)
+    while lower <= last:
+        upper = next_month(lower)
+        yield lower, upper
+        lower = upper
+
+
+def partition_name(table: str, lower: date) -> str:
+    """Name of the monthly partition of `table` starting at `lower`, e.g. stock_prices_y2024m01."""
+    return f"{table}_y{lower.year:04d}m{lower.month:02d}"
+
+
+class PartitionManager:
+    """
+    Creates monthly range partitions on demand for PostgreSQL partitioned tables.
+
+    Partitions are created with CREATE TABLE IF NOT EXISTS ... PARTITION OF, so calls
+    are idempotent and safe across processes; names already created by this process
+    are remembered to avoid repeating the DDL on every load. On other databases
+    (SQLite in tests) every call is a no-op.
+    """
+
+    def __init__(self, bind=None):
+        self.bind = bind or engine
+        self._lock = threading.Lock()
+        self._created = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.bind.dialect.name == 'postgresql'
+
+    def is_partitioned(self, table: str) -> bool:
+        """Check whether `table` exists as a partitioned table."""
+        if not self.enabled:
+            return False
+        with self.bind.connect() as conn:
+            return conn.execute(
+                text("SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                     "WHERE c.relname = :table"),
+                {'table': table}
+            ).first() is not None
+
+    def ensure_partitions(self, table: str, start: DateLike, end: DateLike) -> List[str]:
+        """
+        Make sure monthly partitions exist for every month in [start, end].
+
+        Args:
+            table: Partitioned parent table
+            start: Earliest timestamp that will be stored
+            end: Latest timestamp that will be stored
+
+        Returns:
+            Names of partitions created by this call
+        """
+        if not self.enabled:
+            return []
+
+        missing = [(lower, upper) for lower, upper in month_range(start, end)
+                   if partition_name(table, lower) not in self._created]
+        if not missing:
+            return []
+
+        created = []
+        with self._lock, self.bind.begin() as conn:
+            existing = {row[0] for row in conn.execute(
+                text("SELECT c.relname FROM pg_inherits i "
+                     "JOIN pg_class c ON c.oid = i.inhrelid "
+                     "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"),
+                {'table': table}
+            )}
+            for lower, upper in missing:
+                name = partition_name(table, lower)
+                if name not in existing:
+                    conn.execute(text(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                    ))
+                    created.append(name)
+                self._created.add(name)
+
+        if created:
+            logger.info(f"🧱 Created {len(created)} {table} partitions ({created[0]} .. {created[-1]})")
+        return created
+
+    def ensure_configured_partitions(self, table: str = 'stock_prices') -> List[str]:
+        """
+        Create partitions from `partitions.start` up to `partitions.months_ahead` months from now.
+
+        Run at startup and periodically so inserts never hit a missing partition.
+
+        Args:
+            table: Partitioned parent table
+
+        Returns:
+            Names of partitions created
+        """
+        if not self.enabled:
+            return []
+        if not self.is_partitioned(table):
+            logger.warning(f"⚠️ {table} exists but is not partitioned; migrate it to use monthly partitions")
+            return []
+
+        start = datetime.fromisoformat(config_manager.get('partitions.start', '2000-01-01'))
+        end = date.today()
+        for _ in range(config_manager.get('partitions.months_ahead', 3)):
+            end = next_month(month_start(end))
+        return self.ensure_partitions(table, start, end)
+
+
+def range_filter(column, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> list:
+    """
+    Half-open [start, end) conditions on a partition key.
+
+    The bounds are bound parameters compared directly to the bare column (no casts
+    or functions on it), which is what lets PostgreSQL prune partitions.
+
+    Args:
+        column: Partition key column (e.g. StockPrice.timestamp)
+        start: Inclusive lower bound (None for unbounded)
+        end: Exclusive upper bound (None for unbounded)
+
+    Returns:
+        List of SQL conditions
+    """
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+    return conditions
+
+
+def price_range_query(stock_ids: Union[int, Sequence[int]], start: Optional[DateLike] = None,
+                      end: Optional[DateLike] = None, columns: Optional[Sequence] = None):
+    """
+    Select price rows for one or more stocks in a time range, ordered by time.
+
+    Only the partitions overlapping [start, end) are scanned, and within each the
+    (stock_id, timestamp) primary key serves the lookup and the ordering.
+
+    Args:
+        stock_ids: Stock id or ids
+        start: Inclusive lower bound
+        end: Exclusive upper bound
+        columns: Columns to select (default: whole StockPrice rows)
+
+    Returns:
+        SQLAlchemy select statement
+    """
+    from data.models import StockPrice
+
+    stmt = select(*columns) if columns else select(StockPrice)
+    if isinstance(stock_ids, int):
+        stmt = stmt.where(StockPrice.stock_id == stock_ids)
+    else:
+        stmt = stmt.where(StockPrice.stock_id.in_(list(stock_ids)))
+    return stmt.where(*range_filter(StockPrice.timestamp, start, end)).order_by(
+        StockPrice.stock_id, StockPrice.timestamp
+    )
+
+
+# Global partition manager instance
+partition_manager = PartitionManager()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Module
+Per-host adaptive token-bucket rate limiting (AIMD) for outgoing HTTP requests.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .custom_logging import logger
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts AIMD-style to server feedback.
+
+    The rate is cut multiplicatively on 429/5xx responses and transport errors,
+    and raised additively after a run of consecutive successes. A Retry-After
+    header blocks the bucket until the server says it is ready again.
+    """
+
+    def __init__(self, host: str, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 burst: float = 4.0, increase_step: float = 0.5, decrease_factor: float = 0.5,
+                 success_threshold: int = 20):
+        self.host = host
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.success_threshold = success_threshold
+
+        self.tokens = burst
+        self.waiting = 0
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._successes = 0
+        self._lock = None
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last refill, capped at the burst size."""
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it. Waiters are served FIFO."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        await asyncio.sleep(self._blocked_until - now)
+                        continue
+
+                    self._refill(now)
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+
+                    await asyncio.sleep((1.0 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def on_success(self):
+        """Additive increase after `success_threshold` consecutive successes."""
+        self._successes += 1
+        if self._successes >= self.success_threshold and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._successes = 0
+            logger.debug(f"⏫ Rate limit for {self.host} raised to {self.rate:.2f} req/s")
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease, optionally blocking for the server's Retry-After."""
+        self._successes = 0
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+        logger.warning(
+            f"⏬ Rate limit for {self.host} lowered to {self.rate:.2f} req/s"
+            + (f", blocked for {retry_after:.1f}s" if retry_after else "")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Current rate, available tokens and number of queued requests."""
+        return {
+            'rate': round(self.rate, 3),
+            'tokens': round(self.tokens, 3),
+            'queue_depth': self.waiting,
+            'blocked_for': round(max(0.0, self._blocked_until - time.monotonic()), 3)
+        }
+
+
+class HostRateLimiter:
+    """
+    Registry of adaptive token buckets keyed by request host.
+
+    Shared by every collector through the global HTTP client, so concurrent
+    crawls against the same Mubasher host draw from the same budget.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        self.bucket_settings = {
+            'initial_rate': float(settings.get('initial_rate', 2.0)),
+            'min_rate': float(settings.get('min_rate', 0.2)),
+            'max_rate': float(settings.get('max_rate', 10.0)),
+            'burst': float(settings.get('burst', 4.0)),
+            'increase_step': float(settings.get('increase_step', 0.5)),
+            'decrease_factor': float(settings.get('decrease_factor', 0.5)),
+            'success_threshold': int(settings.get('success_threshold', 20))
+        }
+        self._buckets: Dict[str, AdaptiveTokenBucket] = {}
+
+    def bucket(self, url: str) -> AdaptiveTokenBucket:
+        """Get (or lazily create) the bucket for the URL's host."""
+        host = urlparse(str(url)).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = AdaptiveTokenBucket(host, **self.bucket_settings)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str):
+        """Wait for permission to send a request to the URL's host."""
+        await self.bucket(url).acquire()
+
+    def record_response(self, url: str, response: httpx.Response):
+        """Feed a response back into the host's bucket."""
+        bucket = self.bucket(url)
+        if response.status_code == 429 or response.status_code >= 500:
+            bucket.on_throttle(self._parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            bucket.on_success()
+
+    def record_failure(self, url: str):
+        """Treat a transport error (timeout, reset) as a throttle signal."""
+        self.bucket(url).on_throttle()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host rate limiter statistics."""
+        return {host: bucket.stats() for host, bucket in self._buckets.items()}
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given either as seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            logger.warning(f"Could not parse Retry-After header: {value}")
+            return None
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Resilience Module
+Retry budgets, circuit breakers and latency tracking used by the HTTP client.
+"""
+
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .custom_logging import logger
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a request is refused because the host's circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit breaker open for {host}, retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent requests for one host.
+
+    Over a sliding window, retries are allowed while
+    `retries < ratio * requests + min_retries`, so retries cannot multiply
+    the load on a host that is already failing.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests = deque()
+        self._retries = deque()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self):
+        """Count an original (non-retry) request."""
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when the budget is exhausted."""
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.ratio * len(self._requests) + self.min_retries:
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        return {'requests': len(self._requests), 'retries': len(self._retries)}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host.
+
+    closed -> open after `failure_threshold` consecutive failures; open -> half-open
+    after `reset_timeout` seconds, letting a single probe through; the probe's
+    outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self.state == self.CLOSED:
+            return
+
+        elapsed = time.monotonic() - self._opened_at
+        if self.state == self.OPEN and elapsed >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"🔌 Circuit for {self.host} half-open, sending probe")
+
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+
+        raise CircuitOpenError(self.host, max(0.0, self.reset_timeout - elapsed))
+
+    def release_probe(self):
+        """
+        Let another probe through after one ended without an outcome.
+
+        Called when a request was cancelled or failed with an error that says
+        nothing about the host; otherwise the half-open circuit would refuse
+        every request forever, waiting for a probe that never reports back.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"✅ Circuit for {self.host} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"🔌 Circuit for {self.host} opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class LatencyTracker:
+    """Rolling window of response latencies for one host, used to pick the hedge delay."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at the given fraction (0-1), or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Snapshot Cache Module
+Versioned, pre-serialized in-memory snapshots of read-mostly API lists with generation-based ETags.
+"""
+
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .custom_logging import logger
+from .fast_json import dumps as serialize_json
+
+# Versions restart at 0 with the process; the boot token keeps ETags from colliding across restarts
+_BOOT_TOKEN = secrets.token_hex(8)
+
+
+def _etag(name: str, version: int, params: tuple = ()) -> str:
+    """Strong ETag of a data generation and request parameters; bodies are never hashed."""
+    key = '|'.join([_BOOT_TOKEN, name, str(version)] + [repr(param) for param in params])
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One immutable build of a cached list."""
+    name: str
+    version: int
+    data: Any
+    body: bytes
+    etag: str
+    built_at: float
+
+
+class SnapshotCache:
+    """
+    Process-wide cache of read endpoints' payloads, rebuilt only after their data changes.
+
+    Every snapshot name has a version (data generation) that writers bump with
+    `invalidate()` once their transaction has committed. Readers get the last build
+    while its version is current; otherwise one rebuild runs (concurrent readers
+    wait for it rather than querying too) and the result is serialized to JSON once,
+    so repeat hits cost a dict lookup. ETags derive from the generation, so
+    endpoints without a snapshot can also answer 304 before touching the database.
+
+    Invalidation is in-process, so writers and readers must share the API process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.builds = 0
+
+    def version(self, name: str) -> int:
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def invalidate(self, name: str):
+        """
+        Mark a snapshot stale; the next read rebuilds it.
+
+        Args:
+            name: Snapshot name (e.g. 'stocks')
+        """
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._snapshots.pop(name, None)
+        logger.debug(f"🧊 Snapshot '{name}' invalidated")
+
+    def peek(self, name: str) -> Optional[Snapshot]:
+        """Current snapshot, if built and not invalidated since."""
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot is not None and snapshot.version == self._versions.get(name, 0):
+                self.hits += 1
+                return snapshot
+            return None
+
+    async def get(self, name: str, builder: Callable[[], Awaitable[Any]]) -> Snapshot:
+        """
+        Get a current snapshot, building it with `builder` if needed.
+
+        Args:
+            name: Snapshot name
+            builder: Coroutine function returning JSON-serializable data
+
+        Returns:
+            Current snapshot (build errors propagate and nothing is cached)
+        """
+        snapshot = self.peek(name)
+        if snapshot is not None:
+            return snapshot
+
+        lock = self._build_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            snapshot = self.peek(name)
+            if snapshot is not None:
+                return snapshot
+
+            version = self.version(name)
+            started = time.perf_counter()
+            data = await builder()
+            body = serialize_json(data)
+            snapshot = Snapshot(
+                name=name,
+                version=version,
+                data=data,
+                body=body,
+                etag=_etag(name, version),
+                built_at=time.time()
+            )
+
+            with self._lock:
+                self.builds += 1
+                # A write committed during the build makes this one stale already
+                if self._versions.get(name, 0) == version:
+                    self._snapshots[name] = snapshot
+
+            logger.debug(f"🧊 Snapshot '{name}' v{version} built: {len(body)} bytes "
+                         f"in {time.perf_counter() - started:.3f}s")
+            return snapshot
+
+    def generation_etag(self, name: str, *params: Any) -> str:
+        """
+        Strong ETag of the current generation of `name` for a set of request parameters.
+
+        Args:
+            name: Generation name bumped by writers via `invalidate()`
+            *params: Everything else the response depends on
+
+        Returns:
+            Quoted ETag
+        """
+        return _etag(name, self.version(name), params)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'snapshots': {name: snapshot.version for name, snapshot in self._snapshots.items()},
+                'hits': self.hits,
+                'builds': self.builds
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates)
+
+
+def json_response(body: bytes, etag: str, if_none_match: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+    """
+    JSON response with an ETag: 304 when the client's copy is current.
+
+    Args:
+        body: Serialized JSON body
+        etag: Strong ETag of the body
+        if_none_match: Request If-None-Match header
+        headers: Extra response headers
+
+    Returns:
+        FastAPI Response
+    """
+    from fastapi import Response
+
+    headers = {**(headers or {}), 'ETag': etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def snapshot_response(snapshot: Snapshot, if_none_match: Optional[str] = None):
+    """
+    HTTP response serving a whole snapshot from its cached body.
+
+    Args:
+        snapshot: Snapshot to serve
+        if_none_match: Request If-None-Match header
+
+    Returns:
+        FastAPI Response
+    """
+    return json_response(snapshot.body, snapshot.etag, if_none_match)
+
+
+def view_etag(snapshot: Snapshot, *params: Any) -> str:
+    """
+    Strong ETag of a filtered/paged view of a snapshot.
+
+    A view is fully determined by the snapshot's generation and its parameters.
+    """
+    return _etag(snapshot.name, snapshot.version, params)
+
+
+# Global snapshot cache instance
+snapshot_cache = SnapshotCache()
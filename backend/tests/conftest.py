@@ -0,0 +1,12 @@
+"""
+Test setup: make the backend packages importable and keep module-level engines off PostgreSQL.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# `shared.db_engine` builds its engine at import time; unit tests need no database server
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
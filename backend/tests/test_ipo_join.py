@@ -0,0 +1,76 @@
+"""
+IPOCollector must pair English and Arabic IPO rows without relying on stored Arabic names.
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from shared.db_engine import Base
+from data.models.ipo import IPO
+from data.models.ipo_status import IPOStatus
+from data.models.ipo_type import IPOType
+from collector.IPOCollector import IPOCollector
+
+ENGLISH_ROWS = [
+    {'name': 'Efaco', 'url': None, 'status': 'Up comming', 'attachment': '', 'type': 'IPO',
+     'market': 'Egyptian Stock Exchange', 'sector': 'Basic Resources Index', 'volume': '1,000,000',
+     'announcedAt': '09 February 2023'},
+    {'name': 'Qalaa Holding', 'url': '/markets/EGX/stocks/CCAP', 'status': 'To be traded', 'attachment': '',
+     'type': 'IPO', 'market': 'Egyptian Stock Exchange', 'sector': 'Non-bank financial services',
+     'volume': 500000, 'announcedAt': '12 March 2023'},
+]
+ARABIC_ROWS = [
+    {'name': 'القلعة', 'url': '/markets/EGX/stocks/CCAP', 'status': 'يتم تداولها', 'attachment': '',
+     'type': 'اولى', 'market': 'البورصة المصرية', 'sector': 'خدمات مالية غير مصرفية',
+     'volume': '500,000', 'announcedAt': '12 مارس 2023'},
+    {'name': 'ايفاكو', 'url': None, 'status': 'التفاصيل التي تم الافصاح عنها', 'attachment': '', 'type': 'اولى',
+     'market': 'البورصة المصرية', 'sector': 'مؤشر قطاع موارد أساسية', 'volume': 1000000,
+     'announcedAt': '09 فبراير 2023'},
+]
+
+
+def make_collector() -> IPOCollector:
+    collector = IPOCollector()
+
+    async def english(page, size):
+        return {'rows': ENGLISH_ROWS, 'numberOfPages': 1}
+
+    async def arabic(page, size):
+        return {'rows': ARABIC_ROWS, 'numberOfPages': 1}
+
+    collector._fetch_ipos_english = english
+    collector._fetch_ipos_arabic = arabic
+    return collector
+
+
+def test_join_pairs_rows_on_language_neutral_content():
+    merged = asyncio.run(make_collector().collect_ipos())
+
+    by_name = {row['name']: row for row in merged}
+    assert set(by_name) == {'Efaco', 'Qalaa Holding'}
+    assert by_name['Efaco']['name_ar'] == 'ايفاكو'
+    assert by_name['Qalaa Holding']['name_ar'] == 'القلعة'
+    assert by_name['Qalaa Holding']['status_ar'] == 'يتم تداولها'
+    assert by_name['Qalaa Holding']['type_ar'] == 'اولى'
+
+
+def test_join_against_types_and_statuses_without_arabic_names():
+    # A database populated before Arabic names were joined: English-only lookup rows
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([IPOType(name='IPO'), IPOStatus(name='To be traded')])
+        session.commit()
+
+    collector = make_collector()
+    merged = asyncio.run(collector.collect_ipos())
+    with Session(engine) as session:
+        collector._write_ipos(session, merged)
+        session.commit()
+
+        assert session.execute(select(IPOType.name_ar).where(IPOType.name == 'IPO')).scalar_one() == 'اولى'
+        assert session.execute(
+            select(IPOStatus.name_ar).where(IPOStatus.name == 'To be traded')).scalar_one() == 'يتم تداولها'
+        assert set(session.execute(select(IPO.name_ar)).scalars()) == {'ايفاكو', 'القلعة'}